@@ -54,6 +54,7 @@ INSTALLED_APPS: list[str] = [
 MIDDLEWARE: list[str] = [
     "django.middleware.security.SecurityMiddleware",
     "corsheaders.middleware.CorsMiddleware",
+    "core.api.middleware.CompressionMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -110,19 +111,89 @@ DATABASES = {
     },
 }
 
+# Read replicas for the analytics selectors (see core.common.replicas), as database URLs,
+# each with a weight from DB_REPLICA_WEIGHTS (default 1). A URL may point at the primary
+# itself, e.g. to exercise the routing locally. Replicas lagging more than
+# DB_REPLICA_MAX_LAG_SECONDS are skipped; with DB_REPLICA_LAG_POLICY "primary" reads then
+# fall back to the primary, with "stale" they go to the least lagging replica and the
+# response meta says so.
+DB_REPLICA_URLS = env.list("DB_REPLICA_URLS", default=[])  # type: ignore
+DB_REPLICA_WEIGHTS = env.list("DB_REPLICA_WEIGHTS", cast=int, default=[])  # type: ignore
+DB_REPLICAS: dict[str, int] = {}
+for index, url in enumerate(DB_REPLICA_URLS, start=1):
+    DATABASES[f"replica_{index}"] = {**DATABASES["default"], **env.db_url_config(url), "TEST": {"MIRROR": "default"}}
+    DB_REPLICAS[f"replica_{index}"] = DB_REPLICA_WEIGHTS[index - 1] if index <= len(DB_REPLICA_WEIGHTS) else 1
+DB_REPLICA_MAX_LAG_SECONDS = env.float("DB_REPLICA_MAX_LAG_SECONDS", default=30.0)  # type: ignore
+DB_REPLICA_LAG_POLICY = env.str("DB_REPLICA_LAG_POLICY", default="primary")  # type: ignore
+DB_REPLICA_CHECK_SECONDS = env.float("DB_REPLICA_CHECK_SECONDS", default=5.0)  # type: ignore
+DB_REPLICA_EJECT_SECONDS = env.float("DB_REPLICA_EJECT_SECONDS", default=30.0)  # type: ignore
+
+DATABASE_ROUTERS = ["core.common.replicas.ReplicaRouter"]
+
+# Connection pool of each worker process, which the analytics views run database work on (see
+# core.common.db): one connection per pool thread. With DB_MAX_CONNECTIONS set (what the
+# whole deployment may open on the primary: Postgres max_connections, or the PgBouncer
+# pool size, minus room for admin sessions) DB_POOL_SIZE defaults to a share of it per
+# gunicorn worker; gunicorn.config.py passes its worker count on as GUNICORN_WORKERS.
+# Requests wait at most DB_POOL_TIMEOUT seconds for a connection, then get a 503.
+DB_MAX_CONNECTIONS = env.int("DB_MAX_CONNECTIONS", default=0)  # type: ignore
+GUNICORN_WORKERS = env.int("GUNICORN_WORKERS", default=1)  # type: ignore
+DB_POOL_SIZE = env.int("DB_POOL_SIZE", default=0)  # type: ignore
+DB_POOL_TIMEOUT = env.float("DB_POOL_TIMEOUT", default=5.0)  # type: ignore
+
+# Behind PgBouncer in transaction mode, consecutive transactions of a connection may run on
+# different server sessions, so nothing may rely on session state between transactions:
+# server-side cursors are disabled (Django would declare them WITH HOLD outside a
+# transaction) and the L1 cache does not LISTEN for data version notifications by default.
+# Give the database role the settings Django would otherwise SET per session, e.g.
+# ALTER ROLE ... SET timezone = 'UTC'. DB_DIRECT_URL, a URL that bypasses PgBouncer,
+# becomes the "direct" alias the L1 cache listens on instead.
+DB_PGBOUNCER_TRANSACTION_MODE = env.bool("DB_PGBOUNCER_TRANSACTION_MODE", default=False)  # type: ignore
+if DB_PGBOUNCER_TRANSACTION_MODE:
+    for database in DATABASES.values():
+        database["DISABLE_SERVER_SIDE_CURSORS"] = True
+DB_DIRECT_URL = env.str("DB_DIRECT_URL", default="")  # type: ignore
+if DB_DIRECT_URL:
+    DATABASES["direct"] = {**DATABASES["default"], **env.db_url_config(DB_DIRECT_URL), "TEST": {"MIRROR": "default"}}
+    DATABASES["direct"].pop("DISABLE_SERVER_SIDE_CURSORS", None)
+
 # Cache configuration
+# Each worker keeps a byte-bounded LRU of data-versioned results in front of the shared
+# cache, and drops superseded entries on data version notifications (see
+# core.analytics.cache_backends). The shared cache is Redis when REDIS_URL is set; without
+# it a per-process LocMemCache stands in, e.g. for development.
+REDIS_URL = env.str("REDIS_URL", default="")
+
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",  # For development
-        # For production, use Redis:
-        # "BACKEND": "django.core.cache.backends.redis.RedisCache",
-        # "LOCATION": env("REDIS_URL", default="redis://127.0.0.1:6379/1"),
+        "BACKEND": "core.analytics.cache_backends.TieredCache",
         "OPTIONS": {
-            "MAX_ENTRIES": 1000,
+            "L2": "shared",
+            "L1_MAX_BYTES": env.int("CACHE_L1_MAX_BYTES", default=64 * 1024 * 1024),  # type: ignore
+            "L1_TIMEOUT": env.int("CACHE_L1_TIMEOUT", default=300),  # type: ignore
+            "LISTEN": env.bool(  # type: ignore
+                "CACHE_L1_LISTEN", default=bool(DB_DIRECT_URL) or not DB_PGBOUNCER_TRANSACTION_MODE
+            ),
+            "LISTEN_DATABASE": "direct" if DB_DIRECT_URL else "default",
         },
         "KEY_PREFIX": "analytics",
         "TIMEOUT": 300,  # 5 minutes default
     },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+        "KEY_PREFIX": "analytics",
+        "TIMEOUT": 300,
+    }
+    if REDIS_URL
+    else {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {
+            "MAX_ENTRIES": 1000,
+        },
+        "KEY_PREFIX": "analytics",
+        "TIMEOUT": 300,
+    },
 }
 
 # Password validation
@@ -181,6 +252,14 @@ AUTHENTICATION_BACKENDS = ("django.contrib.auth.backends.ModelBackend",)
 
 from config.settings.logging import *  # noqa
 from config.settings.cors import *  # noqa
+from config.settings.analytics import *  # noqa
+from config.settings.compression import *  # noqa
+
+if not DB_POOL_SIZE:
+    # Each worker also holds connections outside the pool: the thread of sync views, the
+    # L1 cache listener and the view buffer flusher
+    reserved = 3
+    DB_POOL_SIZE = max(2, DB_MAX_CONNECTIONS // GUNICORN_WORKERS - reserved) if DB_MAX_CONNECTIONS else 8
 
 from config.settings.debug_toolbar.settings import *  # noqa
 from config.settings.debug_toolbar.setup import DebugToolbarSetup  # noqa
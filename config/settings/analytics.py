@@ -0,0 +1,83 @@
+from config.env import env
+
+# Rollups
+# Views created within the settle window are left for the next refresh, so rows from
+# still-open transactions are not skipped by the created_at watermark.
+ANALYTICS_ROLLUPS_ENABLED = env.bool("ANALYTICS_ROLLUPS_ENABLED", default=True)  # type: ignore
+ANALYTICS_ROLLUP_SETTLE_SECONDS = env.int("ANALYTICS_ROLLUP_SETTLE_SECONDS", default=60)  # type: ignore
+# Selectors fall back to raw BlogView rows when the last refresh is older than this
+ANALYTICS_ROLLUP_MAX_LAG_SECONDS = env.int("ANALYTICS_ROLLUP_MAX_LAG_SECONDS", default=900)  # type: ignore
+
+# Leaderboards for /top/ over standard windows, kept up to date from the rollup on every refresh.
+# Pages past DEPTH entries are computed live.
+ANALYTICS_LEADERBOARDS_ENABLED = env.bool("ANALYTICS_LEADERBOARDS_ENABLED", default=True)  # type: ignore
+ANALYTICS_LEADERBOARD_DEPTH = env.int("ANALYTICS_LEADERBOARD_DEPTH", default=1000)  # type: ignore
+ANALYTICS_TOP_DEFAULT_LIMIT = env.int("ANALYTICS_TOP_DEFAULT_LIMIT", default=10)  # type: ignore
+ANALYTICS_TOP_MAX_LIMIT = env.int("ANALYTICS_TOP_MAX_LIMIT", default=100)  # type: ignore
+
+# Cached results embed the data version and are dropped as soon as the data changes,
+# so the timeout only bounds how long unused entries linger
+ANALYTICS_CACHE_TIMEOUT = env.int("ANALYTICS_CACHE_TIMEOUT", default=60 * 60 * 24)  # type: ignore
+# Results of closed periods only change on late arrivals and rebuilds, so they are kept longer
+ANALYTICS_CLOSED_PERIOD_CACHE_TIMEOUT = env.int("ANALYTICS_CLOSED_PERIOD_CACHE_TIMEOUT", default=60 * 60 * 24 * 30)  # type: ignore
+# Single-flight recomputation (see core.analytics.caching.cache_fetch): how long a
+# recompute lease lasts, how long callers without it wait for the result, whether
+# they may get the previous version's value instead, and how eagerly hot entries are
+# refreshed before they expire (0 disables early refresh)
+ANALYTICS_CACHE_LEASE_SECONDS = env.int("ANALYTICS_CACHE_LEASE_SECONDS", default=30)  # type: ignore
+ANALYTICS_CACHE_LOCK_WAIT_SECONDS = env.float("ANALYTICS_CACHE_LOCK_WAIT_SECONDS", default=2.0)  # type: ignore
+ANALYTICS_CACHE_SERVE_STALE = env.bool("ANALYTICS_CACHE_SERVE_STALE", default=True)  # type: ignore
+ANALYTICS_CACHE_EARLY_REFRESH_BETA = env.float("ANALYTICS_CACHE_EARLY_REFRESH_BETA", default=1.0)  # type: ignore
+
+# Keyset pagination of grouped metrics
+ANALYTICS_PAGE_SIZE = env.int("ANALYTICS_PAGE_SIZE", default=1000)  # type: ignore
+ANALYTICS_MAX_PAGE_SIZE = env.int("ANALYTICS_MAX_PAGE_SIZE", default=10000)  # type: ignore
+
+# Rows fetched per round trip by the server-side cursor behind streaming exports
+ANALYTICS_EXPORT_CHUNK_SIZE = env.int("ANALYTICS_EXPORT_CHUNK_SIZE", default=2000)  # type: ignore
+
+# Ingestion
+ANALYTICS_BULK_MAX_EVENTS = env.int("ANALYTICS_BULK_MAX_EVENTS", default=10000)  # type: ignore
+
+# Write-behind buffer for single view events, one per worker process. A batch is flushed
+# once MAX_BATCH events are waiting or the oldest is MAX_AGE_SECONDS old; past CAPACITY
+# the endpoint answers 503. DRAIN_SECONDS must stay below gunicorn's graceful_timeout.
+ANALYTICS_BUFFER_ENABLED = env.bool("ANALYTICS_BUFFER_ENABLED", default=True)  # type: ignore
+ANALYTICS_BUFFER_MAX_BATCH = env.int("ANALYTICS_BUFFER_MAX_BATCH", default=500)  # type: ignore
+ANALYTICS_BUFFER_MAX_AGE_SECONDS = env.float("ANALYTICS_BUFFER_MAX_AGE_SECONDS", default=1.0)  # type: ignore
+ANALYTICS_BUFFER_CAPACITY = env.int("ANALYTICS_BUFFER_CAPACITY", default=20000)  # type: ignore
+ANALYTICS_BUFFER_DRAIN_SECONDS = env.int("ANALYTICS_BUFFER_DRAIN_SECONDS", default=20)  # type: ignore
+
+# Filter validation limits, and how many compiled filter plans each process keeps
+ANALYTICS_FILTER_MAX_DEPTH = env.int("ANALYTICS_FILTER_MAX_DEPTH", default=8)  # type: ignore
+ANALYTICS_FILTER_MAX_CLAUSES = env.int("ANALYTICS_FILTER_MAX_CLAUSES", default=64)  # type: ignore
+ANALYTICS_FILTER_MAX_IN_VALUES = env.int("ANALYTICS_FILTER_MAX_IN_VALUES", default=1000)  # type: ignore
+ANALYTICS_FILTER_PLAN_CACHE_SIZE = env.int("ANALYTICS_FILTER_PLAN_CACHE_SIZE", default=512)  # type: ignore
+# Longer `in` lists are joined against the unnested array instead of compared with = ANY
+ANALYTICS_FILTER_IN_JOIN_THRESHOLD = env.int("ANALYTICS_FILTER_IN_JOIN_THRESHOLD", default=100)  # type: ignore
+
+# Batch endpoint: sub-queries per request, and how many run at once (each on a connection
+# of the database pool, see core.analytics.batch)
+ANALYTICS_BATCH_MAX_QUERIES = env.int("ANALYTICS_BATCH_MAX_QUERIES", default=20)  # type: ignore
+ANALYTICS_BATCH_WORKERS = env.int("ANALYTICS_BATCH_WORKERS", default=4)  # type: ignore
+
+# Cost guard (see core.analytics.cost): planner cost units above which an aggregate is
+# answered from the sketches instead (when it can be) or rejected, 0 disabling either;
+# how long a query's estimate is reused; and the statement_timeout (ms) per endpoint
+ANALYTICS_COST_DOWNGRADE = env.float("ANALYTICS_COST_DOWNGRADE", default=1_000_000)  # type: ignore
+ANALYTICS_COST_REJECT = env.float("ANALYTICS_COST_REJECT", default=10_000_000)  # type: ignore
+ANALYTICS_COST_CACHE_TIMEOUT = env.int("ANALYTICS_COST_CACHE_TIMEOUT", default=600)  # type: ignore
+ANALYTICS_STATEMENT_TIMEOUTS = env.dict(  # type: ignore
+    "ANALYTICS_STATEMENT_TIMEOUTS",
+    cast={"value": int},
+    default={"blog_views": 15000, "top": 10000, "performance": 15000},
+)
+
+# HTTP caching of blog-views, top and performance responses. Each response carries an
+# ETag of its parameters, format and data version, and a matching If-None-Match is
+# answered 304 before any aggregate runs. Responses that cover closed days only may be
+# kept by browsers, proxies and CDNs for CLOSED_MAX_AGE seconds as immutable, so late
+# arrivals show up after at most that long. Other responses are kept for MAX_AGE
+# seconds; 0 makes caches revalidate every time.
+ANALYTICS_HTTP_MAX_AGE = env.int("ANALYTICS_HTTP_MAX_AGE", default=0)  # type: ignore
+ANALYTICS_HTTP_CLOSED_MAX_AGE = env.int("ANALYTICS_HTTP_CLOSED_MAX_AGE", default=60 * 60 * 24)  # type: ignore
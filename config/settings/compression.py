@@ -0,0 +1,12 @@
+from config.env import env
+
+# Response compression of API views (see core.api.middleware.CompressionMiddleware).
+# Encodings are offered in this order of preference; br and zstd use the brotli and
+# zstandard packages (project dependencies) and are skipped in environments without them.
+API_COMPRESSION_ENABLED = env.bool("API_COMPRESSION_ENABLED", default=True)  # type: ignore
+API_COMPRESSION_ENCODINGS = env.list("API_COMPRESSION_ENCODINGS", default=["zstd", "br", "gzip"])  # type: ignore
+# Smaller bodies are sent as they are: below about a packet, compression saves no round trip
+API_COMPRESSION_MIN_BYTES = env.int("API_COMPRESSION_MIN_BYTES", default=1024)  # type: ignore
+# Compression profile (fast, default or small) by URL name; other routes use default.
+# Exports are large and compressed chunk by chunk while they stream, so they favour speed.
+API_COMPRESSION_ROUTES = env.dict("API_COMPRESSION_ROUTES", default={"export": "fast"})  # type: ignore
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from core.analytics.models import Blog, BlogView, Country
+from core.analytics.models import Blog, BlogView, BlogViewDailyRollup, Country, Leaderboard, RollupWatermark
 
 
 @admin.register(Country)
@@ -26,3 +26,25 @@ class BlogViewAdmin(admin.ModelAdmin):
     raw_id_fields = ["blog", "viewer_user", "viewer_country"]
     date_hierarchy = "viewed_at"
     readonly_fields = ["viewed_at"]
+
+
+@admin.register(BlogViewDailyRollup)
+class BlogViewDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ["day", "blog", "viewer_user", "viewer_country", "view_count"]
+    list_filter = ["viewer_country", "day"]
+    raw_id_fields = ["blog", "viewer_user", "viewer_country"]
+    date_hierarchy = "day"
+    readonly_fields = ["day", "blog", "viewer_user", "viewer_country", "view_count"]
+
+
+@admin.register(RollupWatermark)
+class RollupWatermarkAdmin(admin.ModelAdmin):
+    list_display = ["name", "watermark", "updated_at"]
+    readonly_fields = ["watermark"]
+
+
+@admin.register(Leaderboard)
+class LeaderboardAdmin(admin.ModelAdmin):
+    list_display = ["top_type", "window", "first_day", "last_day", "size", "complete", "updated_at"]
+    list_filter = ["top_type"]
+    readonly_fields = ["top_type", "window", "first_day", "last_day", "size", "complete"]
@@ -1,33 +1,203 @@
+import hashlib
 import json
-from typing import Literal, cast
+import logging
+import time
+from functools import partial
+from typing import Any, Callable, Generator, Literal, cast
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponseBase, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
-from rest_framework import serializers, status
+from rest_framework import exceptions, serializers, status
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
-from rest_framework.views import APIView
 
+from core.analytics.batch import batch_run
+from core.analytics.buffer import BufferFullError
+from core.analytics.caching import cache_stats
+from core.analytics.cost import explain_queries
+from core.analytics.exports import CONTENT_TYPES, export_started, export_stream
+from core.analytics.filters import filter_plan
 from core.analytics.selectors import (
+    ResultVersion,
     blog_views_get_grouped_metrics,
+    blog_views_iter_grouped_metrics,
+    blog_views_iter_raw,
+    blog_views_versions,
     performance_get_time_series,
+    performance_versions,
     top_get_ranked,
+    top_iter_ranked,
+    top_versions,
+    top_window_bounds,
 )
+from core.analytics.services import blog_view_track, blog_views_bulk_ingest, view_buffer
+from core.api.exceptions import ApplicationError, ServiceUnavailable
+from core.api.parsers import NDJSONParser
+from core.api.renderers import ROW_RENDERER_CLASSES, FastJSONRenderer
+from core.api.views import AsyncAPIView
+from core.common.db import db_iter, db_pool, db_run
+from core.common.replicas import replica_pool
+from core.common.utils import inline_serializer
 
+logger = logging.getLogger(__name__)
 
-class BlogViewsApi(APIView):
+
+EXPLAIN_PARAMETER = openapi.Parameter(
+    "explain",
+    openapi.IN_QUERY,
+    description=(
+        "Staff only: instead of the results, return the plan, estimated cost and rows, BlogView indexes "
+        "and cost guard decision of each aggregate the request would run. Nothing is executed or cached"
+    ),
+    type=openapi.TYPE_BOOLEAN,
+    required=False,
+)
+
+FORMAT_PARAMETER = openapi.Parameter(
+    "format",
+    openapi.IN_QUERY,
+    description=(
+        "Response format, instead of an Accept header: json (rows, the default); columnar (application/"
+        "vnd.ideeza.columnar+json: one array per field, strings dictionary encoded); msgpack (application/"
+        "msgpack: the columnar result as MessagePack); arrow (application/vnd.apache.arrow.stream: an Arrow "
+        "IPC stream, the envelope in the schema metadata). msgpack and arrow need their packages installed"
+    ),
+    type=openapi.TYPE_STRING,
+    enum=["json", "columnar", "msgpack", "arrow"],
+    required=False,
+)
+
+
+async def _is_staff(request) -> bool:
+    """Whether the request carries the session of a staff user (e.g. logged in to the admin)."""
+    auser = getattr(request._request, "auser", None)
+    if auser is None:
+        return False
+    user = await auser()
+    return user.is_staff
+
+
+class ExplainableApi(AsyncAPIView):
+    """
+    Read endpoint whose `fetch` a staff user can have explained rather than run (see core.analytics.cost).
+
+    Selector rows already have the types of the documented response, so `fetch` returns
+    them as they are instead of running them through an output serializer, and
+    FastJSONRenderer encodes them in one pass. They can also be had as columns, in JSON,
+    MessagePack or Arrow (see FORMAT_PARAMETER); errors and plans are always JSON.
+
+    Responses carry an ETag of the path, parameters, format and the version of the data
+    the result was computed from (see core.analytics.selectors.ResultVersion). A request
+    whose If-None-Match matches a version its result currently has gets a 304 before
+    `fetch` runs. Results of closed days only are cacheable as immutable.
+    """
+
+    renderer_classes = ROW_RENDERER_CLASSES
+    result_columns = ["x", "y", "z"]
+
+    fetch: Callable[[dict[str, Any]], dict[str, Any]]
+    # The versions the result of validated input currently has, without computing it
+    versions: Callable[[dict[str, Any]], set[ResultVersion]]
+
+    def render_json(self) -> None:
+        """Answer in JSON whatever format was negotiated."""
+        self.request.accepted_renderer = FastJSONRenderer()
+        self.request.accepted_media_type = FastJSONRenderer.media_type
+
+    def handle_exception(self, exc):
+        self.render_json()
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        patch_vary_headers(response, ["Accept"])
+        return response
+
+    async def respond(self, validated_data: dict[str, Any]) -> HttpResponseBase:
+        if validated_data.get("explain"):
+            if not await _is_staff(self.request):
+                raise exceptions.PermissionDenied("explain is only available to staff users.")
+            self.render_json()
+            data = await db_run(self.explain, validated_data)
+            response = Response(data=data, status=status.HTTP_200_OK)
+            patch_cache_control(response, private=True, no_store=True)
+            return response
+
+        # Compared weakly, as RFC 9110 has it for If-None-Match: compression weakens ETags
+        if_none_match = [etag.removeprefix("W/") for etag in parse_etags(self.request.headers.get("If-None-Match", ""))]
+        # Off the event loop, and off the single thread sync views share (see db_run)
+        data, version = await db_run(self.fetch_unless_modified, validated_data, if_none_match)
+
+        response = HttpResponseNotModified() if data is None else Response(data=data, status=status.HTTP_200_OK)
+        if version is not None:
+            response["ETag"] = self.etag(validated_data, version)
+            if version.closed and settings.ANALYTICS_HTTP_CLOSED_MAX_AGE:
+                patch_cache_control(
+                    response, public=True, max_age=settings.ANALYTICS_HTTP_CLOSED_MAX_AGE, immutable=True
+                )
+            elif settings.ANALYTICS_HTTP_MAX_AGE:
+                patch_cache_control(response, public=True, max_age=settings.ANALYTICS_HTTP_MAX_AGE)
+            else:
+                patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+    def fetch_unless_modified(
+        self, validated_data: dict[str, Any], if_none_match: list[str]
+    ) -> tuple[dict[str, Any] | None, ResultVersion | None]:
+        """
+        `fetch` and the version of its result, or no data and the current version that
+        If-None-Match matched.
+        """
+        if if_none_match:
+            for version in self.versions(validated_data):
+                if "*" in if_none_match or self.etag(validated_data, version) in if_none_match:
+                    return None, version
+        data = self.fetch(validated_data)
+        return data, data["result"].version
+
+    def etag(self, validated_data: dict[str, Any], version: ResultVersion) -> str:
+        """Strong ETag of the response to validated input whose result has `version`."""
+        params = {
+            **validated_data,
+            # Canonical, so equivalent filters share the ETag
+            "filters": filter_plan(validated_data.get("filters")).fingerprint,
+            "path": self.request.path,
+            "media_type": self.request.accepted_media_type,
+            "version": version.tag,
+        }
+        params.pop("explain", None)
+        return f'"{hashlib.md5(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()}"'
+
+    @classmethod
+    def explain(cls, validated_data: dict[str, Any]) -> dict[str, Any]:
+        """Plans of the guarded queries `fetch` would run, with its meta; the result cache is bypassed."""
+        with explain_queries() as explained:
+            data = cls.fetch(validated_data)
+        return {"result": explained, "meta": {**data["meta"], "explain": True}}
+
+
+class BlogViewsApi(ExplainableApi):
     class InputSerializer(serializers.Serializer):
         object_type = serializers.ChoiceField(choices=["country", "user"], required=True)
         range = serializers.ChoiceField(choices=["month", "week", "year"], required=True)
         filters = serializers.CharField(required=False, allow_blank=True, allow_null=True)
-
-    class OutputSerializer(serializers.Serializer):
-        x = serializers.CharField()
-        y = serializers.IntegerField()
-        z = serializers.IntegerField()
+        approx = serializers.BooleanField(required=False, default=False)
+        page_size = serializers.IntegerField(required=False, min_value=1, max_value=settings.ANALYTICS_MAX_PAGE_SIZE)
+        cursor = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+        explain = serializers.BooleanField(required=False, default=False)
 
     @swagger_auto_schema(
         operation_summary="Get blog views grouped metrics",
-        operation_description="Retrieve blog views metrics grouped by the specified object type and time range.",
+        operation_description=(
+            "Retrieve blog views metrics grouped by the specified object type and time range, ordered by "
+            "period and group. Results are paginated; pass meta.next_cursor as `cursor` to get the next page."
+        ),
         manual_parameters=[
             openapi.Parameter(
                 "object_type",
@@ -52,6 +222,32 @@ class BlogViewsApi(APIView):
                 type=openapi.TYPE_STRING,
                 required=False,
             ),
+            openapi.Parameter(
+                "approx",
+                openapi.IN_QUERY,
+                description=(
+                    "Estimate distinct counts from HyperLogLog sketches (only without filters). "
+                    "The relative error bound is reported in meta.error_bound"
+                ),
+                type=openapi.TYPE_BOOLEAN,
+                required=False,
+            ),
+            openapi.Parameter(
+                "page_size",
+                openapi.IN_QUERY,
+                description="Rows per page (default 1000, capped by ANALYTICS_MAX_PAGE_SIZE)",
+                type=openapi.TYPE_INTEGER,
+                required=False,
+            ),
+            openapi.Parameter(
+                "cursor",
+                openapi.IN_QUERY,
+                description="Opaque cursor from meta.next_cursor of the previous page",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+            EXPLAIN_PARAMETER,
+            FORMAT_PARAMETER,
         ],
         responses={
             200: openapi.Response(
@@ -71,46 +267,63 @@ class BlogViewsApi(APIView):
             400: openapi.Response(description="Bad request - Invalid parameters"),
         },
     )
-    def get(self, request):
+    async def get(self, request):
         input_serializer = self.InputSerializer(data=request.query_params)
         input_serializer.is_valid(raise_exception=True)
 
-        validated_data = cast(dict[str, str | None], input_serializer.validated_data)
+        validated_data = cast(dict[str, Any], input_serializer.validated_data)
 
-        filters = None
-        filters_str = validated_data.get("filters")
-        if filters_str:
-            try:
-                filters = json.loads(filters_str)
-            except json.JSONDecodeError:
-                raise serializers.ValidationError({"filters": "Invalid JSON format"})
+        return await self.respond(validated_data)
+
+    @classmethod
+    def fetch(cls, validated_data: dict[str, Any]) -> dict[str, Any]:
+        """Result rows and meta for validated input (also used by BatchApi)."""
+        # Validated and canonicalized; repeated filters are compiled once (see filter_plan)
+        filters = filter_plan(validated_data.get("filters")).tree or None
 
         data = blog_views_get_grouped_metrics(
             object_type=cast(Literal["country", "user"], validated_data["object_type"]),
             range_type=cast(Literal["month", "week", "year"], validated_data["range"]),
             filters=filters,
+            approx=validated_data["approx"],
+            page_size=validated_data.get("page_size"),
+            cursor=validated_data.get("cursor") or None,
         )
 
-        output_serializer = self.OutputSerializer(data, many=True)
+        return {"result": data, "meta": data.meta}
 
-        return Response(data=output_serializer.data, status=status.HTTP_200_OK)
+    @classmethod
+    def versions(cls, validated_data: dict[str, Any]) -> set[ResultVersion]:
+        return blog_views_versions(
+            range_type=cast(Literal["month", "week", "year"], validated_data["range"]),
+            filters=filter_plan(validated_data.get("filters")).tree or None,
+        )
 
 
-class TopApi(APIView):
+class TopApi(ExplainableApi):
     class InputSerializer(serializers.Serializer):
         top = serializers.ChoiceField(choices=["user", "country", "blog"], required=True)
         start_date = serializers.CharField(required=False, allow_blank=True, allow_null=True)
         end_date = serializers.CharField(required=False, allow_blank=True, allow_null=True)
         filters = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+        approx = serializers.BooleanField(required=False, default=False)
+        window = serializers.RegexField(r"^(all|7d|30d|90d|\d{4}-(0[1-9]|1[0-2]))$", required=False)
+        limit = serializers.IntegerField(required=False, min_value=1, max_value=settings.ANALYTICS_TOP_MAX_LIMIT)
+        cursor = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+        explain = serializers.BooleanField(required=False, default=False)
 
-    class OutputSerializer(serializers.Serializer):
-        x = serializers.IntegerField()
-        y = serializers.IntegerField()
-        z = serializers.IntegerField()
+        def validate(self, attrs):
+            if attrs.get("window") and (attrs.get("start_date") or attrs.get("end_date")):
+                raise serializers.ValidationError({"window": "Use either window or start_date/end_date."})
+            return attrs
 
     @swagger_auto_schema(
         operation_summary="Get top ranked entities",
-        operation_description="Retrieve top 10 ranked entities (users, countries, or blogs) by view count.",
+        operation_description=(
+            "Retrieve the top ranked entities (users, countries, or blogs) by view count, 10 by default. "
+            "Pass meta.next_cursor as `cursor` to page further down the ranking. Without filters, standard "
+            "windows (all-time, last 7/30/90 days, calendar months) are served from maintained leaderboards."
+        ),
         manual_parameters=[
             openapi.Parameter(
                 "top",
@@ -141,6 +354,42 @@ class TopApi(APIView):
                 type=openapi.TYPE_STRING,
                 required=False,
             ),
+            openapi.Parameter(
+                "approx",
+                openapi.IN_QUERY,
+                description=(
+                    "Estimate distinct counts from HyperLogLog sketches (only without filters). "
+                    "The relative error bound is reported in meta.error_bound"
+                ),
+                type=openapi.TYPE_BOOLEAN,
+                required=False,
+            ),
+            openapi.Parameter(
+                "window",
+                openapi.IN_QUERY,
+                description=(
+                    "Standard window instead of start_date/end_date: all, 7d, 30d, 90d (last N days "
+                    "including today) or a calendar month as YYYY-MM"
+                ),
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+            openapi.Parameter(
+                "limit",
+                openapi.IN_QUERY,
+                description="Entities per page (default 10, capped by ANALYTICS_TOP_MAX_LIMIT)",
+                type=openapi.TYPE_INTEGER,
+                required=False,
+            ),
+            openapi.Parameter(
+                "cursor",
+                openapi.IN_QUERY,
+                description="Opaque cursor from meta.next_cursor of the previous page",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+            EXPLAIN_PARAMETER,
+            FORMAT_PARAMETER,
         ],
         responses={
             200: openapi.Response(
@@ -160,46 +409,64 @@ class TopApi(APIView):
             400: openapi.Response(description="Bad request - Invalid parameters"),
         },
     )
-    def get(self, request):
+    async def get(self, request):
         input_serializer = self.InputSerializer(data=request.query_params)
         input_serializer.is_valid(raise_exception=True)
 
-        validated_data = cast(dict[str, str | None], input_serializer.validated_data)
+        validated_data = cast(dict[str, Any], input_serializer.validated_data)
 
-        filters = None
-        filters_str = validated_data.get("filters")
-        if filters_str:
-            try:
-                filters = json.loads(filters_str)
-            except json.JSONDecodeError:
-                raise serializers.ValidationError({"filters": "Invalid JSON format"})
+        return await self.respond(validated_data)
+
+    @classmethod
+    def fetch(cls, validated_data: dict[str, Any]) -> dict[str, Any]:
+        """Result rows and meta for validated input (also used by BatchApi)."""
+        # Validated and canonicalized; repeated filters are compiled once (see filter_plan)
+        filters = filter_plan(validated_data.get("filters")).tree or None
+        start_date, end_date = cls.bounds(validated_data)
 
         data = top_get_ranked(
             top_type=cast(Literal["user", "country", "blog"], validated_data["top"]),
-            start_date=validated_data.get("start_date"),
-            end_date=validated_data.get("end_date"),
+            start_date=start_date,
+            end_date=end_date,
             filters=filters,
+            approx=validated_data["approx"],
+            limit=validated_data.get("limit"),
+            cursor=validated_data.get("cursor") or None,
         )
 
-        output_serializer = self.OutputSerializer(data, many=True)
+        return {"result": data, "meta": data.meta}
 
-        return Response(data=output_serializer.data, status=status.HTTP_200_OK)
+    @classmethod
+    def versions(cls, validated_data: dict[str, Any]) -> set[ResultVersion]:
+        start_date, end_date = cls.bounds(validated_data)
+        return top_versions(
+            start_date=start_date, end_date=end_date, filters=filter_plan(validated_data.get("filters")).tree or None
+        )
+
+    @staticmethod
+    def bounds(validated_data: dict[str, Any]) -> tuple[str | None, str | None]:
+        """start_date and end_date of validated input, or the bounds of its window."""
+        if validated_data.get("window"):
+            return top_window_bounds(validated_data["window"])
+        return validated_data.get("start_date"), validated_data.get("end_date")
 
 
-class PerformanceApi(APIView):
+class PerformanceApi(ExplainableApi):
     class InputSerializer(serializers.Serializer):
         compare = serializers.ChoiceField(choices=["day", "week", "month", "year"], required=True)
         user_id = serializers.CharField(required=False, allow_blank=True, allow_null=True)
         filters = serializers.CharField(required=False, allow_blank=True, allow_null=True)
-
-    class OutputSerializer(serializers.Serializer):
-        x = serializers.CharField()
-        y = serializers.IntegerField()
-        z = serializers.FloatField()
+        start_date = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+        end_date = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+        explain = serializers.BooleanField(required=False, default=False)
 
     @swagger_auto_schema(
         operation_summary="Get time-series performance metrics",
-        operation_description="Retrieve time-series performance metrics with growth/decline percentages.",
+        operation_description=(
+            "Retrieve time-series performance metrics with growth/decline percentages. The series has "
+            "every period between its bounds, with zero views for periods without any, so each growth "
+            "figure compares a period with the one right before it."
+        ),
         manual_parameters=[
             openapi.Parameter(
                 "compare",
@@ -223,6 +490,28 @@ class PerformanceApi(APIView):
                 type=openapi.TYPE_STRING,
                 required=False,
             ),
+            openapi.Parameter(
+                "start_date",
+                openapi.IN_QUERY,
+                description=(
+                    "First day (YYYY-MM-DD): the series starts with the period containing it. "
+                    "Defaults to the first period with views"
+                ),
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+            openapi.Parameter(
+                "end_date",
+                openapi.IN_QUERY,
+                description=(
+                    "Last day (YYYY-MM-DD): the series ends with the period containing it. "
+                    "Defaults to the last period with views"
+                ),
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+            EXPLAIN_PARAMETER,
+            FORMAT_PARAMETER,
         ],
         responses={
             200: openapi.Response(
@@ -244,19 +533,19 @@ class PerformanceApi(APIView):
             400: openapi.Response(description="Bad request - Invalid parameters"),
         },
     )
-    def get(self, request):
+    async def get(self, request):
         input_serializer = self.InputSerializer(data=request.query_params)
         input_serializer.is_valid(raise_exception=True)
 
-        validated_data = cast(dict[str, str | None], input_serializer.validated_data)
+        validated_data = cast(dict[str, Any], input_serializer.validated_data)
 
-        filters = None
-        filters_str = validated_data.get("filters")
-        if filters_str:
-            try:
-                filters = json.loads(filters_str)
-            except json.JSONDecodeError:
-                raise serializers.ValidationError({"filters": "Invalid JSON format"})
+        return await self.respond(validated_data)
+
+    @classmethod
+    def fetch(cls, validated_data: dict[str, Any]) -> dict[str, Any]:
+        """Result rows and meta for validated input (also used by BatchApi)."""
+        # Validated and canonicalized; repeated filters are compiled once (see filter_plan)
+        filters = filter_plan(validated_data.get("filters")).tree or None
 
         user_id = validated_data.get("user_id")
         if user_id == "":
@@ -266,8 +555,539 @@ class PerformanceApi(APIView):
             compare_type=cast(Literal["day", "week", "month", "year"], validated_data["compare"]),
             user_id=user_id,
             filters=filters,
+            start_date=validated_data.get("start_date") or None,
+            end_date=validated_data.get("end_date") or None,
+        )
+
+        return {"result": data, "meta": data.meta}
+
+    @classmethod
+    def versions(cls, validated_data: dict[str, Any]) -> set[ResultVersion]:
+        return performance_versions(
+            compare_type=cast(Literal["day", "week", "month", "year"], validated_data["compare"]),
+            filters=filter_plan(validated_data.get("filters")).tree or None,
+            start_date=validated_data.get("start_date") or None,
+            end_date=validated_data.get("end_date") or None,
+        )
+
+
+class BatchApi(AsyncAPIView):
+    renderer_classes = [FastJSONRenderer]
+
+    ENDPOINTS: dict[str, Any] = {"blog-views": BlogViewsApi, "top": TopApi, "performance": PerformanceApi}
+
+    class InputSerializer(serializers.Serializer):
+        class Meta:
+            ref_name = "BatchInput"
+
+        filters = serializers.JSONField(required=False, allow_null=True)
+        queries = inline_serializer(
+            many=True,
+            fields={
+                "name": serializers.CharField(max_length=64),
+                "endpoint": serializers.ChoiceField(choices=["blog-views", "top", "performance"]),
+                "params": serializers.DictField(required=False, default=dict),
+            },
+        )
+
+        def validate_queries(self, queries):
+            if not 1 <= len(queries) <= settings.ANALYTICS_BATCH_MAX_QUERIES:
+                raise serializers.ValidationError(f"Send between 1 and {settings.ANALYTICS_BATCH_MAX_QUERIES} queries.")
+            names = [query["name"] for query in queries]
+            if len(set(names)) != len(names):
+                raise serializers.ValidationError("Query names must be unique.")
+            return queries
+
+    @swagger_auto_schema(
+        operation_summary="Run several analytics queries",
+        operation_description=(
+            "Run up to ANALYTICS_BATCH_MAX_QUERIES blog-views, top and performance queries in one request. "
+            "Each query takes the query parameters of its endpoint as `params`; `filters` may be a JSON "
+            "object or string there. Top-level `filters` are combined (AND) with every query's own. "
+            "Identical queries run once, independent ones run concurrently, and all of them read the same "
+            "database snapshot. Results are keyed by query name, each with its own status, meta and timing "
+            "in ms; a failing query does not fail the others."
+        ),
+        request_body=InputSerializer,
+        responses={
+            200: openapi.Response(description="Results by query name"),
+            400: openapi.Response(description="Bad request - Invalid batch or shared filters"),
+        },
+    )
+    async def post(self, request):
+        started = time.perf_counter()
+        input_serializer = self.InputSerializer(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+
+        validated_data = cast(dict[str, Any], input_serializer.validated_data)
+
+        # Parsed and validated once for every query; a bad shared filter fails the batch
+        shared_filters = filter_plan(validated_data.get("filters")).tree
+
+        errors: dict[str, dict[str, Any]] = {}
+        keys: dict[str, str] = {}
+        tasks: dict[str, Callable[[], dict[str, Any]]] = {}
+        for query in validated_data["queries"]:
+            try:
+                key, task = self._prepare(query, shared_filters)
+            except (serializers.ValidationError, ApplicationError) as exc:
+                errors[query["name"]] = {**self._error(exc), "ms": 0.0}
+                continue
+            keys[query["name"]] = key
+            tasks.setdefault(key, task)
+
+        outcomes = await batch_run(tasks=tasks, workers=settings.ANALYTICS_BATCH_WORKERS) if tasks else {}
+
+        results = {}
+        for query in validated_data["queries"]:
+            name = query["name"]
+            if name in errors:
+                results[name] = errors[name]
+                continue
+            outcome = outcomes[keys[name]]
+            if outcome.error is None:
+                results[name] = {"status": "success", **outcome.value, "ms": round(outcome.ms, 2)}
+            else:
+                results[name] = {**self._error(outcome.error), "ms": round(outcome.ms, 2)}
+
+        meta = {
+            "queries": len(results),
+            "executed": len(tasks),
+            "ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+        return Response(data={"result": results, "meta": meta}, status=status.HTTP_200_OK)
+
+    def _prepare(
+        self, query: dict[str, Any], shared_filters: dict[str, Any] | None
+    ) -> tuple[str, Callable[[], dict[str, Any]]]:
+        """Dedup key and task of one query; raises when its params or filters are invalid."""
+        api = self.ENDPOINTS[query["endpoint"]]
+        params = dict(query["params"])
+        trees = [tree for tree in (shared_filters, filter_plan(params.pop("filters", None)).tree) if tree]
+        plan = filter_plan({"and": trees} if len(trees) > 1 else (trees[0] if trees else None))
+
+        input_serializer = api.InputSerializer(data=params)
+        input_serializer.is_valid(raise_exception=True)
+        validated_data = {**cast(dict[str, Any], input_serializer.validated_data), "filters": plan.tree}
+
+        key = json.dumps(
+            {**validated_data, "endpoint": query["endpoint"], "filters": plan.fingerprint}, sort_keys=True, default=str
+        )
+        return key, partial(api.fetch, validated_data)
+
+    @staticmethod
+    def _error(exc: Exception) -> dict[str, Any]:
+        """The error body the exception handler would give the query as a standalone request."""
+        if isinstance(exc, serializers.ValidationError):
+            return {"status": "error", "message": "Invalid parameters", "extra": {"fields": exc.detail}}
+        if isinstance(exc, ApplicationError):
+            return {"status": "error", "message": exc.message, "extra": exc.extra}
+        logger.error(f"Batch query failed: {exc}", exc_info=exc)
+        return {"status": "error", "message": str(exc), "extra": {"exception_type": type(exc).__name__}}
+
+
+class BlogViewBulkApi(AsyncAPIView):
+    parser_classes = [JSONParser, NDJSONParser]
+
+    class OutputSerializer(serializers.Serializer):
+        class Meta:
+            ref_name = "BlogViewBulkOutput"
+
+        accepted = serializers.IntegerField()
+        rejected = serializers.IntegerField()
+        duplicates = serializers.IntegerField()
+        errors = serializers.ListField(child=serializers.DictField())
+
+    @swagger_auto_schema(
+        operation_summary="Bulk ingest blog views",
+        operation_description=(
+            "Record a batch of view events in one request. Send a JSON array (application/json) or one "
+            "event per line (application/x-ndjson). Invalid events are rejected individually; the rest "
+            "are loaded with COPY. Events with an `id` that was already ingested are counted as duplicates, "
+            "so batches can be retried safely."
+        ),
+        request_body=openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                required=["blog"],
+                properties={
+                    "blog": openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_UUID),
+                    "viewer_user": openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_UUID),
+                    "viewer_country": openapi.Schema(type=openapi.TYPE_STRING, description="ISO 3166-1 alpha-2"),
+                    "viewed_at": openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+                    "id": openapi.Schema(
+                        type=openapi.TYPE_STRING,
+                        format=openapi.FORMAT_UUID,
+                        description="Optional client-generated id used to skip duplicates on retry",
+                    ),
+                },
+            ),
+        ),
+        responses={
+            200: openapi.Response(description="Batch processed", schema=OutputSerializer),
+            400: openapi.Response(description="Bad request - Body is not a list or the batch is too large"),
+        },
+    )
+    async def post(self, request):
+        if not isinstance(request.data, list):
+            raise serializers.ValidationError({"events": "Expected a JSON array or NDJSON body"})
+
+        result = await db_run(blog_views_bulk_ingest, events=request.data)
+
+        output_serializer = self.OutputSerializer(result)
+
+        return Response(data=output_serializer.data, status=status.HTTP_200_OK)
+
+
+class BlogViewTrackApi(AsyncAPIView):
+    class InputSerializer(serializers.Serializer):
+        class Meta:
+            ref_name = "BlogViewTrackInput"
+
+        blog = serializers.UUIDField()
+        viewer_user = serializers.UUIDField(required=False, allow_null=True)
+        viewer_country = serializers.CharField(required=False, allow_null=True, min_length=2, max_length=2)
+        viewed_at = serializers.DateTimeField(required=False, allow_null=True)
+
+    class OutputSerializer(serializers.Serializer):
+        class Meta:
+            ref_name = "BlogViewTrackOutput"
+
+        id = serializers.UUIDField()
+
+    @swagger_auto_schema(
+        operation_summary="Track a blog view",
+        operation_description=(
+            "Record one view. The event is queued in the worker's write-behind buffer and written in "
+            "batches, so the response does not wait for the database. Unknown blogs, users or countries "
+            "are dropped at flush time."
+        ),
+        request_body=InputSerializer,
+        responses={
+            202: openapi.Response(description="View queued", schema=OutputSerializer),
+            400: openapi.Response(description="Bad request - Invalid event"),
+            503: openapi.Response(description="Buffer full - retry after the Retry-After delay"),
+        },
+    )
+    async def post(self, request):
+        input_serializer = self.InputSerializer(data=request.data)
+        input_serializer.is_valid(raise_exception=True)
+        validated_data = cast(dict[str, Any], input_serializer.validated_data)
+
+        if validated_data.get("viewer_country"):
+            validated_data["viewer_country"] = validated_data["viewer_country"].upper()
+
+        try:
+            if settings.ANALYTICS_BUFFER_ENABLED:
+                # Only queues the view
+                view_id = blog_view_track(**validated_data)
+            else:
+                view_id = await db_run(blog_view_track, **validated_data)
+        except BufferFullError as exc:
+            raise ServiceUnavailable("View buffer is full, try again later.", wait=1) from exc
+
+        output_serializer = self.OutputSerializer({"id": view_id})
+
+        return Response(data=output_serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+class BlogViewBufferApi(AsyncAPIView):
+    class OutputSerializer(serializers.Serializer):
+        class Meta:
+            ref_name = "BlogViewBufferOutput"
+
+        name = serializers.CharField()
+        depth = serializers.IntegerField()
+        capacity = serializers.IntegerField()
+        running = serializers.BooleanField()
+        enqueued = serializers.IntegerField()
+        flushed = serializers.IntegerField()
+        rejected_full = serializers.IntegerField()
+        failed_flushes = serializers.IntegerField()
+        dropped = serializers.IntegerField()
+        flushes = serializers.IntegerField()
+        flush_seconds_total = serializers.FloatField()
+        flush_seconds_last = serializers.FloatField()
+        flush_seconds_max = serializers.FloatField()
+
+    @swagger_auto_schema(
+        operation_summary="View buffer stats",
+        operation_description=(
+            "Depth and cumulative counters of the write-behind buffer of the worker process that serves the request."
+        ),
+        responses={200: openapi.Response(description="Buffer stats", schema=OutputSerializer)},
+    )
+    async def get(self, request):
+        output_serializer = self.OutputSerializer(view_buffer.stats())
+
+        return Response(data=output_serializer.data, status=status.HTTP_200_OK)
+
+
+class CacheStatsApi(AsyncAPIView):
+    class OutputSerializer(serializers.Serializer):
+        class Meta:
+            ref_name = "CacheStatsOutput"
+
+        hit = serializers.IntegerField()
+        miss = serializers.IntegerField()
+        early_refresh = serializers.IntegerField()
+        early_refresh_coalesced = serializers.IntegerField()
+        coalesced_stale = serializers.IntegerField()
+        coalesced_wait = serializers.IntegerField()
+        lease_timeout = serializers.IntegerField()
+        l1 = inline_serializer(
+            allow_null=True,
+            fields={
+                "entries": serializers.IntegerField(),
+                "bytes": serializers.IntegerField(),
+                "max_bytes": serializers.IntegerField(),
+                "hits": serializers.IntegerField(),
+                "misses": serializers.IntegerField(),
+                "evictions": serializers.IntegerField(),
+                "invalidations": serializers.IntegerField(),
+                "listening": serializers.BooleanField(),
+                "notifications": serializers.IntegerField(),
+            },
         )
 
-        output_serializer = self.OutputSerializer(data, many=True)
+    @swagger_auto_schema(
+        operation_summary="Result cache stats",
+        operation_description=(
+            "Outcomes of cached analytics lookups in the worker process that serves the request. "
+            "coalesced_stale and coalesced_wait count requests that did not recompute a missing "
+            "result because another request was already doing so. l1 holds the counters of the "
+            "per-worker LRU in front of the shared cache (null when the cache is not tiered)."
+        ),
+        responses={200: openapi.Response(description="Cache stats", schema=OutputSerializer)},
+    )
+    async def get(self, request):
+        output_serializer = self.OutputSerializer(cache_stats())
 
         return Response(data=output_serializer.data, status=status.HTTP_200_OK)
+
+
+class DatabasePoolApi(AsyncAPIView):
+    class OutputSerializer(serializers.Serializer):
+        class Meta:
+            ref_name = "DatabasePoolOutput"
+
+        size = serializers.IntegerField()
+        timeout_seconds = serializers.FloatField()
+        in_use = serializers.IntegerField()
+        waiting = serializers.IntegerField()
+        saturation = serializers.FloatField()
+        peak_in_use = serializers.IntegerField()
+        checkouts = serializers.IntegerField()
+        timeouts = serializers.IntegerField()
+        wait_seconds_total = serializers.FloatField()
+        wait_seconds_max = serializers.FloatField()
+        replicas = serializers.DictField(
+            child=inline_serializer(
+                fields={
+                    "weight": serializers.IntegerField(),
+                    "healthy": serializers.BooleanField(),
+                    "lag_seconds": serializers.FloatField(),
+                    "ejected_for": serializers.FloatField(),
+                }
+            )
+        )
+
+    @swagger_auto_schema(
+        operation_summary="Database pool stats",
+        operation_description=(
+            "Saturation of the database connection pool of the worker process that serves the request: "
+            "connections in use and requests waiting for one, and cumulative checkouts, checkout "
+            "timeouts (answered with 503) and time spent waiting. replicas holds the health and lag "
+            "of each read replica as last probed by this worker."
+        ),
+        responses={200: openapi.Response(description="Pool stats", schema=OutputSerializer)},
+    )
+    async def get(self, request):
+        output_serializer = self.OutputSerializer({**db_pool.stats(), "replicas": replica_pool.stats()})
+
+        return Response(data=output_serializer.data, status=status.HTTP_200_OK)
+
+
+class ExportApi(AsyncAPIView):
+    COLUMNS = {
+        "views": ["id", "blog", "viewer_user", "viewer_country", "viewed_at"],
+        "blog-views": ["period", "x", "y", "z"],
+        "top": ["x", "y", "z"],
+        "performance": ["x", "y", "z"],
+    }
+
+    class InputSerializer(serializers.Serializer):
+        dataset = serializers.ChoiceField(choices=["views", "blog-views", "top", "performance"], required=True)
+        export_format = serializers.ChoiceField(choices=["csv", "ndjson"], required=False, default="csv")
+        filters = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+        start_date = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+        end_date = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+        object_type = serializers.ChoiceField(choices=["country", "user"], required=False)
+        range = serializers.ChoiceField(choices=["month", "week", "year"], required=False)
+        top = serializers.ChoiceField(choices=["user", "country", "blog"], required=False)
+        compare = serializers.ChoiceField(choices=["day", "week", "month", "year"], required=False)
+        user_id = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+        def validate(self, attrs):
+            required = {
+                "blog-views": ["object_type", "range"],
+                "top": ["top"],
+                "performance": ["compare"],
+            }.get(attrs["dataset"], [])
+            missing = {field: "This field is required for this dataset." for field in required if field not in attrs}
+            if missing:
+                raise serializers.ValidationError(missing)
+            return attrs
+
+    @swagger_auto_schema(
+        operation_summary="Export analytics data",
+        operation_description=(
+            "Stream raw blog views (`views`) or the full output of the blog-views, top or performance "
+            "endpoints as CSV or NDJSON. Rows are read through a database server-side cursor and written "
+            "as they arrive, so exports of any size use constant memory. The response is compressed "
+            "as it streams when the client accepts zstd, br or gzip (`Accept-Encoding`)."
+        ),
+        manual_parameters=[
+            openapi.Parameter(
+                "dataset",
+                openapi.IN_QUERY,
+                description="What to export",
+                type=openapi.TYPE_STRING,
+                enum=["views", "blog-views", "top", "performance"],
+                required=True,
+            ),
+            openapi.Parameter(
+                "export_format",
+                openapi.IN_QUERY,
+                description="Output format",
+                type=openapi.TYPE_STRING,
+                enum=["csv", "ndjson"],
+                required=False,
+            ),
+            openapi.Parameter(
+                "filters",
+                openapi.IN_QUERY,
+                description="Optional JSON string for additional filters",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+            openapi.Parameter(
+                "start_date",
+                openapi.IN_QUERY,
+                description="Start date (views, top and performance)",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+            openapi.Parameter(
+                "end_date",
+                openapi.IN_QUERY,
+                description="End date (views, top and performance)",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+            openapi.Parameter(
+                "object_type",
+                openapi.IN_QUERY,
+                description="Group by (blog-views)",
+                type=openapi.TYPE_STRING,
+                enum=["country", "user"],
+                required=False,
+            ),
+            openapi.Parameter(
+                "range",
+                openapi.IN_QUERY,
+                description="Time range for grouping (blog-views)",
+                type=openapi.TYPE_STRING,
+                enum=["month", "week", "year"],
+                required=False,
+            ),
+            openapi.Parameter(
+                "top",
+                openapi.IN_QUERY,
+                description="Type of entity to rank (top)",
+                type=openapi.TYPE_STRING,
+                enum=["user", "country", "blog"],
+                required=False,
+            ),
+            openapi.Parameter(
+                "compare",
+                openapi.IN_QUERY,
+                description="Time period for comparison (performance)",
+                type=openapi.TYPE_STRING,
+                enum=["day", "week", "month", "year"],
+                required=False,
+            ),
+            openapi.Parameter(
+                "user_id",
+                openapi.IN_QUERY,
+                description="Filter by a specific user's blogs (performance)",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+        ],
+        responses={
+            200: openapi.Response(description="CSV or NDJSON stream"),
+            400: openapi.Response(description="Bad request - Invalid parameters"),
+        },
+    )
+    def chunks(self, validated_data: dict[str, Any], filters: Any) -> Generator[bytes, None, None]:
+        """The encoded export; its rows are read as the chunks are."""
+        dataset = validated_data["dataset"]
+        chunk_size = settings.ANALYTICS_EXPORT_CHUNK_SIZE
+        if dataset == "views":
+            rows = blog_views_iter_raw(
+                filters=filters,
+                start_date=validated_data.get("start_date"),
+                end_date=validated_data.get("end_date"),
+                chunk_size=chunk_size,
+            )
+        elif dataset == "blog-views":
+            rows = blog_views_iter_grouped_metrics(
+                object_type=validated_data["object_type"],
+                range_type=validated_data["range"],
+                filters=filters,
+                chunk_size=chunk_size,
+            )
+        elif dataset == "top":
+            rows = top_iter_ranked(
+                top_type=validated_data["top"],
+                start_date=validated_data.get("start_date"),
+                end_date=validated_data.get("end_date"),
+                filters=filters,
+                chunk_size=chunk_size,
+            )
+        else:
+            series = performance_get_time_series(
+                compare_type=validated_data["compare"],
+                user_id=validated_data.get("user_id"),
+                filters=filters,
+                start_date=validated_data.get("start_date") or None,
+                end_date=validated_data.get("end_date") or None,
+            )
+            rows = (row for row in series)
+
+        return export_stream(
+            rows, export_format=validated_data["export_format"], columns=self.COLUMNS[dataset], name=dataset
+        )
+
+    async def get(self, request):
+        input_serializer = self.InputSerializer(data=request.query_params)
+        input_serializer.is_valid(raise_exception=True)
+
+        validated_data = cast(dict[str, Any], input_serializer.validated_data)
+
+        # Validated and canonicalized; repeated filters are compiled once (see filter_plan)
+        filters = filter_plan(validated_data.get("filters")).tree or None
+
+        dataset = validated_data["dataset"]
+        export_format = validated_data["export_format"]
+        if isinstance(request._request, ASGIRequest):
+            # Read on a pool connection, held until the export ends
+            content = await export_started(db_iter(self.chunks, validated_data, filters))
+        else:
+            # Under WSGI the response is read on the request's thread, with its connection
+            content = await sync_to_async(self.chunks)(validated_data, filters)
+        response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[export_format])
+        response["Content-Disposition"] = f'attachment; filename="{dataset}.{export_format}"'
+        return response
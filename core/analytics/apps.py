@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class AnalyticsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core.analytics"
+
+    def ready(self):
+        from django.db.models import Field, ForeignObject
+
+        from core.analytics.lookups import ILikeContains, InArray, InUnnest
+
+        # Relation fields keep their own lookup registry
+        for field_class in (Field, ForeignObject):
+            field_class.register_lookup(InArray)
+            field_class.register_lookup(InUnnest)
+        Field.register_lookup(ILikeContains)
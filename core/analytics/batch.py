@@ -0,0 +1,162 @@
+"""
+Concurrent execution of independent read-only queries against one database snapshot.
+
+The tasks run on the database pool (core.common.db), so they reuse its connections and
+count against DB_POOL_SIZE like any other request's queries. The first worker opens a
+REPEATABLE READ transaction, exports its snapshot (pg_export_snapshot) and starts on
+the tasks. The other workers import that snapshot before running anything, so every
+task sees the same committed data even though they run side by side. Once no task is
+left, the exporting transaction waits for imports in progress, which need it open,
+and turns away workers that have not started.
+
+Workers take tasks from a shared queue, so when the pool is busy a batch runs on the
+connections it gets; a worker that gets none within DB_POOL_TIMEOUT takes no task.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, NamedTuple
+
+from django.db import connection, transaction
+
+from core.common.db import PoolTimeoutError, db_run
+
+
+class BatchOutcome(NamedTuple):
+    value: Any
+    error: Exception | None
+    ms: float
+
+
+class _Imports:
+    """Workers importing the exported snapshot, which the exporter must outlive."""
+
+    def __init__(self):
+        self._importing = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def enter(self) -> bool:
+        """Whether the snapshot can still be imported; if so, `leave` must follow."""
+        with self._condition:
+            if self._closed:
+                return False
+            self._importing += 1
+            return True
+
+    def leave(self) -> None:
+        with self._condition:
+            self._importing -= 1
+            self._condition.notify_all()
+
+    def close(self) -> None:
+        """Turn away workers that have not started importing, and wait for those that have."""
+        with self._condition:
+            self._closed = True
+            self._condition.wait_for(lambda: self._importing == 0)
+
+
+def _timed(task: Callable[[], Any]) -> BatchOutcome:
+    started = time.perf_counter()
+    try:
+        # A savepoint: a failing task leaves the snapshot's transaction usable for the others
+        with transaction.atomic():
+            value = task()
+    except Exception as exc:
+        return BatchOutcome(value=None, error=exc, ms=(time.perf_counter() - started) * 1000)
+    return BatchOutcome(value=value, error=None, ms=(time.perf_counter() - started) * 1000)
+
+
+class _Queue:
+    """The tasks of a batch, taken one at a time by its workers, and their outcomes."""
+
+    def __init__(self, tasks: dict[str, Callable[[], Any]]):
+        self._pending = iter(tasks.items())
+        self._lock = threading.Lock()
+        self.outcomes: dict[str, BatchOutcome] = {}
+        # Set when the request is cancelled: tasks not started yet are skipped
+        self.stopped = threading.Event()
+
+    def drain(self) -> None:
+        while not self.stopped.is_set():
+            with self._lock:
+                item = next(self._pending, None)
+            if item is None:
+                return
+            key, task = item
+            self.outcomes[key] = _timed(task)
+
+
+def _export_and_run(queue: _Queue, *, exported: Future, imports: _Imports, share: bool) -> None:
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            if share:
+                cursor.execute("SELECT pg_export_snapshot()")
+                exported.set_result(cursor.fetchone()[0])
+        queue.drain()
+        # Workers still waiting for a pool connection would find no task left
+        imports.close()
+
+
+def _import_and_run(queue: _Queue, *, snapshot: str, imports: _Imports) -> None:
+    if not imports.enter():
+        return
+    with transaction.atomic():
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+                cursor.execute("SET TRANSACTION SNAPSHOT %s", [snapshot])
+        finally:
+            imports.leave()
+        queue.drain()
+
+
+async def batch_run(*, tasks: dict[str, Callable[[], Any]], workers: int) -> dict[str, BatchOutcome]:
+    """
+    Run independent read-only tasks, up to `workers` at a time, all on one database snapshot.
+
+    A task that raises does not affect the others: its outcome carries the exception.
+
+    Args:
+        tasks: Sync callables to run, by key
+        workers: Maximum number of tasks running at once, each on a pool connection
+
+    Returns:
+        The outcome of every task, by key and in the order of `tasks`
+
+    Raises:
+        PoolTimeoutError: Not even the first worker got a pool connection within DB_POOL_TIMEOUT
+    """
+    queue = _Queue(tasks)
+    helpers = max(min(workers, len(tasks)) - 1, 0)
+    exported: Future = Future()
+    imports = _Imports()
+
+    async def export() -> None:
+        try:
+            await db_run(_export_and_run, queue, exported=exported, imports=imports, share=helpers > 0)
+        except BaseException as exc:
+            if not exported.done():
+                exported.set_exception(exc)
+            raise
+
+    async def helper() -> None:
+        try:
+            snapshot = await asyncio.wrap_future(exported)
+            await db_run(_import_and_run, queue, snapshot=snapshot, imports=imports)
+        except PoolTimeoutError:
+            # The workers that did get a connection run this one's share
+            pass
+
+    try:
+        results = await asyncio.gather(export(), *(helper() for _ in range(helpers)), return_exceptions=True)
+    except asyncio.CancelledError:
+        queue.stopped.set()
+        raise
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return {key: queue.outcomes[key] for key in tasks}
@@ -0,0 +1,191 @@
+"""
+In-process write-behind buffer.
+
+Each worker process owns its own buffer. Items are appended under a lock and a
+background thread hands them to the flush callable in batches, either once
+`max_batch` items are waiting or once the oldest item is `max_age` seconds old.
+The thread is started on first use, so a buffer created before a pre-fork
+(`preload_app = True`) never carries a thread across the fork.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List
+
+from django.db import close_old_connections, connection
+
+logger = logging.getLogger(__name__)
+
+
+class BufferFullError(Exception):
+    """Raised by `add` when the buffer is at capacity or shutting down."""
+
+
+class WriteBehindBuffer:
+    def __init__(
+        self,
+        *,
+        name: str,
+        flush: Callable[[List[Any]], Any],
+        max_batch: int,
+        max_age: float,
+        capacity: int,
+    ):
+        if max_batch > capacity:
+            raise ValueError("max_batch cannot exceed capacity")
+        self.name = name
+        self.max_batch = max_batch
+        self.max_age = max_age
+        self.capacity = capacity
+        self._flush_callable = flush
+
+        self._items: Deque[Any] = deque()
+        self._oldest: float | None = None
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._closing = False
+        self._atexit_registered = False
+
+        self._counters: Dict[str, float] = {
+            "enqueued": 0,
+            "flushed": 0,
+            "rejected_full": 0,
+            "failed_flushes": 0,
+            "dropped": 0,
+            "flushes": 0,
+            "flush_seconds_total": 0.0,
+            "flush_seconds_last": 0.0,
+            "flush_seconds_max": 0.0,
+        }
+
+    def add(self, item: Any) -> None:
+        """
+        Queue one item for the next flush.
+
+        Raises:
+            BufferFullError: when `capacity` items are already waiting or the buffer is closing
+        """
+        with self._cond:
+            if self._closing or len(self._items) >= self.capacity:
+                self._counters["rejected_full"] += 1
+                raise BufferFullError(f"{self.name} buffer is full")
+
+            self._ensure_started()
+            self._items.append(item)
+            self._counters["enqueued"] += 1
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+                self._cond.notify()
+            elif len(self._items) >= self.max_batch:
+                self._cond.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current depth plus cumulative counters for this process."""
+        with self._cond:
+            return {
+                "name": self.name,
+                "depth": len(self._items),
+                "capacity": self.capacity,
+                "running": self._thread is not None and self._thread.is_alive(),
+                **self._counters,
+            }
+
+    def close(self, timeout: float | None = None) -> int:
+        """
+        Stop accepting items and flush what is queued.
+
+        Args:
+            timeout: Seconds to wait for the flusher to drain, None waits indefinitely
+
+        Returns:
+            Number of items still queued when the wait ended
+        """
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+            thread = self._thread
+
+        if thread is not None:
+            thread.join(timeout)
+
+        with self._cond:
+            remaining = len(self._items)
+        if remaining:
+            logger.warning(f"{self.name} buffer closed with {remaining} unflushed items")
+        return remaining
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-flusher", daemon=True)
+        self._thread.start()
+        if not self._atexit_registered:
+            atexit.register(self.close)
+            self._atexit_registered = True
+
+    def _seconds_until_due(self) -> float | None:
+        if self._oldest is None:
+            return None
+        return max(0.0, self._oldest + self.max_age - time.monotonic())
+
+    def _take_batch(self) -> List[Any]:
+        size = min(len(self._items), self.max_batch)
+        batch = [self._items.popleft() for _ in range(size)]
+        self._oldest = time.monotonic() if self._items else None
+        return batch
+
+    def _run(self) -> None:
+        try:
+            while True:
+                with self._cond:
+                    while not self._closing and len(self._items) < self.max_batch:
+                        wait = self._seconds_until_due()
+                        if wait == 0.0:
+                            break
+                        self._cond.wait(wait)
+
+                    if self._closing and not self._items:
+                        return
+                    batch = self._take_batch()
+
+                if self._flush(batch):
+                    continue
+
+                with self._cond:
+                    if self._closing:
+                        # Out of time to wait for the database; do not spin until killed
+                        self._counters["dropped"] += len(self._items)
+                        self._items.clear()
+                        return
+                    # Back off before retrying; close() still wakes the thread
+                    self._cond.wait(self.max_age)
+        finally:
+            connection.close()
+
+    def _flush(self, batch: List[Any]) -> bool:
+        close_old_connections()
+        started = time.perf_counter()
+        try:
+            self._flush_callable(batch)
+        except Exception:
+            logger.exception(f"Failed to flush {len(batch)} items from the {self.name} buffer")
+            with self._cond:
+                self._counters["failed_flushes"] += 1
+                # Put the batch back in front so a transient failure loses nothing
+                room = self.capacity - len(self._items)
+                self._counters["dropped"] += max(0, len(batch) - room)
+                self._items.extendleft(reversed(batch[:room]))
+                self._oldest = time.monotonic() if self._items else None
+            return False
+
+        elapsed = time.perf_counter() - started
+        with self._cond:
+            self._counters["flushed"] += len(batch)
+            self._counters["flushes"] += 1
+            self._counters["flush_seconds_total"] += elapsed
+            self._counters["flush_seconds_last"] = elapsed
+            self._counters["flush_seconds_max"] = max(self._counters["flush_seconds_max"], elapsed)
+        return True
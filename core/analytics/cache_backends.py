@@ -0,0 +1,332 @@
+"""
+Two-tier cache backend.
+
+TieredCache puts a bounded per-process LRU (L1) in front of a shared cache (L2, any
+configured cache alias: Redis in production, a LocMemCache stand-in locally). Only
+values stored under data-versioned keys (see versioned_cache_key) are kept in L1:
+what a key holds is fixed by the data version it embeds, so L1 can answer without
+asking L2. Leases, stale values and every other key go straight to L2, where all
+workers see them.
+
+Each worker process LISTENs on the data version channel, so a version change drops
+the L1 entries it supersedes right away instead of leaving them to age out of the LRU.
+"""
+
+import logging
+import os
+import pickle
+import re
+import select
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Keys written by versioned_cache_key: "<prefix>:<tag letter><version>:<digest>"
+VERSIONED_KEY = re.compile(r"^[^:]+:([a-z])(\d+):[0-9a-f]{32}$")
+
+_MISSING = object()
+
+# Django builds a backend instance per thread; like LocMemCache's store, the L1 and its
+# listener are shared by all instances of one LOCATION in the process
+_tiers: dict[str, tuple["LRUCache", "DataVersionListener | None"]] = {}
+_tiers_lock = threading.Lock()
+
+
+class LRUCache:
+    """Thread-safe LRU of pickled values, bounded by their total size in bytes."""
+
+    def __init__(self, *, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[bytes, float | None, tuple[str, int]]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats: Counter[str] = Counter()
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(key) + len(entry[0])
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+                self._pop(key)
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[0]
+
+    def set(self, key: str, data: bytes, *, timeout: float | None, tag: tuple[str, int]) -> None:
+        size = len(key) + len(data)
+        with self._lock:
+            self._pop(key)
+            if size > self.max_bytes:
+                return
+            expires = None if timeout is None else time.monotonic() + timeout
+            self._entries[key] = (data, expires, tag)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def drop_versions(self, letter: str, below: int) -> int:
+        """Drop entries tagged `letter` with a version lower than `below`; returns how many."""
+        with self._lock:
+            stale = [key for key, (_, _, tag) in self._entries.items() if tag[0] == letter and tag[1] < below]
+            for key in stale:
+                self._pop(key)
+            self._stats["invalidations"] += len(stale)
+            return len(stale)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._stats["hits"],
+                "misses": self._stats["misses"],
+                "evictions": self._stats["evictions"],
+                "invalidations": self._stats["invalidations"],
+            }
+
+
+class DataVersionListener:
+    """
+    Daemon thread that LISTENs for data version notifications and drops superseded L1 entries.
+
+    It holds its own database connection, separate from the ones serving requests, and
+    reconnects with backoff when that connection is lost. After (re)connecting it reads
+    the current versions, since notifications sent while disconnected are lost.
+    """
+
+    def __init__(self, *, l1: LRUCache, database: str = "default"):
+        self.l1 = l1
+        self.database = database
+        self.notifications = 0
+        self.listening = False
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+
+    def ensure_started(self) -> None:
+        # Gunicorn forks workers after the app is loaded: each process needs its own thread
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="cache-l1-listener", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        from core.analytics.caching import DATA_VERSION_CHANNEL
+
+        backoff = 1.0
+        while True:
+            wrapper = connections.create_connection(self.database)
+            try:
+                wrapper.ensure_connection()
+                connection = wrapper.connection
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {DATA_VERSION_CHANNEL}")
+                    cursor.execute("SELECT name, version FROM analytics_dataversion")
+                    for name, version in cursor.fetchall():
+                        self._apply(name, version)
+                self.listening = True
+                backoff = 1.0
+                while True:
+                    if select.select([connection], [], [], 30.0) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notify = connection.notifies.pop(0)
+                        self.notifications += 1
+                        name, _, version = notify.payload.partition(":")
+                        if version.isdigit():
+                            self._apply(name, int(version))
+            except Exception:
+                logger.warning(f"Cache L1 listener lost its connection, retrying in {backoff:.0f}s", exc_info=True)
+            finally:
+                self.listening = False
+                wrapper.close()
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def _apply(self, name: str, version: int) -> None:
+        from core.analytics.caching import VERSION_TAGS
+
+        letter = VERSION_TAGS.get(name)
+        if letter is not None:
+            self.l1.drop_versions(letter, version)
+
+
+class TieredCache(BaseCache):
+    """
+    Cache backend with a per-process LRU (L1) in front of another cache alias (L2).
+
+    Aliases that should not share an L1 need distinct LOCATIONs.
+
+    OPTIONS:
+        L2: Alias of the shared cache (default "shared")
+        L1_MAX_BYTES: Size bound of the LRU, counting pickled values and keys
+        L1_TIMEOUT: Upper bound in seconds on how long L1 keeps an entry
+        LISTEN: Drop superseded entries on data version notifications
+        LISTEN_DATABASE: Database alias the notifications are received on (default "default")
+    """
+
+    def __init__(self, location: str, params: dict[str, Any]):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.l2_alias = options.get("L2", "shared")
+        self.l1_timeout = options.get("L1_TIMEOUT", 300)
+        with _tiers_lock:
+            if location not in _tiers:
+                l1 = LRUCache(max_bytes=options.get("L1_MAX_BYTES", 64 * 1024 * 1024))
+                listener = None
+                if options.get("LISTEN", True):
+                    listener = DataVersionListener(l1=l1, database=options.get("LISTEN_DATABASE", "default"))
+                _tiers[location] = (l1, listener)
+            self.l1, self.listener = _tiers[location]
+
+    @property
+    def l2(self) -> BaseCache:
+        return caches[self.l2_alias]
+
+    def _l1_key(self, key: str, version: int | None) -> tuple[str, tuple[str, int]] | None:
+        match = VERSIONED_KEY.match(key)
+        if match is None:
+            return None
+        return self.make_and_validate_key(key, version=version), (match[1], int(match[2]))
+
+    def _l1_set(self, l1_key: tuple[str, tuple[str, int]], value: Any, timeout: Any) -> None:
+        timeout = self.get_backend_timeout(timeout)
+        if timeout is not None:
+            # Django's backend timeouts are absolute expiry times
+            timeout -= time.time()
+            if timeout <= 0:
+                return
+        timeout = self.l1_timeout if timeout is None else min(timeout, self.l1_timeout)
+        self.l1.set(l1_key[0], pickle.dumps(value, pickle.HIGHEST_PROTOCOL), timeout=timeout, tag=l1_key[1])
+
+    def _l1_get(self, key: str, version: int | None) -> Any:
+        if self.listener is not None:
+            self.listener.ensure_started()
+        l1_key = self._l1_key(key, version)
+        if l1_key is None:
+            return None, _MISSING
+        data = self.l1.get(l1_key[0])
+        return l1_key, _MISSING if data is None else pickle.loads(data)
+
+    def get(self, key, default=None, version=None):
+        l1_key, value = self._l1_get(key, version)
+        if value is not _MISSING:
+            return value
+        value = self.l2.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        if l1_key is not None:
+            self._l1_set(l1_key, value, self.default_timeout)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.l2.set(key, value, timeout=timeout, version=version)
+        l1_key = self._l1_key(key, version)
+        if l1_key is not None:
+            self._l1_set(l1_key, value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.l2.add(key, value, timeout=timeout, version=version)
+        l1_key = self._l1_key(key, version)
+        if added and l1_key is not None:
+            self._l1_set(l1_key, value, timeout)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self.delete_l1(key, version)
+        return self.l2.touch(key, timeout=timeout, version=version)
+
+    def delete(self, key, version=None):
+        self.delete_l1(key, version)
+        return self.l2.delete(key, version=version)
+
+    def delete_l1(self, key: str, version: int | None = None) -> None:
+        l1_key = self._l1_key(key, version)
+        if l1_key is not None:
+            self.l1.delete(l1_key[0])
+
+    def get_many(self, keys, version=None):
+        found = {}
+        missing = []
+        l1_keys = {}
+        for key in keys:
+            l1_key, value = self._l1_get(key, version)
+            if value is _MISSING:
+                missing.append(key)
+                l1_keys[key] = l1_key
+            else:
+                found[key] = value
+        if missing:
+            for key, value in self.l2.get_many(missing, version=version).items():
+                found[key] = value
+                if l1_keys[key] is not None:
+                    self._l1_set(l1_keys[key], value, self.default_timeout)
+        return found
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.l2.set_many(data, timeout=timeout, version=version)
+        for key, value in data.items():
+            l1_key = self._l1_key(key, version)
+            if l1_key is not None and key not in failed:
+                self._l1_set(l1_key, value, timeout)
+        return failed
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self.delete_l1(key, version)
+        self.l2.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None):
+        _, value = self._l1_get(key, version)
+        return value is not _MISSING or self.l2.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self.delete_l1(key, version)
+        return self.l2.incr(key, delta, version=version)
+
+    def decr(self, key, delta=1, version=None):
+        self.delete_l1(key, version)
+        return self.l2.decr(key, delta, version=version)
+
+    def clear(self):
+        self.l1.clear()
+        self.l2.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """L1 counters of this process, and whether its listener is connected."""
+        return {
+            **self.l1.stats(),
+            "listening": bool(self.listener and self.listener.listening),
+            "notifications": self.listener.notifications if self.listener else 0,
+        }
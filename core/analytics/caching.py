@@ -0,0 +1,276 @@
+"""
+Result caching keyed on data versions.
+
+Cache keys embed the DataVersion counter of the tables a result was computed from.
+Database triggers advance the counter when a transaction that wrote to those tables
+commits, so an entry stays valid until the underlying data changes and can be kept
+for ANALYTICS_CACHE_TIMEOUT rather than expiring on a short fixed TTL. Results
+covering only closed periods are keyed on the HISTORY counter instead, which
+survives new views and routine rollup refreshes. Cache errors never fail a request,
+and inside `cache_disabled()` the cache is neither read nor written.
+
+`cache_fetch` adds single-flight recomputation on top: a lease taken with
+`cache.add` (SET NX on a shared backend) lets one caller compute a missing entry
+while the others serve the previous value or wait for the new one, and hot entries
+are refreshed probabilistically before they expire.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from core.analytics.models import DataVersion
+
+logger = logging.getLogger(__name__)
+
+
+def data_version_get(name: str) -> int:
+    """Current value of a DataVersion counter (0 if the row is missing)."""
+    version = DataVersion.objects.filter(name=name).values_list("version", flat=True).first()
+    return version or 0
+
+
+# Channel the data version triggers notify on, with "name:version" payloads
+DATA_VERSION_CHANNEL = "analytics_data_version"
+
+# Prefix of each counter in version tags ("r42"), which is how cache keys embed them
+VERSION_TAGS = {DataVersion.VIEWS: "v", DataVersion.ROLLUPS: "r", DataVersion.HISTORY: "h"}
+
+
+def data_version_tag(name: str) -> str:
+    """Current version of a DataVersion counter as embedded in cache keys, e.g. "r42"."""
+    return f"{VERSION_TAGS[name]}{data_version_get(name)}"
+
+
+def data_version_bump(*names: str) -> None:
+    """
+    Advance DataVersion counters by hand, for changes the triggers cannot see
+    (e.g. attaching or detaching a BlogView partition).
+
+    Like the triggers' bumps, it takes effect when the current transaction commits
+    (migration 0012_dataversion_bump_on_commit), once per counter however often it is called.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT analytics_data_version_mark(VARIADIC %s)", [list(names)])
+
+
+def _params_digest(params: dict[str, Any]) -> str:
+    data = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.md5(data.encode()).hexdigest()
+
+
+def versioned_cache_key(prefix: str, *, version: str, params: dict[str, Any]) -> str:
+    """Cache key for `params` under `prefix`, valid only while the data version is `version`."""
+    return f"{prefix}:{version}:{_params_digest(params)}"
+
+
+# Set while results are computed for inspection rather than served (see cost.explain_queries)
+_disabled: ContextVar[bool] = ContextVar("analytics_cache_disabled", default=False)
+
+
+@contextmanager
+def cache_disabled() -> Iterator[None]:
+    """Compute everything in the block from the database, without reading or writing the cache."""
+    token = _disabled.set(True)
+    try:
+        yield
+    finally:
+        _disabled.reset(token)
+
+
+def cache_get(key: str) -> Any:
+    if _disabled.get():
+        return None
+    try:
+        return cache.get(key)
+    except Exception:
+        logger.warning(f"Cache get failed for {key}", exc_info=True)
+        return None
+
+
+def cache_set(key: str, value: Any, timeout: int) -> None:
+    if _disabled.get():
+        return
+    try:
+        cache.set(key, value, timeout=timeout)
+    except Exception:
+        logger.warning(f"Cache set failed for {key}", exc_info=True)
+
+
+def cache_get_many(keys: list[str]) -> dict[str, Any]:
+    if _disabled.get():
+        return {}
+    try:
+        return cache.get_many(keys)
+    except Exception:
+        logger.warning(f"Cache get_many failed for {len(keys)} keys", exc_info=True)
+        return {}
+
+
+def cache_set_many(values: dict[str, Any], timeout: int) -> None:
+    if _disabled.get():
+        return
+    try:
+        cache.set_many(values, timeout=timeout)
+    except Exception:
+        logger.warning(f"Cache set_many failed for {len(values)} keys", exc_info=True)
+
+
+_stats: Counter[str] = Counter()
+_stats_lock = threading.Lock()
+
+FETCH_EVENTS = (
+    "hit",
+    "miss",
+    "early_refresh",
+    "early_refresh_coalesced",
+    "coalesced_stale",
+    "coalesced_wait",
+    "lease_timeout",
+)
+
+
+def _count(event: str) -> None:
+    with _stats_lock:
+        _stats[event] += 1
+
+
+def cache_stats() -> dict[str, Any]:
+    """
+    Counters of `cache_fetch` outcomes in this process (see FETCH_EVENTS), plus the
+    L1 counters under "l1" when the cache is tiered (see cache_backends.TieredCache).
+    """
+    with _stats_lock:
+        stats: dict[str, Any] = {event: _stats[event] for event in FETCH_EVENTS}
+    tier_stats = getattr(cache, "stats", None)
+    stats["l1"] = tier_stats() if callable(tier_stats) else None
+    return stats
+
+
+def _refresh_due(entry: dict[str, Any]) -> bool:
+    """
+    Probabilistic early expiration: the closer an entry is to expiry and the longer it
+    took to compute, the likelier a read is to refresh it ahead of time.
+    """
+    beta = settings.ANALYTICS_CACHE_EARLY_REFRESH_BETA
+    if beta <= 0:
+        return False
+    # -log(U) for U in (0, 1] is exponentially distributed with mean 1
+    return time.time() - entry["delta"] * beta * math.log(1.0 - random.random()) >= entry["expires"]
+
+
+def _lease_acquire(key: str) -> str | None:
+    """Token of a new recompute lease on `key`, or None when another caller holds it."""
+    token = uuid.uuid4().hex
+    try:
+        acquired = cache.add(f"lease:{key}", token, timeout=settings.ANALYTICS_CACHE_LEASE_SECONDS)
+    except Exception:
+        # Without a working cache there is nothing to coalesce on
+        logger.warning(f"Cache lease failed for {key}", exc_info=True)
+        return token
+    return token if acquired else None
+
+
+def _lease_release(key: str, token: str) -> None:
+    try:
+        if cache.get(f"lease:{key}") == token:
+            cache.delete(f"lease:{key}")
+    except Exception:
+        logger.warning(f"Cache lease release failed for {key}", exc_info=True)
+
+
+def _compute(key: str, stale_key: str, compute: Callable[[], Any], timeout: int) -> Any:
+    started = time.monotonic()
+    value = compute()
+    entry = {"value": value, "delta": time.monotonic() - started, "expires": time.time() + timeout}
+    cache_set(key, entry, timeout=timeout)
+    cache_set(stale_key, entry, timeout=timeout)
+    return value
+
+
+def cache_fetch(
+    prefix: str,
+    *,
+    version: str,
+    params: dict[str, Any],
+    compute: Callable[[], Any],
+    timeout: int,
+) -> Any:
+    """
+    Cached result of `compute()` for `params` at data `version`, recomputed by one caller at a time.
+
+    On a miss the caller that takes the lease computes the entry. Concurrent callers get the
+    latest value stored for `params` under any version when ANALYTICS_CACHE_SERVE_STALE is on,
+    otherwise they poll for the new entry for up to ANALYTICS_CACHE_LOCK_WAIT_SECONDS and then
+    compute it themselves. A hit may also trigger an early refresh (see _refresh_due), during
+    which the other callers keep getting the current value.
+
+    Args:
+        prefix: Cache key prefix of the result type
+        version: Data version tag the result is computed from (see data_version)
+        params: Parameters that identify the result
+        compute: Produces the result on a miss
+        timeout: Cache timeout in seconds
+
+    Returns:
+        The cached or freshly computed result
+    """
+    if _disabled.get():
+        return compute()
+
+    key = versioned_cache_key(prefix, version=version, params=params)
+    stale_key = f"{prefix}:stale:{_params_digest(params)}"
+
+    entry = cache_get(key)
+    if entry is not None:
+        if not _refresh_due(entry):
+            _count("hit")
+            return entry["value"]
+        token = _lease_acquire(key)
+        if token is None:
+            _count("early_refresh_coalesced")
+            return entry["value"]
+        _count("early_refresh")
+        try:
+            return _compute(key, stale_key, compute, timeout)
+        finally:
+            _lease_release(key, token)
+
+    token = _lease_acquire(key)
+    if token is not None:
+        _count("miss")
+        try:
+            return _compute(key, stale_key, compute, timeout)
+        finally:
+            _lease_release(key, token)
+
+    if settings.ANALYTICS_CACHE_SERVE_STALE:
+        stale = cache_get(stale_key)
+        if stale is not None:
+            _count("coalesced_stale")
+            return stale["value"]
+
+    deadline = time.monotonic() + settings.ANALYTICS_CACHE_LOCK_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache_get(key)
+        if entry is not None:
+            _count("coalesced_wait")
+            return entry["value"]
+
+    logger.warning(f"Cache lease on {key} not released in time, computing without it")
+    _count("lease_timeout")
+    return _compute(key, stale_key, compute, timeout)
@@ -0,0 +1,185 @@
+"""
+Admission control for analytics aggregates by their planned cost.
+
+Every endpoint is public and a `filters` payload can defeat every index, so before a
+selector runs an aggregate over raw views or rollups it asks the planner what the
+query would cost (EXPLAIN without ANALYZE, cached per query fingerprint):
+
+- above ANALYTICS_COST_REJECT the request fails with a 400 asking for narrower filters;
+- above ANALYTICS_COST_DOWNGRADE the selector answers from the HyperLogLog sketches
+  instead, when the request can be answered from them;
+- whatever runs is bounded by the endpoint's statement_timeout
+  (ANALYTICS_STATEMENT_TIMEOUTS, milliseconds).
+
+Inside `explain_queries()` nothing is executed or cached: guarded queries are planned,
+recorded with the decision the guard would take, and return no rows.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, NamedTuple
+
+from django.conf import settings
+from django.db import OperationalError, connections, transaction
+from django.db.models import QuerySet
+
+from core.analytics.caching import cache_disabled, cache_get, cache_set, versioned_cache_key
+from core.api.exceptions import ApplicationError
+from core.common.replicas import QUERY_CANCELED
+
+# Index (of a partition) -> the partitioned index it belongs to
+PARENT_INDEX_SQL = """
+SELECT child.relname, parent.relname
+FROM pg_inherits
+JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+WHERE child.relname = ANY(%s)
+"""
+
+
+class QueryCostError(ApplicationError):
+    pass
+
+
+class QueryPlan(NamedTuple):
+    cost: float
+    rows: int
+    # Indexes the plan scans, partition indexes reported as their partitioned parent
+    indexes: list[str]
+    plan: dict[str, Any]
+
+
+class Admission(NamedTuple):
+    plan: QueryPlan
+    downgrade: bool
+
+
+# Plans recorded by explain_queries(); None when queries are executed
+_explained: ContextVar[list[dict[str, Any]] | None] = ContextVar("analytics_explained", default=None)
+
+
+@contextmanager
+def explain_queries() -> Iterator[list[dict[str, Any]]]:
+    """Plan the guarded queries of the block instead of running them, bypassing the result cache."""
+    explained: list[dict[str, Any]] = []
+    token = _explained.set(explained)
+    try:
+        with cache_disabled():
+            yield explained
+    finally:
+        _explained.reset(token)
+
+
+def _plan_nodes(node: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def query_plan(queryset: QuerySet) -> QueryPlan:
+    """The planner's estimate for `queryset`, on the database it reads from."""
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        root = cursor.fetchone()[0][0]["Plan"]
+        indexes = {node["Index Name"] for node in _plan_nodes(root) if "Index Name" in node}
+        parents: dict[str, str] = {}
+        if indexes:
+            cursor.execute(PARENT_INDEX_SQL, [list(indexes)])
+            parents = dict(cursor.fetchall())
+    return QueryPlan(
+        cost=root["Total Cost"],
+        rows=root["Plan Rows"],
+        indexes=sorted({parents.get(index, index) for index in indexes}),
+        plan=root,
+    )
+
+
+def query_admit(queryset: QuerySet, *, endpoint: str, fingerprint: str, can_downgrade: bool = False) -> Admission:
+    """
+    Check a query against the cost thresholds before it runs.
+
+    Args:
+        queryset: The query the selector is about to evaluate
+        endpoint: Endpoint name, as in ANALYTICS_STATEMENT_TIMEOUTS
+        fingerprint: Identifies the request the query answers (filters included)
+        can_downgrade: Whether the caller has a cheaper approximate answer
+
+    Returns:
+        The plan, and whether the caller should answer approximately instead
+
+    Raises:
+        QueryCostError: The estimated cost is above ANALYTICS_COST_REJECT
+    """
+    key = versioned_cache_key(
+        "query_cost",
+        version="plan",
+        params={"endpoint": endpoint, "fingerprint": fingerprint, "table": queryset.model._meta.db_table},
+    )
+    plan = cache_get(key)
+    if plan is None:
+        plan = query_plan(queryset)
+        cache_set(key, plan, timeout=settings.ANALYTICS_COST_CACHE_TIMEOUT)
+
+    reject = settings.ANALYTICS_COST_REJECT and plan.cost > settings.ANALYTICS_COST_REJECT
+    downgrade = (
+        can_downgrade and bool(settings.ANALYTICS_COST_DOWNGRADE) and plan.cost > settings.ANALYTICS_COST_DOWNGRADE
+    )
+
+    explained = _explained.get()
+    if explained is not None:
+        explained.append({
+            "endpoint": endpoint,
+            "table": queryset.model._meta.db_table,
+            "cost": plan.cost,
+            "rows": plan.rows,
+            "indexes": plan.indexes,
+            "decision": "reject" if reject else "downgrade" if downgrade else "run",
+            "statement_timeout_ms": settings.ANALYTICS_STATEMENT_TIMEOUTS.get(endpoint, 0),
+            "plan": plan.plan,
+        })
+        return Admission(plan=plan, downgrade=downgrade and not reject)
+
+    if reject:
+        raise QueryCostError(
+            "This query is too expensive to run; narrow the date range or the filters",
+            extra={"cost": plan.cost, "max_cost": settings.ANALYTICS_COST_REJECT},
+        )
+    return Admission(plan=plan, downgrade=downgrade)
+
+
+def query_run(queryset: QuerySet, *, endpoint: str) -> list:
+    """
+    Evaluate an admitted query under the endpoint's statement_timeout.
+
+    Returns no rows inside explain_queries().
+
+    Raises:
+        QueryCostError: The query ran into the statement timeout
+    """
+    if _explained.get() is not None:
+        return []
+    timeout = settings.ANALYTICS_STATEMENT_TIMEOUTS.get(endpoint, 0)
+    if not timeout:
+        return list(queryset)
+
+    connection = connections[queryset.db]
+    nested = connection.in_atomic_block
+    try:
+        # SET LOCAL lasts until the transaction ends, so it needs one of its own
+        with transaction.atomic(using=queryset.db):
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL statement_timeout = %s", [timeout])
+            rows = list(queryset)
+            if nested:
+                # A savepoint does not scope SET LOCAL: leave the rest of the transaction unbounded
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL statement_timeout = DEFAULT")
+            return rows
+    except OperationalError as exc:
+        if getattr(exc.__cause__, "pgcode", None) != QUERY_CANCELED:
+            raise
+        raise QueryCostError(
+            "This query ran too long; narrow the date range or the filters",
+            extra={"statement_timeout_ms": timeout},
+        ) from exc
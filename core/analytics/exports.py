@@ -0,0 +1,104 @@
+"""
+Streaming export encoders.
+
+Rows are encoded into CSV or NDJSON and handed out in chunks of roughly
+CHUNK_BYTES, so a StreamingHttpResponse never holds more than one chunk of an
+export in memory. Compression is left to core.api.middleware.CompressionMiddleware,
+which compresses the chunks as they stream.
+"""
+
+import csv
+import io
+import json
+import logging
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, Generator, Iterable, Literal, Sequence
+
+logger = logging.getLogger(__name__)
+
+ExportFormat = Literal["csv", "ndjson"]
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+CHUNK_BYTES = 64 * 1024
+
+
+def _encode_csv(rows: Iterable[Dict[str, Any]], columns: Sequence[str]) -> Generator[bytes, None, None]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _encode_ndjson(rows: Iterable[Dict[str, Any]]) -> Generator[bytes, None, None]:
+    lines: list[str] = []
+    size = 0
+    for row in rows:
+        line = json.dumps(row, separators=(",", ":"), default=str)
+        lines.append(line)
+        size += len(line) + 1
+        if size >= CHUNK_BYTES:
+            yield ("\n".join(lines) + "\n").encode()
+            lines, size = [], 0
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def export_stream(
+    rows: Generator[Dict[str, Any], None, None],
+    *,
+    export_format: ExportFormat,
+    columns: Sequence[str],
+    name: str = "export",
+) -> Generator[bytes, None, None]:
+    """
+    Encode `rows` into byte chunks.
+
+    Closing the returned generator (e.g. when the client disconnects and the
+    server closes the response) closes `rows` too, which releases its
+    server-side cursor.
+    """
+    chunks = _encode_csv(rows, columns) if export_format == "csv" else _encode_ndjson(rows)
+
+    sent = 0
+    try:
+        for chunk in chunks:
+            sent += len(chunk)
+            yield chunk
+    except GeneratorExit:
+        logger.info(f"Export {name} stopped after {sent} bytes, client went away")
+        raise
+    finally:
+        chunks.close()
+        rows.close()
+
+
+async def export_started(chunks: AsyncGenerator[bytes, None]) -> AsyncIterator[bytes]:
+    """
+    Wait for the first chunk of an async export, then hand out all of its chunks.
+
+    The first chunk runs the export's query, so an export that cannot start (no free
+    database connection, invalid parameters) raises here, while the view can still
+    answer with an error instead of a truncated stream.
+    """
+    first = await anext(chunks, None)
+
+    async def resumed() -> AsyncIterator[bytes]:
+        try:
+            if first is not None:
+                yield first
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    return resumed()
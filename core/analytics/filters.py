@@ -1,6 +1,24 @@
-from typing import Any, Dict
+import hashlib
+import json
+import uuid
+from datetime import datetime, time
+from functools import lru_cache
+from typing import Any, Callable, Dict, NamedTuple
 
+from django.conf import settings
 from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from core.api.exceptions import ApplicationError
+
+
+def _in_q(field: str, value: Any) -> Q:
+    """Membership as one array parameter; lists past ANALYTICS_FILTER_IN_JOIN_THRESHOLD become a semi-join."""
+    if not isinstance(value, list):
+        return Q(**{f"{field}__in": value})
+    lookup = "in_unnest" if len(value) > settings.ANALYTICS_FILTER_IN_JOIN_THRESHOLD else "in_array"
+    return Q(**{f"{field}__{lookup}": value})
 
 
 class DynamicFilterBuilder:
@@ -13,8 +31,9 @@ class DynamicFilterBuilder:
         "gte": lambda field, value: Q(**{f"{field}__gte": value}),
         "lt": lambda field, value: Q(**{f"{field}__lt": value}),
         "lte": lambda field, value: Q(**{f"{field}__lte": value}),
-        "in": lambda field, value: Q(**{f"{field}__in": value}),
-        "contains": lambda field, value: Q(**{f"{field}__icontains": value}),
+        "in": _in_q,
+        # ILIKE rather than icontains' UPPER() LIKE, so trigram indexes on titles and names apply
+        "contains": lambda field, value: Q(**{f"{field}__ilike_contains": value}),
     }
 
     @classmethod
@@ -56,3 +75,283 @@ class DynamicFilterBuilder:
 
         # If no recognized structure, return empty Q
         return Q()
+
+
+LOGICAL_OPERATORS = ("and", "or", "not")
+RANGE_OPERATORS = {"gt", "gte", "lt", "lte"}
+
+
+def _coerce_uuid(value: Any) -> str:
+    return str(uuid.UUID(str(value)))
+
+
+def _coerce_text(value: Any) -> str:
+    if isinstance(value, (dict, list, bool)):
+        raise ValueError
+    return str(value)
+
+
+def _coerce_datetime(value: Any) -> str:
+    """Dates stay dates (they filter from midnight); datetimes become aware ISO strings."""
+    if not isinstance(value, str):
+        raise ValueError
+    if "T" not in value:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError
+        return day.isoformat()
+    dt = parse_datetime(value)
+    if dt is None:
+        raise ValueError
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt.isoformat()
+
+
+# BlogView field paths filters may use, with the coercion and operators each supports
+TEXT_OPERATORS = frozenset(DynamicFilterBuilder.OPERATORS)
+ID_OPERATORS = frozenset({"eq", "ne", "in"})
+TIME_OPERATORS = frozenset({"eq", "ne", "gt", "gte", "lt", "lte", "in"})
+
+FILTER_FIELDS: Dict[str, tuple[Callable[[Any], Any], frozenset[str]]] = {
+    "id": (_coerce_uuid, ID_OPERATORS),
+    "viewed_at": (_coerce_datetime, TIME_OPERATORS),
+    "blog": (_coerce_uuid, ID_OPERATORS),
+    "blog_id": (_coerce_uuid, ID_OPERATORS),
+    "blog__title": (_coerce_text, TEXT_OPERATORS),
+    "blog__created_at": (_coerce_datetime, TIME_OPERATORS),
+    "blog__user": (_coerce_uuid, ID_OPERATORS),
+    "blog__user_id": (_coerce_uuid, ID_OPERATORS),
+    "blog__country": (_coerce_uuid, ID_OPERATORS),
+    "blog__country_id": (_coerce_uuid, ID_OPERATORS),
+    "blog__country__code": (_coerce_text, TEXT_OPERATORS),
+    "blog__country__name": (_coerce_text, TEXT_OPERATORS),
+    "viewer_user": (_coerce_uuid, ID_OPERATORS),
+    "viewer_user_id": (_coerce_uuid, ID_OPERATORS),
+    "viewer_country": (_coerce_uuid, ID_OPERATORS),
+    "viewer_country_id": (_coerce_uuid, ID_OPERATORS),
+    "viewer_country__code": (_coerce_text, TEXT_OPERATORS),
+    "viewer_country__name": (_coerce_text, TEXT_OPERATORS),
+}
+
+
+class FilterPlan(NamedTuple):
+    """
+    A validated filter in canonical form, its fingerprint and its compiled Q.
+
+    Plans are shared between requests through an LRU: neither `tree` nor `q` may be mutated.
+    """
+
+    tree: Dict[str, Any]
+    fingerprint: str
+    q: Q
+
+
+EMPTY_PLAN = FilterPlan(tree={}, fingerprint="", q=Q())
+
+
+def _canonical_json(node: Any) -> str:
+    return json.dumps(node, sort_keys=True, separators=(",", ":"))
+
+
+def _members(node: Dict[str, Any]) -> tuple[str, set] | None:
+    """(field, values) of an eq or in condition on a value (eq None means IS NULL and is left alone)."""
+    if "in" in node:
+        return node["field"], set(node["in"])
+    if node.get("eq") is not None:
+        return node["field"], {node["eq"]}
+    return None
+
+
+def _membership(field: str, values: set) -> Dict[str, Any]:
+    if len(values) == 1:
+        return {"field": field, "eq": next(iter(values))}
+    return {"field": field, "in": sorted(values)}
+
+
+def _bound(value: str) -> datetime:
+    if "T" not in value:
+        return timezone.make_aware(datetime.combine(datetime.fromisoformat(value).date(), time.min))
+    return datetime.fromisoformat(value)
+
+
+def _merge_or(children: list[Dict[str, Any]]) -> list[Dict[str, Any]]:
+    """OR of eq/in conditions on one field becomes a single in."""
+    merged: Dict[str, set] = {}
+    rest = []
+    for child in children:
+        members = _members(child)
+        if members is None:
+            rest.append(child)
+        else:
+            merged.setdefault(members[0], set()).update(members[1])
+    return rest + [_membership(field, values) for field, values in merged.items()]
+
+
+def _merge_and(children: list[Dict[str, Any]]) -> list[Dict[str, Any]]:
+    """
+    AND of eq/in conditions on one field becomes their intersection, ne conditions on
+    one field a single NOT IN, and range bounds on a datetime field the tightest pair.
+    """
+    members: Dict[str, set] = {}
+    excluded: Dict[str, set] = {}
+    lower: Dict[str, tuple[datetime, bool, Dict[str, Any]]] = {}
+    upper: Dict[str, tuple[datetime, bool, Dict[str, Any]]] = {}
+    rest = []
+    for child in children:
+        found = _members(child)
+        field = child.get("field")
+        if found is not None:
+            members[field] = members[field] & found[1] if field in members else found[1]
+        elif child.get("ne") is not None:
+            excluded.setdefault(field, set()).add(child["ne"])
+        elif field in FILTER_FIELDS and FILTER_FIELDS[field][0] is _coerce_datetime and child.keys() & RANGE_OPERATORS:
+            op = next(iter(child.keys() & RANGE_OPERATORS))
+            bound = _bound(child[op])
+            if op in ("gt", "gte"):
+                # At the same bound, gt is the tighter one
+                key = (bound, op == "gt", child)
+                if field not in lower or key[:2] > lower[field][:2]:
+                    lower[field] = key
+            else:
+                key = (bound, op == "lte", child)
+                if field not in upper or key[:2] < upper[field][:2]:
+                    upper[field] = key
+        else:
+            rest.append(child)
+
+    rest.extend(
+        _membership(field, values) if values else {"field": field, "in": []} for field, values in members.items()
+    )
+    for field, values in excluded.items():
+        rest.append(
+            {"field": field, "ne": next(iter(values))} if len(values) == 1 else {"not": [_membership(field, values)]}
+        )
+    rest.extend(bound[2] for bound in (*lower.values(), *upper.values()))
+    return rest
+
+
+def _combine(op: str, children: list[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Flatten nested `op` clauses, merge redundant conditions (see _merge_or and _merge_and),
+    drop duplicates and sort, so equivalent trees compare equal.
+    """
+    flat: list[Dict[str, Any]] = []
+    for child in children:
+        flat.extend(child[op] if child.keys() == {op} else [child])
+    flat = _merge_or(flat) if op == "or" else _merge_and(flat)
+    unique = {_canonical_json(child): child for child in flat if child}
+    if not unique:
+        return {}
+    if len(unique) == 1:
+        return next(iter(unique.values()))
+    return {op: [unique[key] for key in sorted(unique)]}
+
+
+def _canonicalize(node: Any, *, depth: int, clauses: list[int]) -> Dict[str, Any]:
+    if not isinstance(node, dict):
+        raise ApplicationError("Filter conditions must be objects")
+    if not node:
+        # An empty condition matches everything, as DynamicFilterBuilder builds Q() for it
+        return {}
+    if depth > settings.ANALYTICS_FILTER_MAX_DEPTH:
+        raise ApplicationError(f"Filters may nest at most {settings.ANALYTICS_FILTER_MAX_DEPTH} levels deep")
+
+    logical = [op for op in LOGICAL_OPERATORS if op in node]
+    if logical:
+        op = logical[0]
+        if len(node) != 1:
+            raise ApplicationError("A logical filter condition takes exactly one of: and, or, not")
+        if not isinstance(node[op], list):
+            raise ApplicationError(f"'{op}' takes a list of conditions")
+        children = [_canonicalize(child, depth=depth + 1, clauses=clauses) for child in node[op]]
+        if op != "not":
+            return _combine(op, children)
+        # not [a, b] is NOT (a OR b)
+        negated = _combine("or", children)
+        if not negated:
+            return {}
+        if negated.keys() == {"not"}:
+            return negated["not"][0]
+        return {"not": [negated]}
+
+    field = node.get("field")
+    if field not in FILTER_FIELDS:
+        raise ApplicationError(f"Unknown filter field: {field}", extra={"fields": sorted(FILTER_FIELDS)})
+    coerce, operators = FILTER_FIELDS[field]
+    ops = [key for key in node if key != "field"]
+    if len(ops) != 1 or ops[0] not in operators:
+        raise ApplicationError(
+            f"Filter on {field} takes exactly one operator of: {', '.join(sorted(operators))}",
+        )
+
+    clauses[0] += 1
+    if clauses[0] > settings.ANALYTICS_FILTER_MAX_CLAUSES:
+        raise ApplicationError(f"Filters may have at most {settings.ANALYTICS_FILTER_MAX_CLAUSES} conditions")
+
+    op = ops[0]
+    value = node[op]
+    if op == "contains" and field.endswith("__code") and isinstance(value, str) and len(value) == 2:
+        # A whole ISO code (stored upper case) can use the unique index instead of ILIKE
+        op, value = "eq", value.upper()
+    try:
+        if op == "in":
+            if not isinstance(value, list) or len(value) > settings.ANALYTICS_FILTER_MAX_IN_VALUES:
+                raise ValueError
+            value = sorted({coerce(item) for item in value})
+        elif value is not None or op not in ("eq", "ne"):
+            value = coerce(value)
+    except (ValueError, TypeError) as exc:
+        raise ApplicationError(f"Invalid value for {field} {op}: {value!r}") from exc
+    return {"field": field, op: value}
+
+
+@lru_cache(maxsize=settings.ANALYTICS_FILTER_PLAN_CACHE_SIZE)
+def _filter_plan_compile(data: str) -> FilterPlan:
+    try:
+        filter_dict = json.loads(data)
+    except ValueError as exc:
+        raise ApplicationError("Invalid JSON format", extra={"field": "filters"}) from exc
+
+    tree = _canonicalize(filter_dict, depth=1, clauses=[0])
+    if not tree:
+        return EMPTY_PLAN
+    canonical = _canonical_json(tree)
+    return FilterPlan(
+        tree=tree,
+        fingerprint=hashlib.md5(canonical.encode()).hexdigest()[:16],
+        q=DynamicFilterBuilder.build(tree),
+    )
+
+
+def filter_plan(filters: str | Dict[str, Any] | None) -> FilterPlan:
+    """
+    Validate, canonicalize and compile a filter.
+
+    Fields must be in FILTER_FIELDS and values are coerced to their type. The tree is
+    limited to ANALYTICS_FILTER_MAX_DEPTH levels, ANALYTICS_FILTER_MAX_CLAUSES conditions
+    and ANALYTICS_FILTER_MAX_IN_VALUES values per `in`. Nested and/or clauses are
+    flattened, sorted and deduplicated, so equivalent filters share a fingerprint.
+
+    Redundant conditions are merged into index-friendly ones on the way: OR-ed
+    equalities on one field into an `in`, AND-ed `ne` into a NOT IN, AND-ed range
+    bounds into the tightest pair, and `contains` on a whole country code into `eq`.
+    `in` compiles to `= ANY(array)`, or to a semi-join on the unnested array past
+    ANALYTICS_FILTER_IN_JOIN_THRESHOLD values.
+    Compiled plans are kept in an LRU keyed on the JSON text, so a repeated filter is
+    not parsed again.
+
+    Args:
+        filters: The `filters` query parameter as JSON text, or an already decoded filter
+
+    Returns:
+        FilterPlan with the canonical tree, its fingerprint and the Q to filter BlogView by
+
+    Raises:
+        ApplicationError: if the filter is malformed or exceeds the limits
+    """
+    if not filters:
+        return EMPTY_PLAN
+    if not isinstance(filters, str):
+        filters = _canonical_json(filters)
+    return _filter_plan_compile(filters)
@@ -0,0 +1,113 @@
+import hashlib
+import math
+import struct
+from typing import Dict, Iterable
+
+DEFAULT_PRECISION = 12
+
+_DENSE = 0
+_SPARSE = 1
+_HEADER = struct.Struct(">BB")
+_SPARSE_ENTRY = struct.Struct(">HB")
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """
+    Mergeable distinct-count sketch.
+
+    Registers are kept sparse (index -> rank) while few are set and switch to a
+    dense bytearray once that is smaller. Sketches with the same precision merge
+    by register-wise max, so per-day sketches combine into any window.
+    """
+
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        if not 4 <= precision <= 16:
+            raise ValueError("HyperLogLog precision must be between 4 and 16")
+        self.precision = precision
+        self.m = 1 << precision
+        self._sparse: Dict[int, int] | None = {}
+        self._dense: bytearray | None = None
+
+    @staticmethod
+    def standard_error(precision: int = DEFAULT_PRECISION) -> float:
+        """Relative standard error of the estimate."""
+        return 1.04 / math.sqrt(1 << precision)
+
+    def _set(self, index: int, rank: int) -> None:
+        if self._dense is not None:
+            if rank > self._dense[index]:
+                self._dense[index] = rank
+            return
+
+        assert self._sparse is not None
+        if rank > self._sparse.get(index, 0):
+            self._sparse[index] = rank
+            # A sparse entry costs 3 bytes, a dense register 1 byte
+            if len(self._sparse) * _SPARSE_ENTRY.size > self.m:
+                self._densify()
+
+    def _densify(self) -> None:
+        assert self._sparse is not None
+        dense = bytearray(self.m)
+        for index, rank in self._sparse.items():
+            dense[index] = rank
+        self._dense = dense
+        self._sparse = None
+
+    def _registers(self) -> Iterable[tuple[int, int]]:
+        if self._dense is not None:
+            return ((index, rank) for index, rank in enumerate(self._dense) if rank)
+        assert self._sparse is not None
+        return self._sparse.items()
+
+    def add(self, value: str) -> None:
+        hashed = _hash64(value)
+        index = hashed >> (64 - self.precision)
+        remainder = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remainder.bit_length() + 1
+        self._set(index, rank)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        for index, rank in other._registers():
+            self._set(index, rank)
+        return self
+
+    def count(self) -> int:
+        registers = dict(self._registers())
+        zeros = self.m - len(registers)
+        harmonic = zeros + sum(2.0**-rank for rank in registers.values())
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m * self.m / harmonic
+
+        # Linear counting is more accurate while many registers are still empty
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * math.log(self.m / zeros)
+        return round(estimate)
+
+    def to_bytes(self) -> bytes:
+        if self._dense is not None:
+            return _HEADER.pack(_DENSE, self.precision) + bytes(self._dense)
+
+        assert self._sparse is not None
+        body = b"".join(_SPARSE_ENTRY.pack(index, rank) for index, rank in sorted(self._sparse.items()))
+        return _HEADER.pack(_SPARSE, self.precision) + body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        encoding, precision = _HEADER.unpack_from(data)
+        sketch = cls(precision)
+        body = memoryview(data)[_HEADER.size :]
+
+        if encoding == _DENSE:
+            sketch._dense = bytearray(body)
+            sketch._sparse = None
+        else:
+            for index, rank in _SPARSE_ENTRY.iter_unpack(body):
+                sketch._set(index, rank)
+        return sketch
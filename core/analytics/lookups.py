@@ -0,0 +1,69 @@
+"""
+Index-friendly lookups for PostgreSQL.
+
+Django's `__in` renders one placeholder per value, so every list length is a
+different statement and long lists make long, slow-to-plan SQL. The array lookups
+pass the whole list as a single array parameter instead.
+
+Django's `__icontains` renders `UPPER(field) LIKE UPPER(%s)`, which no index on the
+column can serve. `__ilike_contains` renders `field ILIKE %s`, which a pg_trgm GIN
+index on the column can.
+"""
+
+from typing import Any
+
+from django.db.models import Lookup
+
+
+class _ArrayLookup(Lookup):
+    def get_prep_lookup(self) -> list[Any]:
+        field = self.lhs.output_field
+        return [field.get_prep_value(value) for value in self.rhs]
+
+    def get_db_prep_lookup(self, value: list[Any], connection) -> tuple[str, list[Any]]:
+        field = self.lhs.output_field
+        return "%s", [[field.get_db_prep_value(item, connection, prepared=True) for item in value]]
+
+    def _array_sql(self, compiler, connection) -> tuple[str, str, list[Any]]:
+        lhs_sql, lhs_params = self.process_lhs(compiler, connection)
+        rhs_sql, rhs_params = self.process_rhs(compiler, connection)
+        # Cast explicitly: a list of strings would otherwise be sent as text[]
+        array_sql = f"{rhs_sql}::{self.lhs.output_field.db_type(connection)}[]"
+        return lhs_sql, array_sql, [*lhs_params, *rhs_params]
+
+
+class InArray(_ArrayLookup):
+    """`field = ANY(%s)`: the same SQL for any number of values."""
+
+    lookup_name = "in_array"
+
+    def as_sql(self, compiler, connection):
+        lhs_sql, array_sql, params = self._array_sql(compiler, connection)
+        return f"{lhs_sql} = ANY({array_sql})", params
+
+
+class InUnnest(_ArrayLookup):
+    """
+    `field IN (SELECT unnest(%s))`: a semi-join against the values, which the planner
+    can hash instead of testing each row against every array element.
+    """
+
+    lookup_name = "in_unnest"
+
+    def as_sql(self, compiler, connection):
+        lhs_sql, array_sql, params = self._array_sql(compiler, connection)
+        return f"{lhs_sql} IN (SELECT unnest({array_sql}))", params
+
+
+class ILikeContains(Lookup):
+    """`field ILIKE '%value%'`, with LIKE wildcards in the value escaped."""
+
+    lookup_name = "ilike_contains"
+
+    def get_db_prep_lookup(self, value: str, connection) -> tuple[str, list[str]]:
+        return "%s", [f"%{connection.ops.prep_for_like_query(value)}%"]
+
+    def as_sql(self, compiler, connection):
+        lhs_sql, lhs_params = self.process_lhs(compiler, connection)
+        rhs_sql, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs_sql} ILIKE {rhs_sql}", [*lhs_params, *rhs_params]
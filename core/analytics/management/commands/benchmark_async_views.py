@@ -0,0 +1,110 @@
+import asyncio
+import statistics
+import time
+from itertools import cycle, islice
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand
+from django.test import AsyncRequestFactory, override_settings
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.analytics.apis import BlogViewsApi, PerformanceApi, TopApi
+
+# One dashboard's worth of requests, replayed round-robin
+REQUESTS = [
+    (BlogViewsApi, {"object_type": "country", "range": "month"}),
+    (BlogViewsApi, {"object_type": "user", "range": "week"}),
+    (BlogViewsApi, {"object_type": "country", "range": "year"}),
+    (TopApi, {"top": "user"}),
+    (TopApi, {"top": "country"}),
+    (TopApi, {"top": "blog"}),
+    (PerformanceApi, {"compare": "day"}),
+    (PerformanceApi, {"compare": "week"}),
+    (PerformanceApi, {"compare": "month"}),
+]
+
+# Measure the database work, not the result cache
+NO_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+    "shared": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+}
+
+
+def _sync_view(api: type[APIView]):
+    """`api` as it was before: a sync APIView, which ASGI runs on the one thread-sensitive executor."""
+
+    class SyncApi(api):  # type: ignore[valid-type,misc]
+        dispatch = APIView.dispatch
+
+        def get(self, request):
+            input_serializer = self.InputSerializer(data=request.query_params)
+            input_serializer.is_valid(raise_exception=True)
+            return Response(data=self.fetch(input_serializer.validated_data))
+
+    return SyncApi.as_view()
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay analytics requests concurrently within one process, as one ASGI worker would serve them, "
+        "with the sync views (thread-sensitive executor) and with the async views (database thread pool). "
+        "The result cache is bypassed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=450, help="Requests per run")
+        parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight at once")
+
+    def handle(self, *args, **options):
+        factory = AsyncRequestFactory()
+        requests = [(api, factory.get("/", params)) for api, params in islice(cycle(REQUESTS), options["requests"])]
+        views = {api: (_sync_view(api), api.as_view()) for api, _ in REQUESTS}
+
+        async def serve_sync(api, request):
+            # What Django's ASGI handler does with a sync view and its deferred rendering
+            response = await sync_to_async(views[api][0], thread_sensitive=True)(request)
+            return await sync_to_async(response.render, thread_sensitive=True)()
+
+        async def serve_async(api, request):
+            response = await views[api][1](request)
+            return await sync_to_async(response.render, thread_sensitive=True)()
+
+        with override_settings(CACHES=NO_CACHE):
+            results = {}
+            for mode, serve in (("sync", serve_sync), ("async", serve_async)):
+                # Warm up connections and code paths before timing
+                asyncio.run(self._run(serve, requests[: len(REQUESTS)], options["concurrency"]))
+                results[mode] = asyncio.run(self._run(serve, requests, options["concurrency"]))
+
+        self.stdout.write(f"{'mode':<6} {'req/s':>8} {'p50':>9} {'p95':>9} {'errors':>7}")
+        for mode, result in results.items():
+            self.stdout.write(
+                f"{mode:<6} {result['throughput']:>8.1f} {result['p50']:>7.1f}ms {result['p95']:>7.1f}ms "
+                f"{result['errors']:>7}"
+            )
+        self.stdout.write(f"Speedup: {results['async']['throughput'] / results['sync']['throughput']:.2f}x")
+
+    async def _run(self, serve, requests, concurrency: int) -> dict:
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        errors = 0
+
+        async def one(api, request):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                response = await serve(api, request)
+                latencies.append((time.perf_counter() - started) * 1000)
+                errors += response.status_code != 200
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(api, request) for api, request in requests))
+        elapsed = time.perf_counter() - started
+        latencies.sort()
+        return {
+            "throughput": len(requests) / elapsed,
+            "p50": statistics.median(latencies),
+            "p95": latencies[int(len(latencies) * 0.95) - 1],
+            "errors": errors,
+        }
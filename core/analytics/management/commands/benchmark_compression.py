@@ -0,0 +1,75 @@
+import csv
+import io
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.analytics.exports import CHUNK_BYTES
+from core.analytics.management.commands.benchmark_rendering import grouped_rows
+from core.api.middleware import CODECS, PROFILES
+from core.api.renderers import ROW_RENDERER_CLASSES
+
+
+def _payloads(rows: int, periods: int) -> dict[str, bytes]:
+    """A large page in every available format, and a CSV export of it."""
+    page = grouped_rows(rows, periods)
+    payloads = {
+        renderer_class.format: renderer_class().render(
+            {"result": page, "meta": page.meta}, renderer_class.media_type, {}
+        )
+        for renderer_class in ROW_RENDERER_CLASSES
+    }
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=["x", "y", "z"])
+    writer.writeheader()
+    writer.writerows(page)
+    payloads["export csv"] = buffer.getvalue().encode()
+    return payloads
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare CPU time against bytes saved for each available coding (gzip, br, zstd) and profile on "
+        "synthetic analytics payloads. Exports are compressed the way they stream, chunk by chunk with a "
+        "flush after each."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000, help="Rows in the page")
+        parser.add_argument("--periods", type=int, default=12, help="Periods each user appears in")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the median is reported")
+
+    def handle(self, *args, **options):
+        payloads = _payloads(options["rows"], options["periods"])
+
+        self.stdout.write(
+            f"{'payload':<11} {'coding':<6} {'profile':<8} {'size':>10} {'saved':>7} {'median':>10} {'MB/s':>8}"
+        )
+        for name, payload in payloads.items():
+            self.stdout.write(f"{name:<11} {'-':<6} {'-':<8} {len(payload) / 1024:>6.0f} KiB {'0%':>7}")
+            for coding, codec in CODECS.items():
+                for profile, levels in PROFILES.items():
+                    level = levels[coding]
+                    if name == "export csv":
+                        chunks = [payload[start : start + CHUNK_BYTES] for start in range(0, len(payload), CHUNK_BYTES)]
+
+                        def compress() -> int:
+                            stream = codec(level)  # noqa: B023
+                            return sum(len(stream.compress_chunk(chunk)) for chunk in chunks) + len(stream.finish())  # noqa: B023
+
+                    else:
+
+                        def compress() -> int:
+                            return len(codec.compress(payload, level))  # noqa: B023
+
+                    timings = []
+                    for _ in range(options["repeat"]):
+                        started = time.perf_counter()
+                        size = compress()
+                        timings.append(time.perf_counter() - started)
+                    seconds = statistics.median(timings)
+                    self.stdout.write(
+                        f"{name:<11} {coding:<6} {profile:<8} {size / 1024:>6.0f} KiB {1 - size / len(payload):>7.0%} "
+                        f"{seconds * 1000:>8.1f}ms {len(payload) / seconds / 1e6:>8.0f}"
+                    )
@@ -0,0 +1,83 @@
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from rest_framework import serializers
+
+from core.analytics.selectors import MetricList
+from core.api import renderers
+from core.api.renderers import ROW_RENDERER_CLASSES, CustomJSONRenderer, FastJSONRenderer
+
+
+class RowSerializer(serializers.Serializer):
+    """The output serializer blog-views responses went through before."""
+
+    x = serializers.CharField()
+    y = serializers.IntegerField()
+    z = serializers.IntegerField()
+
+
+def grouped_rows(count: int, periods: int) -> MetricList:
+    """A page of user groupings as blog_views_get_grouped_metrics returns it, each user in every period."""
+    users = [str(uuid.uuid4()) for _ in range(max(count // periods, 1))]
+    return MetricList(
+        ({"x": users[index % len(users)], "y": index % 97, "z": index % 1013} for index in range(count)),
+        meta={"page_size": count, "next_cursor": None},
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Time rendering one large analytics page: output serializer + CustomJSONRenderer (before) against "
+        "rows passed through to FastJSONRenderer, with orjson when installed and with the stdlib encoder, "
+        "and in each of the other row formats (columnar JSON, MessagePack, Arrow) whose packages are installed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000, help="Rows in the page")
+        parser.add_argument("--periods", type=int, default=12, help="Periods each user appears in")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per path; the median is reported")
+
+    def handle(self, *args, **options):
+        rows = grouped_rows(options["rows"], options["periods"])
+        orjson_available = renderers.ORJSON_AVAILABLE
+
+        def before() -> bytes:
+            data = {"result": RowSerializer(rows, many=True).data, "meta": dict(rows.meta)}
+            return CustomJSONRenderer().render(data, "application/json", {})
+
+        def rendered(renderer_class):
+            def render() -> bytes:
+                return renderer_class().render({"result": rows, "meta": rows.meta}, renderer_class.media_type, {})
+
+            return render
+
+        # name -> (render, whether orjson is used)
+        paths = {"serializer": (before, False), "fast (stdlib)": (rendered(FastJSONRenderer), False)}
+        if orjson_available:
+            paths["fast (orjson)"] = (rendered(FastJSONRenderer), True)
+        else:
+            self.stdout.write("orjson is not installed: the fast path uses the stdlib encoder")
+        for renderer_class in ROW_RENDERER_CLASSES[1:]:
+            paths[renderer_class.format] = (rendered(renderer_class), orjson_available)
+
+        results = {}
+        self.stdout.write(f"{'path':<14} {'median':>11} {'size':>13}")
+        for name, (render, use_orjson) in paths.items():
+            renderers.ORJSON_AVAILABLE = use_orjson
+            try:
+                timings = []
+                for _ in range(options["repeat"]):
+                    started = time.perf_counter()
+                    size = len(render())
+                    timings.append((time.perf_counter() - started) * 1000)
+            finally:
+                renderers.ORJSON_AVAILABLE = orjson_available
+            results[name] = statistics.median(timings)
+            self.stdout.write(f"{name:<14} {results[name]:>9.1f}ms {size / 1024:>9.0f} KiB")
+
+        baseline = results["serializer"]
+        for name, ms in results.items():
+            if name != "serializer":
+                self.stdout.write(f"Speedup {name}: {baseline / ms:.1f}x")
@@ -0,0 +1,88 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+WORDS = ["python", "django", "postgres", "travel", "recipes", "startup", "design", "music", "fitness", "finance"]
+
+# The SQL `contains` compiled to before (icontains) and after (ilike_contains) the trigram indexes
+QUERIES = {
+    "icontains": "SELECT count(*) FROM benchmark_blog WHERE UPPER(title::text) LIKE UPPER(%s)",
+    "ilike": "SELECT count(*) FROM benchmark_blog WHERE title ILIKE %s",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Time `contains` title filters on a synthetic blog table, without and with a pg_trgm GIN index. "
+        "The table is temporary: nothing is written to the analytics tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000, help="Rows in the synthetic table")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per query; the median is reported")
+        parser.add_argument(
+            "--term",
+            action="append",
+            dest="terms",
+            help="Search term (repeatable); defaults to a rare, a common and a two-letter term",
+        )
+
+    def handle(self, *args, **options):
+        terms = options["terms"] or ["c0ffee", "django", "go"]
+        with transaction.atomic(), connection.cursor() as cursor:
+            self.stdout.write(f"Generating {options['rows']:,} titles...")
+            cursor.execute(
+                "CREATE TEMPORARY TABLE benchmark_blog (id bigint PRIMARY KEY, title varchar(255) NOT NULL) "
+                "ON COMMIT DROP"
+            )
+            cursor.execute(
+                "INSERT INTO benchmark_blog "
+                "SELECT i, initcap((%s::text[])[1 + i %% %s]) || ' notes ' || md5(i::text) "
+                "FROM generate_series(1, %s) AS i",
+                [WORDS, len(WORDS), options["rows"]],
+            )
+            cursor.execute("ANALYZE benchmark_blog")
+
+            results = {term: {"seq_scan": self._time(cursor, "icontains", term, options["repeat"])} for term in terms}
+
+            started = time.monotonic()
+            cursor.execute("CREATE INDEX benchmark_blog_title_trgm ON benchmark_blog USING gin (title gin_trgm_ops)")
+            cursor.execute("ANALYZE benchmark_blog")
+            self.stdout.write(f"Built the trigram index in {time.monotonic() - started:.1f}s")
+
+            for term in terms:
+                results[term]["trigram"] = self._time(cursor, "ilike", term, options["repeat"])
+
+            self.stdout.write(f"{'term':<12} {'matches':>10} {'icontains':>12} {'ilike+trgm':>12} {'speedup':>8}  plan")
+            for term, result in results.items():
+                before, after = result["seq_scan"], result["trigram"]
+                self.stdout.write(
+                    f"{term:<12} {after['matches']:>10,} {before['ms']:>10.1f}ms {after['ms']:>10.1f}ms "
+                    f"{before['ms'] / max(after['ms'], 0.001):>7.1f}x  {after['plan']}"
+                )
+            self.stdout.write(
+                "Terms shorter than three characters have no trigram to look up, so they still scan the table."
+            )
+
+    def _time(self, cursor, query: str, term: str, repeat: int) -> dict:
+        sql, params = QUERIES[query], [f"%{term}%"]
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            cursor.execute(sql, params)
+            matches = cursor.fetchone()[0]
+            timings.append((time.perf_counter() - started) * 1000)
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return {"ms": statistics.median(timings), "matches": matches, "plan": self._scan(plan[0]["Plan"])}
+
+    def _scan(self, node: dict) -> str:
+        """Node type of the scan at the bottom of a plan."""
+        while node.get("Plans"):
+            node = node["Plans"][0]
+        return node["Node Type"]
@@ -0,0 +1,74 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.analytics.partitions import (
+    partition_attach,
+    partition_detach,
+    partitions_create_ahead,
+    partitions_detach_before,
+    partitions_list,
+)
+
+
+class Command(BaseCommand):
+    help = "Manage the monthly BlogView partitions: create ahead, attach, detach and report sizes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=["create", "detach", "attach", "report"])
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="create: number of future months to pre-create besides the current one (default: 3)",
+        )
+        parser.add_argument(
+            "--before",
+            help="detach: detach every partition for months before this one (YYYY-MM)",
+        )
+        parser.add_argument(
+            "--name",
+            help="detach/attach: a single partition table, e.g. analytics_blogview_p2025_02",
+        )
+
+    def handle(self, *args, **options):
+        action = options["action"]
+
+        try:
+            if action == "create":
+                created = partitions_create_ahead(months=options["months_ahead"])
+                self._report_names("Created", created)
+            elif action == "detach":
+                if options["name"]:
+                    partition_detach(options["name"])
+                    self._report_names("Detached", [options["name"]])
+                elif options["before"]:
+                    month = datetime.strptime(options["before"], "%Y-%m").date()
+                    self._report_names("Detached", partitions_detach_before(month))
+                else:
+                    raise CommandError("detach requires --name or --before")
+            elif action == "attach":
+                if not options["name"]:
+                    raise CommandError("attach requires --name")
+                partition_attach(options["name"])
+                self._report_names("Attached", [options["name"]])
+            else:
+                self._report_sizes()
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+    def _report_names(self, verb, names):
+        if not names:
+            self.stdout.write(f"{verb} nothing")
+        for name in names:
+            self.stdout.write(self.style.SUCCESS(f"{verb} {name}"))
+
+    def _report_sizes(self):
+        partitions = partitions_list()
+        total = sum(partition["size_bytes"] for partition in partitions)
+        for partition in partitions:
+            self.stdout.write(
+                f"{partition['name']:<36} {partition['size_bytes'] / 1024 / 1024:>10.1f} MB "
+                f"{partition['estimated_rows']:>12} rows  {partition['bounds']}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"{len(partitions)} partitions, {total / 1024 / 1024:.1f} MB total"))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from core.analytics.services import rollup_refresh
+
+
+class Command(BaseCommand):
+    help = "Fold new BlogView rows into the daily rollup tables and leaderboards (run periodically, e.g. from cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Discard all rollup rows and re-aggregate every BlogView",
+        )
+
+    def handle(self, *args, **options):
+        result = rollup_refresh(rebuild=options["rebuild"])
+        days = "all" if result["days"] is None else result["days"]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rollups refreshed to {result['watermark'].isoformat()} "
+                f"({days} days, {result['rows']} rows, {result['sketches']} sketches, "
+                f"{result['leaderboard_entries']} leaderboard entries)"
+            )
+        )
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.9 on 2026-10-17 01:40
+
+import uuid
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("analytics", "0003_blogview_analytics_b_viewer__c5f61c_idx_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RollupWatermark",
+            fields=[
+                ("id", models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("name", models.CharField(max_length=64, unique=True)),
+                ("watermark", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Rollup Watermark",
+                "verbose_name_plural": "Rollup Watermarks",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="BlogViewDailyRollup",
+            fields=[
+                ("id", models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("day", models.DateField()),
+                ("view_count", models.PositiveBigIntegerField(default=0)),
+                (
+                    "blog",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="daily_rollups", to="analytics.blog"
+                    ),
+                ),
+                (
+                    "viewer_country",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_rollups",
+                        to="analytics.country",
+                    ),
+                ),
+                (
+                    "viewer_user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_rollups",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Blog View Daily Rollup",
+                "verbose_name_plural": "Blog View Daily Rollups",
+                "ordering": ["-day"],
+                "indexes": [
+                    models.Index(fields=["day", "viewer_country"], name="analytics_b_day_574ec6_idx"),
+                    models.Index(fields=["day", "viewer_user"], name="analytics_b_day_6ae7bc_idx"),
+                    models.Index(fields=["blog", "day"], name="analytics_b_blog_id_271e90_idx"),
+                    models.Index(fields=["viewer_country", "day"], name="analytics_b_viewer__ba01cf_idx"),
+                    models.Index(fields=["viewer_user", "day"], name="analytics_b_viewer__a0be9a_idx"),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("day", "blog", "viewer_country", "viewer_user"),
+                        name="analytics_rollup_day_key",
+                        nulls_distinct=False,
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.9 on 2026-10-17 01:44
+
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("analytics", "0004_rollupwatermark_blogviewdailyrollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BlogViewDailySketch",
+            fields=[
+                ("id", models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("day", models.DateField()),
+                (
+                    "dimension",
+                    models.CharField(
+                        choices=[("blog", "Blog"), ("country", "Country"), ("user", "User")], max_length=16
+                    ),
+                ),
+                ("key", models.CharField(blank=True, max_length=36)),
+                ("view_count", models.PositiveBigIntegerField(default=0)),
+                ("blogs", models.BinaryField(blank=True, null=True)),
+                ("users", models.BinaryField(blank=True, null=True)),
+                ("countries", models.BinaryField(blank=True, null=True)),
+            ],
+            options={
+                "verbose_name": "Blog View Daily Sketch",
+                "verbose_name_plural": "Blog View Daily Sketches",
+                "ordering": ["-day"],
+                "indexes": [
+                    models.Index(fields=["dimension", "day"], name="analytics_b_dimensi_95ffb4_idx"),
+                    models.Index(fields=["day"], name="analytics_b_day_7d9314_idx"),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(fields=("dimension", "key", "day"), name="analytics_sketch_day_key")
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Converts analytics_blogview into a table range-partitioned by month on viewed_at.
+#
+# Postgres requires the partition key in every unique constraint, so the primary key
+# becomes (id, viewed_at). Django's model state is unchanged: `id` is still the pk for
+# the ORM. Secondary indexes and foreign keys are recreated on the parent with their
+# original names and cascade to every partition. Rows are copied in one transaction,
+# so run this during a maintenance window on large tables.
+
+from datetime import date
+
+from django.db import migrations
+
+TABLE = "analytics_blogview"
+MONTHS_AHEAD = 3
+
+
+def _month_add(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _capture_definitions(cursor, table):
+    """Secondary index and foreign key DDL of `table`, with its name still valid after the swap."""
+    cursor.execute(
+        """
+        SELECT pg_get_indexdef(i.indexrelid)
+        FROM pg_index i
+        WHERE i.indrelid = %s::regclass AND NOT i.indisprimary
+        """,
+        [table],
+    )
+    indexes = [row[0] for row in cursor.fetchall()]
+
+    cursor.execute(
+        """
+        SELECT conname, pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = %s::regclass AND contype = 'f'
+        """,
+        [table],
+    )
+    foreign_keys = cursor.fetchall()
+    return indexes, foreign_keys
+
+
+def _swap_table(schema_editor, *, partitioned):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        indexes, foreign_keys = _capture_definitions(cursor, TABLE)
+
+        if partitioned:
+            cursor.execute(f"CREATE TABLE {TABLE}_new (LIKE {TABLE} INCLUDING DEFAULTS) PARTITION BY RANGE (viewed_at)")
+
+            cursor.execute(f"SELECT min(viewed_at) FROM {TABLE}")
+            oldest = cursor.fetchone()[0]
+            today = date.today().replace(day=1)
+            month = oldest.date().replace(day=1) if oldest else today
+            while month <= _month_add(today, MONTHS_AHEAD):
+                upper = _month_add(month, 1)
+                cursor.execute(
+                    f"CREATE TABLE {TABLE}_p{month:%Y_%m} PARTITION OF {TABLE}_new "
+                    f"FOR VALUES FROM ('{month.isoformat()} 00:00+00') TO ('{upper.isoformat()} 00:00+00')"
+                )
+                month = upper
+            cursor.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE}_new DEFAULT")
+        else:
+            cursor.execute(f"CREATE TABLE {TABLE}_new (LIKE {TABLE} INCLUDING DEFAULTS)")
+
+        cursor.execute(f"INSERT INTO {TABLE}_new SELECT * FROM {TABLE}")
+        cursor.execute(f"DROP TABLE {TABLE} CASCADE")
+        cursor.execute(f"ALTER TABLE {TABLE}_new RENAME TO {TABLE}")
+
+        pk_columns = "id, viewed_at" if partitioned else "id"
+        cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY ({pk_columns})")
+        for definition in indexes:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}")
+
+
+def partition_blogview(apps, schema_editor):
+    _swap_table(schema_editor, partitioned=True)
+
+
+def unpartition_blogview(apps, schema_editor):
+    _swap_table(schema_editor, partitioned=False)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("analytics", "0005_blogviewdailysketch"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_blogview, unpartition_blogview),
+    ]
@@ -0,0 +1,28 @@
+# Unlogged staging table for bulk BlogView ingestion (see core.analytics.services.blog_views_bulk_ingest).
+# Rows are COPY'd in tagged with a batch id, merged into analytics_blogview and deleted in the
+# same transaction, so the table is normally empty and skipping WAL for it is safe.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("analytics", "0006_partition_blogview"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE UNLOGGED TABLE analytics_blogview_staging (
+                    batch_id uuid NOT NULL,
+                    id uuid NOT NULL,
+                    blog_id uuid NOT NULL,
+                    viewer_user_id uuid NULL,
+                    viewer_country_id uuid NULL,
+                    viewed_at timestamp with time zone NOT NULL
+                );
+                CREATE INDEX analytics_blogview_staging_batch_idx ON analytics_blogview_staging (batch_id);
+            """,
+            reverse_sql="DROP TABLE analytics_blogview_staging;",
+        ),
+    ]
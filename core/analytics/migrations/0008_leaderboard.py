@@ -0,0 +1,69 @@
+# Generated by Django 5.2.9 on 2026-10-17 01:58
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("analytics", "0007_blogview_staging"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Leaderboard",
+            fields=[
+                ("id", models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "top_type",
+                    models.CharField(
+                        choices=[("user", "User"), ("country", "Country"), ("blog", "Blog")], max_length=16
+                    ),
+                ),
+                ("window", models.CharField(max_length=16)),
+                ("first_day", models.DateField(blank=True, null=True)),
+                ("last_day", models.DateField(blank=True, null=True)),
+                ("size", models.PositiveIntegerField(default=0)),
+                ("complete", models.BooleanField(default=True)),
+            ],
+            options={
+                "verbose_name": "Leaderboard",
+                "verbose_name_plural": "Leaderboards",
+                "ordering": ["top_type", "window"],
+                "indexes": [
+                    models.Index(fields=["top_type", "first_day", "last_day"], name="analytics_l_top_typ_bf4252_idx")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(fields=("top_type", "window"), name="analytics_leaderboard_window_key")
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="LeaderboardEntry",
+            fields=[
+                ("id", models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("key", models.CharField(max_length=36)),
+                ("x", models.PositiveBigIntegerField(default=0)),
+                ("y", models.PositiveBigIntegerField(default=0)),
+                ("z", models.PositiveBigIntegerField(default=0)),
+                (
+                    "leaderboard",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="entries", to="analytics.leaderboard"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Leaderboard Entry",
+                "verbose_name_plural": "Leaderboard Entries",
+                "ordering": ["leaderboard", "-y", "key"],
+                "indexes": [models.Index(fields=["leaderboard", "-y", "key"], name="analytics_leaderboard_rank")],
+            },
+        ),
+    ]
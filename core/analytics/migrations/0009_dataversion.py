@@ -0,0 +1,83 @@
+# Generated by Django 5.2.9 on 2026-10-17 02:01
+#
+# Statement-level triggers advance analytics_dataversion on every write, so bulk paths
+# (COPY + INSERT ... SELECT, raw SQL, TRUNCATE) are covered as well as the ORM. The
+# counter row is updated inside the writing transaction: the new version becomes
+# visible together with the data, and pg_notify is delivered on commit.
+
+import uuid
+
+from django.db import migrations, models
+
+TRIGGERS = {
+    "analytics_blogview": ["views"],
+    "analytics_blog": ["views", "rollups"],
+    "analytics_blogviewdailyrollup": ["rollups"],
+    "analytics_blogviewdailysketch": ["rollups"],
+    "analytics_leaderboardentry": ["rollups"],
+}
+
+BUMP_FUNCTION = """
+CREATE OR REPLACE FUNCTION analytics_data_version_bump() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    counter text;
+    new_version bigint;
+BEGIN
+    FOREACH counter IN ARRAY TG_ARGV LOOP
+        UPDATE analytics_dataversion
+        SET version = version + 1, updated_at = now()
+        WHERE name = counter
+        RETURNING version INTO new_version;
+        PERFORM pg_notify('analytics_data_version', counter || ':' || new_version);
+    END LOOP;
+    RETURN NULL;
+END;
+$$;
+"""
+
+
+def _create_triggers():
+    statements = [
+        "INSERT INTO analytics_dataversion (id, created_at, updated_at, name, version) VALUES "
+        "(gen_random_uuid(), now(), now(), 'views', 1), (gen_random_uuid(), now(), now(), 'rollups', 1)",
+        BUMP_FUNCTION,
+    ]
+    for table, counters in TRIGGERS.items():
+        arguments = ", ".join(f"'{counter}'" for counter in counters)
+        statements.append(
+            f"CREATE TRIGGER {table}_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION analytics_data_version_bump({arguments})"
+        )
+    return statements
+
+
+def _drop_triggers():
+    statements = [f"DROP TRIGGER IF EXISTS {table}_data_version ON {table}" for table in TRIGGERS]
+    statements.append("DROP FUNCTION IF EXISTS analytics_data_version_bump()")
+    return statements
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("analytics", "0008_leaderboard"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DataVersion",
+            fields=[
+                ("id", models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("name", models.CharField(max_length=64, unique=True)),
+                ("version", models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Data Version",
+                "verbose_name_plural": "Data Versions",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.RunSQL(sql=_create_triggers(), reverse_sql=_drop_triggers()),
+    ]
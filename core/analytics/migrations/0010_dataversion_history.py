@@ -0,0 +1,31 @@
+# Adds the "history" data version: it only moves when data in already closed periods
+# changes (late arrivals folded into past days, rollup rebuilds, Blog edits), so cached
+# buckets of closed periods can be kept under it indefinitely.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("analytics", "0009_dataversion"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "INSERT INTO analytics_dataversion (id, created_at, updated_at, name, version) "
+                "VALUES (gen_random_uuid(), now(), now(), 'history', 1)",
+                "DROP TRIGGER analytics_blog_data_version ON analytics_blog",
+                "CREATE TRIGGER analytics_blog_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE "
+                "ON analytics_blog FOR EACH STATEMENT "
+                "EXECUTE FUNCTION analytics_data_version_bump('views', 'rollups', 'history')",
+            ],
+            reverse_sql=[
+                "DROP TRIGGER analytics_blog_data_version ON analytics_blog",
+                "CREATE TRIGGER analytics_blog_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE "
+                "ON analytics_blog FOR EACH STATEMENT "
+                "EXECUTE FUNCTION analytics_data_version_bump('views', 'rollups')",
+                "DELETE FROM analytics_dataversion WHERE name = 'history'",
+            ],
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.9 on 2026-10-17 02:14
+#
+# Trigram GIN indexes for `contains` filters, which compile to ILIKE '%...%'. The
+# indexes are built concurrently so writes to the blog table are not blocked meanwhile.
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("analytics", "0010_dataversion_history"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name="blog",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["title"], name="analytics_blog_title_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="country",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"], name="analytics_country_name_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 5.2.9 on 2026-10-17 03:10
+#
+# Data versions were advanced by an UPDATE of the shared counter row in every writing
+# statement, so the row lock was held until the writer committed and concurrent
+# ingests, buffer flushes and rollup refreshes queued behind one another.
+#
+# The statement triggers now only record which counters a transaction touched, in
+# analytics_dataversion_pending (one row per transaction and counter; inserts from
+# different transactions never conflict). A deferred constraint trigger advances them
+# once when the transaction commits, in name order so concurrent commits lock the
+# counter rows in the same order. Counter rows are now locked for the commit only, and
+# the new version still becomes visible together with the data.
+
+from django.db import migrations
+
+MARK_FUNCTION = """
+CREATE OR REPLACE FUNCTION analytics_data_version_mark(VARIADIC counters text[]) RETURNS void
+LANGUAGE sql AS $$
+    INSERT INTO analytics_dataversion_pending (name)
+    SELECT unnest(counters)
+    ON CONFLICT DO NOTHING
+$$;
+"""
+
+BUMP_FUNCTION = """
+CREATE OR REPLACE FUNCTION analytics_data_version_bump() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM analytics_data_version_mark(VARIADIC TG_ARGV);
+    RETURN NULL;
+END;
+$$;
+"""
+
+COMMIT_FUNCTION = """
+CREATE OR REPLACE FUNCTION analytics_data_version_commit() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    counter text;
+    new_version bigint;
+BEGIN
+    -- The first pending row of a transaction advances all of its counters; the rows
+    -- firing after it find nothing left
+    FOR counter IN
+        SELECT name FROM analytics_dataversion_pending WHERE txid = NEW.txid ORDER BY name
+    LOOP
+        UPDATE analytics_dataversion
+        SET version = version + 1, updated_at = now()
+        WHERE name = counter
+        RETURNING version INTO new_version;
+        PERFORM pg_notify('analytics_data_version', counter || ':' || new_version);
+    END LOOP;
+    DELETE FROM analytics_dataversion_pending WHERE txid = NEW.txid;
+    RETURN NULL;
+END;
+$$;
+"""
+
+# As created by 0009_dataversion
+PREVIOUS_BUMP_FUNCTION = """
+CREATE OR REPLACE FUNCTION analytics_data_version_bump() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    counter text;
+    new_version bigint;
+BEGIN
+    FOREACH counter IN ARRAY TG_ARGV LOOP
+        UPDATE analytics_dataversion
+        SET version = version + 1, updated_at = now()
+        WHERE name = counter
+        RETURNING version INTO new_version;
+        PERFORM pg_notify('analytics_data_version', counter || ':' || new_version);
+    END LOOP;
+    RETURN NULL;
+END;
+$$;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("analytics", "0011_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                # Rows live for one transaction: unlogged, they cost no WAL
+                "CREATE UNLOGGED TABLE analytics_dataversion_pending ("
+                "txid xid8 NOT NULL DEFAULT pg_current_xact_id(), "
+                "name varchar(64) NOT NULL, "
+                "PRIMARY KEY (txid, name))",
+                MARK_FUNCTION,
+                COMMIT_FUNCTION,
+                "CREATE CONSTRAINT TRIGGER analytics_dataversion_pending_commit "
+                "AFTER INSERT ON analytics_dataversion_pending DEFERRABLE INITIALLY DEFERRED "
+                "FOR EACH ROW EXECUTE FUNCTION analytics_data_version_commit()",
+                BUMP_FUNCTION,
+            ],
+            reverse_sql=[
+                PREVIOUS_BUMP_FUNCTION,
+                "DROP TABLE analytics_dataversion_pending",
+                "DROP FUNCTION analytics_data_version_commit()",
+                "DROP FUNCTION analytics_data_version_mark(text[])",
+            ],
+        ),
+    ]
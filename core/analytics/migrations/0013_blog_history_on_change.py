@@ -0,0 +1,32 @@
+# A new blog has no views in any closed period, so inserting one leaves the "history"
+# version alone; only updates, deletes and truncates of blogs can change closed periods
+# (through the fields rollup filters join to).
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("analytics", "0012_dataversion_bump_on_commit"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "DROP TRIGGER analytics_blog_data_version ON analytics_blog",
+                "CREATE TRIGGER analytics_blog_data_version AFTER INSERT "
+                "ON analytics_blog FOR EACH STATEMENT "
+                "EXECUTE FUNCTION analytics_data_version_bump('views', 'rollups')",
+                "CREATE TRIGGER analytics_blog_data_version_history AFTER UPDATE OR DELETE OR TRUNCATE "
+                "ON analytics_blog FOR EACH STATEMENT "
+                "EXECUTE FUNCTION analytics_data_version_bump('views', 'rollups', 'history')",
+            ],
+            reverse_sql=[
+                "DROP TRIGGER analytics_blog_data_version_history ON analytics_blog",
+                "DROP TRIGGER analytics_blog_data_version ON analytics_blog",
+                "CREATE TRIGGER analytics_blog_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE "
+                "ON analytics_blog FOR EACH STATEMENT "
+                "EXECUTE FUNCTION analytics_data_version_bump('views', 'rollups', 'history')",
+            ],
+        ),
+    ]
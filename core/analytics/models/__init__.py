@@ -3,9 +3,17 @@
 from core.analytics.models.blog import Blog
 from core.analytics.models.blogview import BlogView
 from core.analytics.models.country import Country
+from core.analytics.models.leaderboard import Leaderboard, LeaderboardEntry
+from core.analytics.models.rollup import BlogViewDailyRollup, BlogViewDailySketch, DataVersion, RollupWatermark
 
 __all__ = [
     "Blog",
     "BlogView",
+    "BlogViewDailyRollup",
+    "BlogViewDailySketch",
     "Country",
+    "DataVersion",
+    "Leaderboard",
+    "LeaderboardEntry",
+    "RollupWatermark",
 ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 
 from core.common.models import BaseModel
@@ -28,6 +29,8 @@ class Blog(BaseModel):
             models.Index(fields=["user", "-created_at"]),
             models.Index(fields=["country", "-created_at"]),
             models.Index(fields=["user", "country", "-created_at"]),
+            # Serves `contains` filters on the title (ILIKE '%...%')
+            GinIndex(fields=["title"], name="analytics_blog_title_trgm", opclasses=["gin_trgm_ops"]),
         ]
 
     def __str__(self) -> str:
@@ -1,3 +1,4 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 
 from core.common.models import BaseModel
@@ -11,6 +12,10 @@ class Country(BaseModel):
         verbose_name = "Country"
         verbose_name_plural = "Countries"
         ordering = ["name"]
+        indexes = [
+            # Serves `contains` filters on the name (ILIKE '%...%')
+            GinIndex(fields=["name"], name="analytics_country_name_trgm", opclasses=["gin_trgm_ops"]),
+        ]
 
     def __str__(self) -> str:
         return f"{self.name} ({self.code})"
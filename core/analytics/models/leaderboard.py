@@ -0,0 +1,70 @@
+from django.db import models
+
+from core.common.models import BaseModel
+
+
+class Leaderboard(BaseModel):
+    """
+    A maintained top_get_ranked ranking for one top type over a standard window.
+
+    Windows are "all" (no bounds), "7d"/"30d"/"90d" (the last N days up to
+    `last_day`) and calendar months ("YYYY-MM"). Boards are kept up to date from the
+    daily rollup by `leaderboards_refresh` and hold at most ANALYTICS_LEADERBOARD_DEPTH
+    entries; `complete` is False when the ranking was cut at that depth.
+    """
+
+    class TopType(models.TextChoices):
+        USER = "user", "User"
+        COUNTRY = "country", "Country"
+        BLOG = "blog", "Blog"
+
+    top_type = models.CharField(max_length=16, choices=TopType.choices)
+    window = models.CharField(max_length=16)
+    first_day = models.DateField(null=True, blank=True)
+    last_day = models.DateField(null=True, blank=True)
+    size = models.PositiveIntegerField(default=0)
+    complete = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name = "Leaderboard"
+        verbose_name_plural = "Leaderboards"
+        ordering = ["top_type", "window"]
+        constraints = [
+            models.UniqueConstraint(fields=["top_type", "window"], name="analytics_leaderboard_window_key"),
+        ]
+        indexes = [
+            models.Index(fields=["top_type", "first_day", "last_day"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.top_type} {self.window}: {self.size} entries"
+
+
+class LeaderboardEntry(BaseModel):
+    """
+    One ranked entity on a leaderboard, with the same x, y, z as top_get_ranked.
+
+    `key` is the user or blog id, or the country code. Entries are ordered by
+    y descending, then key.
+    """
+
+    leaderboard = models.ForeignKey(
+        "analytics.Leaderboard",
+        on_delete=models.CASCADE,
+        related_name="entries",
+    )
+    key = models.CharField(max_length=36)
+    x = models.PositiveBigIntegerField(default=0)
+    y = models.PositiveBigIntegerField(default=0)
+    z = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Leaderboard Entry"
+        verbose_name_plural = "Leaderboard Entries"
+        ordering = ["leaderboard", "-y", "key"]
+        indexes = [
+            models.Index(fields=["leaderboard", "-y", "key"], name="analytics_leaderboard_rank"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.key}: {self.y} views"
@@ -0,0 +1,138 @@
+from django.db import models
+
+from core.common.models import BaseModel
+
+
+class BlogViewDailyRollup(BaseModel):
+    """
+    Pre-aggregated BlogView counts at day grain.
+
+    Rows are derived from BlogView by `rollup_refresh` and are never written by hand.
+    Week, month and year metrics are computed by truncating `day`.
+    """
+
+    day = models.DateField()
+    blog = models.ForeignKey(
+        "analytics.Blog",
+        on_delete=models.CASCADE,
+        related_name="daily_rollups",
+    )
+    viewer_user = models.ForeignKey(
+        "users.User",
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="daily_rollups",
+    )
+    viewer_country = models.ForeignKey(
+        "analytics.Country",
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="daily_rollups",
+    )
+    view_count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Blog View Daily Rollup"
+        verbose_name_plural = "Blog View Daily Rollups"
+        ordering = ["-day"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "blog", "viewer_country", "viewer_user"],
+                name="analytics_rollup_day_key",
+                nulls_distinct=False,
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["day", "viewer_country"]),
+            models.Index(fields=["day", "viewer_user"]),
+            models.Index(fields=["blog", "day"]),
+            models.Index(fields=["viewer_country", "day"]),
+            models.Index(fields=["viewer_user", "day"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.day} {self.blog_id}: {self.view_count} views"
+
+
+class RollupWatermark(BaseModel):
+    """Highest BlogView.created_at already folded into a rollup."""
+
+    BLOGVIEW_DAILY = "blogview_daily"
+
+    name = models.CharField(max_length=64, unique=True)
+    watermark = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Rollup Watermark"
+        verbose_name_plural = "Rollup Watermarks"
+        ordering = ["name"]
+
+    def __str__(self) -> str:
+        return f"{self.name} @ {self.watermark}"
+
+
+class DataVersion(BaseModel):
+    """
+    Counters advanced by database triggers whenever the data behind analytics results changes.
+
+    VIEWS moves on writes to BlogView and Blog, ROLLUPS on writes to the rollup, sketch
+    and leaderboard tables (and Blog, whose fields rollup filters can join to). HISTORY
+    moves only when rolled-up data of already closed days changes: late arrivals,
+    rebuilds and Blog edits. Cached results embed the version of the tables they were
+    computed from, so they stay valid until that data changes.
+    """
+
+    VIEWS = "views"
+    ROLLUPS = "rollups"
+    HISTORY = "history"
+
+    name = models.CharField(max_length=64, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Data Version"
+        verbose_name_plural = "Data Versions"
+        ordering = ["name"]
+
+    def __str__(self) -> str:
+        return f"{self.name} v{self.version}"
+
+
+class BlogViewDailySketch(BaseModel):
+    """
+    Per-day HyperLogLog sketches of the distinct blogs, users and countries seen
+    for one blog, country or user.
+
+    Each row holds the sketches for the two dimensions other than its own, plus the
+    exact view count. `key` is the related object's id, or "" for views without one.
+    """
+
+    class Dimension(models.TextChoices):
+        BLOG = "blog", "Blog"
+        COUNTRY = "country", "Country"
+        USER = "user", "User"
+
+    day = models.DateField()
+    dimension = models.CharField(max_length=16, choices=Dimension.choices)
+    key = models.CharField(max_length=36, blank=True)
+    view_count = models.PositiveBigIntegerField(default=0)
+    blogs = models.BinaryField(null=True, blank=True)
+    users = models.BinaryField(null=True, blank=True)
+    countries = models.BinaryField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Blog View Daily Sketch"
+        verbose_name_plural = "Blog View Daily Sketches"
+        ordering = ["-day"]
+        constraints = [
+            models.UniqueConstraint(fields=["dimension", "key", "day"], name="analytics_sketch_day_key"),
+        ]
+        indexes = [
+            models.Index(fields=["dimension", "day"]),
+            models.Index(fields=["day"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.day} {self.dimension}={self.key or 'Unknown'}: {self.view_count} views"
@@ -0,0 +1,74 @@
+import base64
+import hashlib
+import json
+import uuid
+from datetime import date
+from typing import Any, Callable, Dict
+
+from core.api.exceptions import ApplicationError
+
+
+def query_fingerprint(**params: Any) -> str:
+    """Short digest of the query parameters a cursor was issued for."""
+    data = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.md5(data.encode()).hexdigest()[:12]
+
+
+def cursor_encode(position: Dict[str, Any], *, fingerprint: str) -> str:
+    """Encode a keyset position as an opaque, URL-safe cursor."""
+    data = json.dumps({"q": fingerprint, **position}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def cursor_decode(cursor: str, *, fingerprint: str, fields: Dict[str, Callable[[Any], Any]]) -> Dict[str, Any]:
+    """
+    Decode a cursor produced by `cursor_encode`.
+
+    The fingerprint only ties a cursor to its query; clients can compute it, so every
+    field of the position is checked and converted with its parser in `fields`
+    (see the cursor_* parsers below) before it reaches a query.
+
+    Raises:
+        ApplicationError: if the cursor is malformed or was issued for a different query
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise ApplicationError("Invalid cursor") from exc
+
+    if not isinstance(position, dict) or position.pop("q", None) != fingerprint:
+        raise ApplicationError("Cursor does not belong to this query")
+    try:
+        return {name: parse(position[name]) for name, parse in fields.items()}
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ApplicationError("Invalid cursor") from exc
+
+
+# Parsers of cursor position fields: each returns the value or raises TypeError or ValueError
+
+
+def cursor_date(value: Any) -> date:
+    if not isinstance(value, str):
+        raise TypeError(value)
+    return date.fromisoformat(value)
+
+
+def cursor_int(value: Any) -> int:
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise TypeError(value)
+    return value
+
+
+def cursor_str(value: Any) -> str:
+    if not isinstance(value, str):
+        raise TypeError(value)
+    return value
+
+
+def cursor_uuid(value: Any) -> str:
+    return str(uuid.UUID(cursor_str(value)))
+
+
+def cursor_optional(parse: Callable[[Any], Any]) -> Callable[[Any], Any]:
+    return lambda value: None if value is None else parse(value)
@@ -0,0 +1,137 @@
+"""
+Monthly range partitions of the BlogView table (see migration 0006_partition_blogview).
+
+Partitions are named `<table>_pYYYY_MM` and cover [first of month, first of next month)
+in UTC. Rows outside every partition land in `<table>_default`.
+"""
+
+import re
+from datetime import date
+from typing import Any, Dict, List
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.analytics.caching import data_version_bump
+from core.analytics.models import BlogView, DataVersion
+from core.analytics.periods import month_add
+
+PARTITION_NAME_RE = re.compile(r"_p(\d{4})_(\d{2})")
+
+
+def _table() -> str:
+    return BlogView._meta.db_table
+
+
+def partition_name(month: date) -> str:
+    return f"{_table()}_p{month:%Y_%m}"
+
+
+def partition_month(name: str) -> date:
+    """Parse the month out of a partition name, rejecting anything that is not one of ours."""
+    match = PARTITION_NAME_RE.fullmatch(name, len(_table()))
+    if not name.startswith(_table()) or not match:
+        raise ValueError(f"{name} is not a monthly partition of {_table()}")
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def _bounds(month: date) -> tuple[str, str]:
+    return f"{month.isoformat()} 00:00+00", f"{month_add(month, 1).isoformat()} 00:00+00"
+
+
+def partitions_list() -> List[Dict[str, Any]]:
+    """Attached partitions with their bounds, on-disk size and estimated row count."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname,
+                   pg_get_expr(c.relpartbound, c.oid),
+                   pg_total_relation_size(c.oid),
+                   GREATEST(c.reltuples, 0)::bigint
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass
+            ORDER BY c.relname
+            """,
+            [_table()],
+        )
+        return [
+            {"name": name, "bounds": bounds, "size_bytes": size, "estimated_rows": rows}
+            for name, bounds, size, rows in cursor.fetchall()
+        ]
+
+
+@transaction.atomic
+def partition_create(month: date) -> bool:
+    """
+    Create the partition for `month` unless it exists.
+
+    Rows for that month already sitting in the default partition are moved into the
+    new table before it is attached, otherwise the attach would be rejected.
+
+    Returns:
+        True if a partition was created
+    """
+    name = partition_name(month)
+    table = _table()
+    lower, upper = _bounds(month)
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [name])
+        if cursor.fetchone()[0] is not None:
+            return False
+
+        cursor.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        cursor.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM {table}_default WHERE viewed_at >= %s AND viewed_at < %s RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+            """,
+            [lower, upper],
+        )
+        cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)", [lower, upper])
+    return True
+
+
+def partitions_create_ahead(*, months: int, today: date | None = None) -> List[str]:
+    """Ensure partitions exist from the current month through `months` months ahead."""
+    current = (today or timezone.now().date()).replace(day=1)
+    created = []
+    for offset in range(months + 1):
+        month = month_add(current, offset)
+        if partition_create(month):
+            created.append(partition_name(month))
+    return created
+
+
+def partition_detach(name: str) -> None:
+    """Detach a partition; it stays behind as a standalone table for archiving or dropping."""
+    partition_month(name)
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {_table()} DETACH PARTITION {name}")
+    # DDL does not fire the data version triggers
+    data_version_bump(DataVersion.VIEWS)
+
+
+def partitions_detach_before(month: date) -> List[str]:
+    """Detach every monthly partition that ends on or before the start of `month`."""
+    detached = []
+    for partition in partitions_list():
+        try:
+            partition_start = partition_month(partition["name"])
+        except ValueError:
+            continue
+        if partition_start < month:
+            partition_detach(partition["name"])
+            detached.append(partition["name"])
+    return detached
+
+
+def partition_attach(name: str) -> None:
+    """Re-attach a previously detached monthly partition table."""
+    lower, upper = _bounds(partition_month(name))
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {_table()} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)", [lower, upper])
+    data_version_bump(DataVersion.VIEWS)
@@ -0,0 +1,33 @@
+from datetime import date, timedelta
+from typing import Literal
+
+Period = Literal["day", "week", "month", "year"]
+
+
+def period_start(day: date, period: Period) -> date:
+    """Truncate a date to the first day of its period (ISO weeks start on Monday)."""
+    if period == "day":
+        return day
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day.replace(month=1, day=1)
+
+
+def month_add(month: date, months: int) -> date:
+    """First day of the month `months` after the month of `month`."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def period_end(day: date, period: Period) -> date:
+    """Last day of the period `day` falls in."""
+    start = period_start(day, period)
+    if period == "day":
+        return start
+    if period == "week":
+        return start + timedelta(days=6)
+    if period == "month":
+        return month_add(start, 1) - timedelta(days=1)
+    return start.replace(month=12, day=31)
@@ -1,109 +1,920 @@
-import hashlib
-import json
-from typing import Any, Dict, List, Literal
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, Iterator, Literal, NamedTuple
 
-from django.core.cache import cache
-from django.db.models import Count
-from django.db.models.functions import TruncDay, TruncMonth, TruncWeek, TruncYear
+from django.conf import settings
+from django.db import connections
+from django.db.models import Aggregate, Count, F, OuterRef, Q, QuerySet, Subquery, Sum, UUIDField, Value
+from django.db.models.functions import Cast, NullIf, TruncDay, TruncMonth, TruncWeek, TruncYear
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 
-from core.analytics.filters import DynamicFilterBuilder
-from core.analytics.models import BlogView
+from core.analytics.caching import (
+    cache_fetch,
+    cache_get,
+    cache_get_many,
+    cache_set,
+    cache_set_many,
+    data_version_tag,
+    versioned_cache_key,
+)
+from core.analytics.cost import query_admit, query_run
+from core.analytics.filters import DynamicFilterBuilder, filter_plan
+from core.analytics.hll import DEFAULT_PRECISION, HyperLogLog
+from core.analytics.models import (
+    BlogView,
+    BlogViewDailyRollup,
+    BlogViewDailySketch,
+    Country,
+    DataVersion,
+    Leaderboard,
+    RollupWatermark,
+)
+from core.analytics.pagination import (
+    cursor_date,
+    cursor_decode,
+    cursor_encode,
+    cursor_int,
+    cursor_optional,
+    cursor_str,
+    cursor_uuid,
+    query_fingerprint,
+)
+from core.analytics.periods import Period, month_add, period_end, period_start
+from core.api.exceptions import ApplicationError
+from core.common.replicas import replica_read
 
+# BlogView relations that exist under the same name on BlogViewDailyRollup
+ROLLUP_FIELD_ROOTS = {"blog", "blog_id", "viewer_user", "viewer_user_id", "viewer_country", "viewer_country_id"}
 
+
+class ResultVersion(NamedTuple):
+    # Data version tag the result was computed at (see data_version)
+    tag: str
+    # Whether the result covers closed days only, so that only HISTORY changes can alter it
+    closed: bool
+
+
+class MetricList(list):
+    """List of metric rows that also carries response metadata (e.g. whether results are approximate)."""
+
+    # Set by the selectors that cache their results; HTTP validators are derived from it
+    version: ResultVersion | None = None
+
+    def __init__(self, rows=(), meta: Dict[str, Any] | None = None):
+        super().__init__(rows)
+        self.meta = meta or {}
+
+
+def _approx_meta() -> Dict[str, Any]:
+    standard_error = HyperLogLog.standard_error(DEFAULT_PRECISION)
+    return {
+        "approx": True,
+        "standard_error": round(standard_error, 4),
+        # Distinct counts are within this relative error with ~95% confidence
+        "error_bound": round(2 * standard_error, 4),
+    }
+
+
+class ViewSource(NamedTuple):
+    """Queryset to aggregate over, plus how to count views and bucket time on it."""
+
+    queryset: QuerySet
+    views: Aggregate
+    time_field: str
+
+
+def _as_day(value: Any) -> date | None:
+    """Return the date for a date string or a midnight timestamp, otherwise None."""
+    if not isinstance(value, str):
+        return None
+    if "T" not in value:
+        return parse_date(value)
+    dt = parse_datetime(value)
+    if dt is None:
+        return None
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    dt = timezone.localtime(dt)
+    return dt.date() if dt.time() == time.min else None
+
+
+def _rollup_filters(filter_dict: Dict[str, Any] | None) -> Dict[str, Any] | None:
+    """
+    Rewrite a BlogView filter tree so it applies to BlogViewDailyRollup.
+
+    Relation filters carry over unchanged. `viewed_at` bounds survive only when
+    they fall on a day boundary (gte/lt on a date or midnight). Returns None when
+    the filter cannot be answered at day grain.
+    """
+    if not filter_dict:
+        return {}
+
+    for logical in ("and", "or", "not"):
+        if logical in filter_dict:
+            children = [_rollup_filters(condition) for condition in filter_dict[logical]]
+            if any(child is None for child in children):
+                return None
+            return {logical: children}
+
+    if "field" not in filter_dict:
+        return filter_dict
+
+    field = filter_dict["field"]
+    if field.split("__", 1)[0] in ROLLUP_FIELD_ROOTS:
+        return filter_dict
+
+    if field == "viewed_at":
+        # Mirror DynamicFilterBuilder, which applies the first operator it recognises
+        op = next((op for op in DynamicFilterBuilder.OPERATORS if op in filter_dict), None)
+        if op in ("gte", "lt"):
+            day = _as_day(filter_dict[op])
+            if day is not None:
+                return {"field": "day", op: day.isoformat()}
+
+    return None
+
+
+def _rollup_watermark() -> datetime | None:
+    """BlogView.created_at up to which the daily rollup has been folded, None before the first refresh."""
+    return (
+        RollupWatermark.objects.filter(name=RollupWatermark.BLOGVIEW_DAILY).values_list("watermark", flat=True).first()
+    )
+
+
+def _rollup_is_fresh() -> bool:
+    """Whether the daily rollup has been refreshed within ANALYTICS_ROLLUP_MAX_LAG_SECONDS."""
+    if not settings.ANALYTICS_ROLLUPS_ENABLED:
+        return False
+
+    watermark = _rollup_watermark()
+    if watermark is None:
+        return False
+    return watermark >= timezone.now() - timedelta(seconds=settings.ANALYTICS_ROLLUP_MAX_LAG_SECONDS)
+
+
+def _parse_bound(value: str | None) -> datetime | None:
+    """Parse a start/end date parameter; date-only values mean midnight (UTC)."""
+    if not value:
+        return None
+    if "T" not in value:
+        value = f"{value}T00:00:00Z"
+    dt = parse_datetime(value)
+    if dt and timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt
+
+
+def _blog_view_queryset(
+    *,
+    filters: Dict[str, Any] | None,
+    start_date: str | None,
+    end_date: str | None,
+) -> QuerySet:
+    """Raw BlogView rows matching the filters and inclusive date bounds."""
+    queryset = BlogView.objects.all()
+
+    # Plain datetime bounds let Postgres prune BlogView partitions at plan time
+    start_dt = _parse_bound(start_date)
+    if start_dt:
+        queryset = queryset.filter(viewed_at__gte=start_dt)
+
+    end_dt = _parse_bound(end_date)
+    if end_dt and end_date and "T" not in end_date:
+        # A date-only end covers the whole day: everything before the next midnight
+        queryset = queryset.filter(viewed_at__lt=end_dt + timedelta(days=1))
+    elif end_dt:
+        queryset = queryset.filter(viewed_at__lte=end_dt)
+
+    if filters:
+        queryset = queryset.filter(filter_plan(filters).q)
+
+    return queryset
+
+
+def _rollup_plan(
+    *,
+    filters: Dict[str, Any] | None,
+    start_date: str | None,
+    end_date: str | None,
+) -> tuple[Dict[str, Any], date | None, date | None] | None:
+    """
+    Rollup filters and day bounds for the request, or None when it has to read raw
+    BlogView rows (filters or bounds finer than a day, or a stale rollup).
+    """
+    rollup_filters = _rollup_filters(filters)
+    start_day = _as_day(start_date) if start_date else None
+    end_day = parse_date(end_date) if end_date and "T" not in end_date else None
+    bounds_fit = (not start_date or start_day is not None) and (not end_date or end_day is not None)
+
+    if rollup_filters is None or not bounds_fit or not _rollup_is_fresh():
+        return None
+    return rollup_filters, start_day, end_day
+
+
+def data_version(
+    *,
+    filters: Dict[str, Any] | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> str:
+    """
+    Version tag of the data a request with these parameters is answered from.
+
+    Requests served from the rollup tables (including sketches and leaderboards) only
+    change when a refresh writes them; raw-row requests change with every new view.
+    """
+    if _rollup_plan(filters=filters, start_date=start_date, end_date=end_date) is not None:
+        return data_version_tag(DataVersion.ROLLUPS)
+    return data_version_tag(DataVersion.VIEWS)
+
+
+def result_version(
+    *,
+    filters: Dict[str, Any] | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> ResultVersion:
+    """
+    Version of the result of a request with these parameters, as data_version, except
+    that a rollup-served request ending before the watermark day covers closed days
+    only (see _closed_periods) and is versioned on HISTORY.
+    """
+    plan = _rollup_plan(filters=filters, start_date=start_date, end_date=end_date)
+    if plan is None:
+        return ResultVersion(data_version_tag(DataVersion.VIEWS), closed=False)
+    if plan[2] is not None:
+        # Read the version first: a result computed after a concurrent refresh is then never mislabelled
+        history = data_version_tag(DataVersion.HISTORY)
+        watermark = _rollup_watermark()
+        if watermark is not None and plan[2] < timezone.localtime(watermark).date():
+            return ResultVersion(history, closed=True)
+    return ResultVersion(data_version_tag(DataVersion.ROLLUPS), closed=False)
+
+
+def _closed_periods(*, period: Period, filters: Dict[str, Any] | None) -> tuple[date, str] | None:
+    """
+    Where the closed periods of a rollup-served request end, and their version tag.
+
+    Periods starting before the returned day end on or before the watermark day, so
+    their rollup rows are final: they only change through late arrivals, rebuilds and
+    Blog edits, all of which move the HISTORY version. Returns None when the request
+    reads raw rows, where any past period can still change.
+    """
+    # Read the version first: an entry written after a concurrent refresh is then never served
+    history = data_version_tag(DataVersion.HISTORY)
+    if _rollup_plan(filters=filters, start_date=None, end_date=None) is None:
+        return None
+    watermark = _rollup_watermark()
+    if watermark is None:
+        return None
+    return period_start(timezone.localtime(watermark).date(), period), history
+
+
+def blog_view_source_get(
+    *,
+    filters: Dict[str, Any] | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> ViewSource:
+    """
+    Pick the cheapest source for aggregating blog views.
+
+    Uses BlogViewDailyRollup when the rollup is fresh, the filters can be applied
+    at day grain and the date bounds are whole days; otherwise raw BlogView rows.
+
+    Args:
+        filters: Optional dynamic filter dictionary
+        start_date: Optional inclusive start date (ISO format)
+        end_date: Optional inclusive end date (ISO format)
+
+    Returns:
+        ViewSource with the filtered queryset, the view-count aggregate and the time field
+    """
+    plan = _rollup_plan(filters=filters, start_date=start_date, end_date=end_date)
+
+    if plan is not None:
+        rollup_filters, start_day, end_day = plan
+        queryset = BlogViewDailyRollup.objects.all()
+        if start_day:
+            queryset = queryset.filter(day__gte=start_day)
+        if end_day:
+            queryset = queryset.filter(day__lte=end_day)
+        if rollup_filters:
+            queryset = queryset.filter(DynamicFilterBuilder.build(rollup_filters))
+        return ViewSource(queryset=queryset, views=Sum("view_count"), time_field="day")
+
+    queryset = _blog_view_queryset(filters=filters, start_date=start_date, end_date=end_date)
+    return ViewSource(queryset=queryset, views=Count("id"), time_field="viewed_at")
+
+
+def _sketch_window(
+    *,
+    filters: Dict[str, Any] | None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> tuple[date | None, date | None] | None:
+    """
+    Return the (first, last) day window the sketches should cover, or None if the
+    request cannot be answered from sketches (filters, partial-day bounds, stale rollup).
+    """
+    if filters:
+        return None
+
+    start_day = _as_day(start_date) if start_date else None
+    end_day = parse_date(end_date) if end_date and "T" not in end_date else None
+    if (start_date and start_day is None) or (end_date and end_day is None):
+        return None
+
+    if not _rollup_is_fresh():
+        return None
+    return start_day, end_day
+
+
+SKETCH_TRUNC = {"week": TruncWeek, "month": TruncMonth, "year": TruncYear}
+
+
+def _sketch_queryset(dimension: str, start_day: date | None, end_day: date | None) -> QuerySet:
+    queryset = BlogViewDailySketch.objects.filter(dimension=dimension)
+    if start_day:
+        queryset = queryset.filter(day__gte=start_day)
+    if end_day:
+        queryset = queryset.filter(day__lte=end_day)
+    return queryset
+
+
+def _period_date(value: date | datetime) -> date:
+    """Raw rows truncate to aware datetimes and rollup rows to dates; compare both as dates."""
+    if isinstance(value, datetime):
+        return timezone.localtime(value).date()
+    return value
+
+
+# Parsers of the group or entity key in cursor positions (see cursor_decode)
+CURSOR_KEYS = {"country": cursor_str, "user": cursor_uuid, "blog": cursor_uuid}
+
+
+def _grouped_cursor_fields(object_type: Literal["country", "user"]) -> Dict[str, Callable[[Any], Any]]:
+    """Position fields of blog_views_get_grouped_metrics cursors: the period start and the group key."""
+    return {"period": cursor_date, "key": cursor_optional(CURSOR_KEYS[object_type])}
+
+
+def _page_meta(
+    rows: list,
+    *,
+    page_size: int,
+    fingerprint: str,
+    position: Callable[[Any], Dict[str, Any]],
+    meta: Dict[str, Any] | None = None,
+    size_name: str = "page_size",
+) -> Dict[str, Any]:
+    """Meta for a page fetched with one extra row: the cursor of the last returned row if more follow."""
+    next_cursor = None
+    if len(rows) > page_size:
+        next_cursor = cursor_encode(position(rows[page_size - 1]), fingerprint=fingerprint)
+    return {**(meta or {}), size_name: page_size, "next_cursor": next_cursor}
+
+
+def _blog_views_get_grouped_metrics_approx(
+    *,
+    object_type: Literal["country", "user"],
+    range_type: Literal["month", "week", "year"],
+    page_size: int,
+    after: Dict[str, Any] | None,
+    fingerprint: str,
+) -> MetricList:
+    """
+    Grouped metrics with y (distinct blogs) estimated by merging per-day blog sketches.
+
+    The page's (period, key) groups and their exact view counts are found in SQL first,
+    in the order of the exact query and after the cursor, so only the sketches of
+    those page_size groups are read and merged.
+    """
+    sketches = _sketch_queryset(object_type, None, None)
+    if object_type == "country":
+        # Country sketches are keyed by id; group labels are codes like the exact query
+        label = Subquery(
+            Country.objects.filter(id=Cast(NullIf(OuterRef("key"), Value("")), UUIDField())).values("code")[:1]
+        )
+    else:
+        label = NullIf(F("key"), Value(""))
+    groups = (
+        sketches.annotate(period=SKETCH_TRUNC[range_type]("day"), label=label)
+        .values("period", "key", "label")
+        .annotate(view_count=Sum("view_count"))
+    )
+    if after:
+        # (period, label) > cursor, with unknown labels sorting last within a period
+        later = Q(period__gt=after["period"])
+        if after["key"] is not None:
+            later |= Q(period=after["period"]) & (Q(label__gt=after["key"]) | Q(label__isnull=True))
+        # The plain bound on the day lets the planner skip earlier days
+        groups = groups.filter(later, day__gte=after["period"])
+    page = list(groups.order_by("period", F("label").asc(nulls_last=True), "key")[: page_size + 1])
+
+    merged: Dict[tuple[date, str], HyperLogLog] = {}
+    if page:
+        wanted = {(group["period"], group["key"]) for group in page[:page_size]}
+        rows = sketches.filter(
+            key__in={key for _, key in wanted},
+            day__gte=page[0]["period"],
+            day__lte=period_end(page[:page_size][-1]["period"], range_type),
+        ).values_list("day", "key", "blogs")
+        for day, key, blogs in rows.iterator(chunk_size=2000):
+            group = (period_start(day, range_type), key)
+            if group not in wanted:
+                continue
+            sketch = HyperLogLog.from_bytes(blogs)
+            if group in merged:
+                merged[group].merge(sketch)
+            else:
+                merged[group] = sketch
+
+    formatted_results = MetricList(
+        meta=_page_meta(
+            page,
+            page_size=page_size,
+            fingerprint=fingerprint,
+            position=lambda group: {"period": group["period"].isoformat(), "key": group["label"]},
+            meta=_approx_meta(),
+        )
+    )
+    for group in page[:page_size]:
+        formatted_results.append({
+            "x": group["label"] or "Unknown",
+            "y": merged[(group["period"], group["key"])].count(),
+            "z": group["view_count"],
+        })
+    return formatted_results
+
+
+GROUP_KEY_FIELDS = {"country": "viewer_country__code", "user": "viewer_user__id"}
+
+
+def _grouped_metrics_queryset(
+    *,
+    object_type: Literal["country", "user"],
+    range_type: Literal["month", "week", "year"],
+    filters: Dict[str, Any] | None,
+    after: Dict[str, Any] | None = None,
+) -> QuerySet:
+    """
+    Grouped (period, key) rows with y and z, ordered by period then key (NULLs last).
+
+    `after` is a decoded cursor position; only groups strictly after it are returned.
+    """
+    source = blog_view_source_get(filters=filters)
+
+    trunc_map = {
+        "month": TruncMonth,
+        "week": TruncWeek,
+        "year": TruncYear,
+    }
+    trunc_func = trunc_map.get(range_type, TruncMonth)(source.time_field)
+    key_field = GROUP_KEY_FIELDS[object_type]
+
+    queryset = source.queryset.annotate(period=trunc_func)
+
+    if after:
+        after_period: date | datetime = after["period"]
+        if source.time_field == "viewed_at":
+            after_period = timezone.make_aware(datetime.combine(after_period, time.min))
+
+        # (period, key) > cursor, with NULL keys sorting last within a period
+        later = Q(period__gt=after_period)
+        if after["key"] is not None:
+            key_after = Q(**{f"{key_field}__gt": after["key"]}) | Q(**{f"{key_field}__isnull": True})
+            later |= Q(period=after_period) & key_after
+        # The plain bound on the time column lets the planner skip earlier partitions and days
+        queryset = queryset.filter(later, **{f"{source.time_field}__gte": after_period})
+
+    return (
+        queryset.values("period", key_field)
+        .annotate(
+            y=Count("blog", distinct=True),
+            z=source.views,
+        )
+        .order_by("period", key_field)
+    )
+
+
+def _blog_views_get_grouped_metrics_exact(
+    *,
+    object_type: Literal["country", "user"],
+    queryset: QuerySet,
+    approx: bool,
+    page_size: int,
+    fingerprint: str,
+) -> MetricList:
+    """Grouped metrics aggregated from the rollup or raw rows: one page of an admitted _grouped_metrics_queryset."""
+    key_field = GROUP_KEY_FIELDS[object_type]
+    results = query_run(queryset[: page_size + 1], endpoint="blog_views")
+
+    def position(result):
+        key = result[key_field]
+        return {"period": _period_date(result["period"]).isoformat(), "key": None if key is None else str(key)}
+
+    formatted_results = MetricList(
+        meta=_page_meta(
+            results,
+            page_size=page_size,
+            fingerprint=fingerprint,
+            position=position,
+            meta={"approx": False} if approx else None,
+        )
+    )
+    for result in results[:page_size]:
+        key = result[key_field]
+        formatted_results.append({
+            "x": "Unknown" if key is None else str(key),
+            "y": result["y"],
+            "z": result["z"],
+        })
+
+    return formatted_results
+
+
+@replica_read
 def blog_views_get_grouped_metrics(
     *,
     object_type: Literal["country", "user"],
     range_type: Literal["month", "week", "year"],
     filters: Dict[str, Any] | None = None,
-) -> List[Dict[str, Any]]:
+    approx: bool = False,
+    page_size: int | None = None,
+    cursor: str | None = None,
+) -> MetricList:
     """
-    Get grouped blog view metrics.
+    Get one page of grouped blog view metrics.
 
     Groups BlogView records by object_type (country or user) and time range.
     Returns metrics with x (grouping key), y (number of unique blogs), z (total views).
+    Served from the daily rollup when possible (see blog_view_source_get).
+
+    Rows are ordered by (period, group key) with unknown keys last in each period,
+    and paginated by keyset on that pair: only page_size + 1 groups are fetched, and
+    meta.next_cursor holds the position of the last row when more follow.
+
+    Pages are cached until their data changes (see data_version). A page that ends
+    in a closed period (see _closed_periods) is cached under the HISTORY version, so
+    it survives new views and rollup refreshes, and is marked closed (see ResultVersion).
 
     Args:
         object_type: Group by "country" or "user"
         range_type: Time grouping - "month", "week", or "year"
         filters: Optional dynamic filter dictionary
+        approx: Estimate y from HyperLogLog sketches when no filters are given
+        page_size: Rows per page, defaults to ANALYTICS_PAGE_SIZE
+        cursor: next_cursor of the previous page
 
     Returns:
         List of dicts with keys: x (grouping key), y (number of blogs), z (total views)
     """
-    queryset = BlogView.objects.all()
-
-    if filters:
-        q_filter = DynamicFilterBuilder.build(filters)
-        queryset = queryset.filter(q_filter)
+    page_size = page_size or settings.ANALYTICS_PAGE_SIZE
+    plan = filter_plan(filters)
+    filters = plan.tree or None
+    fingerprint = query_fingerprint(
+        view="blog_views", object_type=object_type, range_type=range_type, filters=plan.fingerprint, approx=approx
+    )
+    cursor_fields = _grouped_cursor_fields(object_type)
+    after = cursor_decode(cursor, fingerprint=fingerprint, fields=cursor_fields) if cursor else None
 
-    trunc_map = {
-        "month": TruncMonth("viewed_at"),
-        "week": TruncWeek("viewed_at"),
-        "year": TruncYear("viewed_at"),
+    params = {
+        "object_type": object_type,
+        "range_type": range_type,
+        "filters": plan.fingerprint,
+        "approx": approx,
+        "page_size": page_size,
+        "cursor": cursor,
     }
-    trunc_func = trunc_map.get(range_type, TruncMonth("viewed_at"))
+    # Pages that lie entirely in closed periods outlive new views and refreshes
+    closed = _closed_periods(period=range_type, filters=filters)
+    closed_key = None
+    if closed is not None:
+        closed_key = versioned_cache_key("blog_views_closed", version=closed[1], params=params)
+        cached = cache_get(closed_key)
+        if cached is not None:
+            return cached
 
-    queryset = queryset.annotate(period=trunc_func)
+    version = data_version(filters=filters)
 
-    if object_type == "country":
-        results = (
-            queryset.values("period", "viewer_country__code")
-            .annotate(
-                y=Count("blog", distinct=True),
-                z=Count("id"),
+    def compute() -> MetricList:
+        sketchable = _sketch_window(filters=filters) is not None
+        queryset = None
+        if not (approx and sketchable):
+            queryset = _grouped_metrics_queryset(
+                object_type=object_type, range_type=range_type, filters=filters, after=after
             )
-            .order_by("period", "viewer_country__code")
-        )
+            admission = query_admit(
+                queryset[: page_size + 1], endpoint="blog_views", fingerprint=fingerprint, can_downgrade=sketchable
+            )
+            if admission.downgrade:
+                queryset = None
 
-        formatted_results = []
-        for result in results:
-            country_code = result["viewer_country__code"] or "Unknown"
-            formatted_results.append({
-                "x": country_code,
-                "y": result["y"],
-                "z": result["z"],
-            })
-    else:
-        results = (
-            queryset.values("period", "viewer_user__id")
-            .annotate(
-                y=Count("blog", distinct=True),
-                z=Count("id"),
+        if queryset is None:
+            formatted_results = _blog_views_get_grouped_metrics_approx(
+                object_type=object_type,
+                range_type=range_type,
+                page_size=page_size,
+                after=after,
+                fingerprint=fingerprint,
             )
-            .order_by("period", "viewer_user__id")
+            if not approx:
+                # Too expensive to aggregate exactly (see core.analytics.cost)
+                formatted_results.meta["downgraded"] = True
+        else:
+            formatted_results = _blog_views_get_grouped_metrics_exact(
+                object_type=object_type,
+                queryset=queryset,
+                approx=approx,
+                page_size=page_size,
+                fingerprint=fingerprint,
+            )
+
+        formatted_results.version = ResultVersion(version, closed=False)
+        next_cursor = formatted_results.meta["next_cursor"]
+        if closed_key and next_cursor:
+            # Rows are ordered by period: when the last one is in a closed period, so is the whole page
+            last_period = cursor_decode(next_cursor, fingerprint=fingerprint, fields=cursor_fields)["period"]
+            if last_period < closed[0]:
+                formatted_results.version = ResultVersion(closed[1], closed=True)
+                cache_set(closed_key, formatted_results, timeout=settings.ANALYTICS_CLOSED_PERIOD_CACHE_TIMEOUT)
+        return formatted_results
+
+    return cache_fetch(
+        "blog_views",
+        version=version,
+        params=params,
+        compute=compute,
+        timeout=settings.ANALYTICS_CACHE_TIMEOUT,
+    )
+
+
+@replica_read
+def blog_views_iter_raw(
+    *,
+    filters: Dict[str, Any] | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    chunk_size: int = 2000,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream raw BlogView rows in viewed_at order.
+
+    Rows are read through a server-side cursor `chunk_size` at a time, so memory
+    does not grow with the number of rows.
+    """
+    rows = (
+        _blog_view_queryset(filters=filters, start_date=start_date, end_date=end_date)
+        .values_list("id", "blog_id", "viewer_user_id", "viewer_country__code", "viewed_at")
+        .order_by("viewed_at", "id")
+    )
+    for view_id, blog_id, user_id, country_code, viewed_at in rows.iterator(chunk_size=chunk_size):
+        yield {
+            "id": str(view_id),
+            "blog": str(blog_id),
+            "viewer_user": str(user_id) if user_id else None,
+            "viewer_country": country_code,
+            "viewed_at": viewed_at.isoformat(),
+        }
+
+
+@replica_read
+def blog_views_iter_grouped_metrics(
+    *,
+    object_type: Literal["country", "user"],
+    range_type: Literal["month", "week", "year"],
+    filters: Dict[str, Any] | None = None,
+    chunk_size: int = 2000,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream every group of blog_views_get_grouped_metrics through a server-side cursor.
+
+    Rows carry the period start next to x, y and z since there is no page to keep them apart.
+    """
+    key_field = GROUP_KEY_FIELDS[object_type]
+    queryset = _grouped_metrics_queryset(object_type=object_type, range_type=range_type, filters=filters)
+    for result in queryset.iterator(chunk_size=chunk_size):
+        key = result[key_field]
+        yield {
+            "period": _period_date(result["period"]).isoformat(),
+            "x": "Unknown" if key is None else str(key),
+            "y": result["y"],
+            "z": result["z"],
+        }
+
+
+# Rolling leaderboard windows: the last N days, today included
+ROLLING_WINDOWS = {"7d": 7, "30d": 30, "90d": 90}
+
+RANK_KEY_FIELDS = {"user": "viewer_user_id", "country": "viewer_country__code", "blog": "blog_id"}
+
+
+def top_ranking_queryset(source: ViewSource, top_type: Literal["user", "country", "blog"]) -> QuerySet:
+    """
+    Per-entity x, y, z as reported by top_get_ranked, ordered by views (y) then key.
+
+    `key` is the user or blog id, or the country code. Views without a user or
+    country are not ranked.
+    """
+    key_field = RANK_KEY_FIELDS[top_type]
+    x, z = {
+        "user": (Count("blog", distinct=True), Count("viewer_country", distinct=True)),
+        "country": (Count("viewer_user", distinct=True), Count("blog", distinct=True)),
+        "blog": (Count("viewer_user", distinct=True), Count("viewer_country", distinct=True)),
+    }[top_type]
+    return (
+        source.queryset.filter(**{f"{key_field}__isnull": False})
+        .values(key=F(key_field))
+        .annotate(x=x, y=source.views, z=z)
+        .order_by("-y", "key")
+    )
+
+
+def _rank_after(after: Dict[str, Any]) -> Q:
+    """Rows after a cursor position in (y descending, key) order."""
+    return Q(y__lt=after["y"]) | Q(y=after["y"], key__gt=after["key"])
+
+
+def _ranked_page(
+    rows: list,
+    *,
+    limit: int,
+    fingerprint: str,
+    meta: Dict[str, Any] | None = None,
+) -> MetricList:
+    formatted_results = MetricList(
+        meta=_page_meta(
+            rows,
+            page_size=limit,
+            fingerprint=fingerprint,
+            position=lambda row: {"y": row["y"], "key": str(row["key"])},
+            meta=meta,
+            size_name="limit",
         )
+    )
+    for row in rows[:limit]:
+        formatted_results.append({
+            "x": row["x"],
+            "y": row["y"],
+            "z": row["z"],
+        })
+    return formatted_results
+
+
+def top_window_bounds(window: str) -> tuple[str | None, str | None]:
+    """
+    Inclusive start and end dates of a standard leaderboard window.
+
+    "all" has no bounds, "7d"/"30d"/"90d" start N-1 days before today and stay
+    open-ended, and "YYYY-MM" covers that calendar month.
+    """
+    if window == "all":
+        return None, None
+
+    days = ROLLING_WINDOWS.get(window)
+    if days is not None:
+        return (timezone.now().date() - timedelta(days=days - 1)).isoformat(), None
 
-        formatted_results = []
-        for result in results:
-            user_id = result["viewer_user__id"]
-            if user_id is None:
-                user_id = "Unknown"
+    month = date.fromisoformat(f"{window}-01")
+    return month.isoformat(), (month_add(month, 1) - timedelta(days=1)).isoformat()
+
+
+def _leaderboard_get(
+    *,
+    top_type: Literal["user", "country", "blog"],
+    start_date: str | None,
+    end_date: str | None,
+) -> Leaderboard | None:
+    """
+    The maintained leaderboard whose window is exactly [start_date, end_date], if any.
+
+    No bounds match the all-time board; a start date without an end date matches a
+    rolling board that ends today.
+    """
+    if not settings.ANALYTICS_LEADERBOARDS_ENABLED:
+        return None
+
+    start_day = _as_day(start_date) if start_date else None
+    end_day = parse_date(end_date) if end_date and "T" not in end_date else None
+    if (start_date and start_day is None) or (end_date and end_day is None):
+        return None
+    if start_day and not end_day:
+        end_day = timezone.now().date()
+
+    board = Leaderboard.objects.filter(top_type=top_type, first_day=start_day, last_day=end_day).first()
+    if board is None or not _rollup_is_fresh():
+        return None
+    return board
+
+
+def _top_get_ranked_leaderboard(
+    *,
+    board: Leaderboard,
+    limit: int,
+    after: Dict[str, Any] | None,
+    fingerprint: str,
+) -> MetricList | None:
+    """
+    Serve a page from a leaderboard in O(limit).
+
+    Returns None when the page runs past the end of a board that was cut at
+    ANALYTICS_LEADERBOARD_DEPTH, so the caller can compute it live.
+    """
+    entries = board.entries.all()
+    if after:
+        entries = entries.filter(_rank_after(after))
+    rows = list(entries.values("key", "x", "y", "z")[: limit + 1])
+    if len(rows) <= limit and not board.complete:
+        return None
+    return _ranked_page(rows, limit=limit, fingerprint=fingerprint, meta={"leaderboard": board.window})
+
+
+def _top_get_ranked_approx(
+    *,
+    top_type: Literal["user", "country", "blog"],
+    start_day: date | None,
+    end_day: date | None,
+    limit: int,
+    after: Dict[str, Any] | None,
+    fingerprint: str,
+) -> MetricList:
+    """
+    Ranking from sketches: views (y) are exact sums, and only the entities on the
+    page have their distinct-count sketches merged for x and z.
+    """
+    sketches = _sketch_queryset(top_type, start_day, end_day)
+    if top_type != "blog":
+        # Views without a user or country are not ranked
+        sketches = sketches.exclude(key="")
+
+    ranked = sketches.values("key").annotate(y=Sum("view_count"))
+    if top_type == "country":
+        # Country sketches are keyed by id; rank by code like the exact query. There are few countries.
+        codes = {str(pk): code for pk, code in Country.objects.values_list("id", "code")}
+        rows = sorted(
+            (
+                {"key": codes[row["key"]], "sketch_key": row["key"], "y": row["y"]}
+                for row in ranked
+                if row["key"] in codes
+            ),
+            key=lambda row: (-row["y"], row["key"]),
+        )
+        if after:
+            rows = [row for row in rows if (-row["y"], row["key"]) > (-after["y"], after["key"])]
+        rows = rows[: limit + 1]
+    else:
+        if after:
+            ranked = ranked.filter(_rank_after(after))
+        rows = [{**row, "sketch_key": row["key"]} for row in ranked.order_by("-y", "key")[: limit + 1]]
+
+    x_field, z_field = {
+        "user": ("blogs", "countries"),
+        "country": ("users", "blogs"),
+        "blog": ("users", "countries"),
+    }[top_type]
+    keys = [row["sketch_key"] for row in rows[:limit]]
+    merged: Dict[str, Dict[str, HyperLogLog]] = {key: {} for key in keys}
+    sketch_rows = sketches.filter(key__in=keys).values_list("key", x_field, z_field)
+    for key, *values in sketch_rows.iterator(chunk_size=2000):
+        for field, value in zip((x_field, z_field), values):
+            sketch = HyperLogLog.from_bytes(value)
+            if field in merged[key]:
+                merged[key][field].merge(sketch)
             else:
-                user_id = str(user_id)
-            formatted_results.append({
-                "x": user_id,
-                "y": result["y"],
-                "z": result["z"],
-            })
+                merged[key][field] = sketch
 
-    return formatted_results
+    for row in rows[:limit]:
+        row["x"] = merged[row["sketch_key"]][x_field].count()
+        row["z"] = merged[row["sketch_key"]][z_field].count()
+    return _ranked_page(rows, limit=limit, fingerprint=fingerprint, meta=_approx_meta())
 
 
+@replica_read
 def top_get_ranked(
     *,
     top_type: Literal["user", "country", "blog"],
     start_date: str | None = None,
     end_date: str | None = None,
     filters: Dict[str, Any] | None = None,
-) -> List[Dict[str, Any]]:
+    approx: bool = False,
+    limit: int | None = None,
+    cursor: str | None = None,
+) -> MetricList:
     """
-    Get top 10 ranked entities by view count.
+    Get top ranked entities by view count.
+
+    Entities are ordered by views, then key. Without filters, windows that match a
+    maintained leaderboard (all-time, last 7/30/90 days, calendar months) are read
+    from it in O(limit); everything else is aggregated live.
 
     Args:
         top_type: Rank by "user", "country", or "blog"
         start_date: Optional start date for time range (ISO format)
         end_date: Optional end date for time range (ISO format)
         filters: Optional dynamic filter dictionary
+        approx: Estimate the distinct counts from HyperLogLog sketches when no filters are given
+        limit: Entities per page, defaults to ANALYTICS_TOP_DEFAULT_LIMIT (10)
+        cursor: next_cursor of the previous page
 
     Returns:
         List of dicts with keys: x, y, z (varies by top_type)
@@ -111,201 +922,414 @@ def top_get_ranked(
         - top=country: x=users, y=views, z=blogs
         - top=blog: x=users, y=views, z=countries
     """
-    from django.utils import timezone
-    from django.utils.dateparse import parse_datetime
-
-    # Create cache key
-    cache_data = f"{top_type}_{start_date}_{end_date}_{json.dumps(filters or {}, sort_keys=True)}"
-    cache_key = f"top_ranked_{hashlib.md5(cache_data.encode()).hexdigest()}"
+    limit = limit or settings.ANALYTICS_TOP_DEFAULT_LIMIT
+    plan = filter_plan(filters)
+    filters = plan.tree or None
 
-    # Try cache first (fail silently if cache is unavailable)
-    try:
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return cached
-    except Exception:
-        pass  # Continue without cache if there's an error
+    fingerprint = query_fingerprint(
+        view="top", top_type=top_type, start_date=start_date, end_date=end_date, filters=plan.fingerprint, approx=approx
+    )
+    after = (
+        cursor_decode(cursor, fingerprint=fingerprint, fields={"y": cursor_int, "key": CURSOR_KEYS[top_type]})
+        if cursor
+        else None
+    )
+    version = result_version(filters=filters, start_date=start_date, end_date=end_date)
 
-    queryset = BlogView.objects.all()
+    def compute() -> MetricList:
+        formatted_results = None
+        if not filters:
+            board = _leaderboard_get(top_type=top_type, start_date=start_date, end_date=end_date)
+            if board is not None:
+                formatted_results = _top_get_ranked_leaderboard(
+                    board=board, limit=limit, after=after, fingerprint=fingerprint
+                )
 
-    if start_date:
-        if "T" not in start_date:
-            start_date = f"{start_date}T00:00:00Z"
-        start_dt = parse_datetime(start_date)
-        if start_dt:
-            if timezone.is_naive(start_dt):
-                start_dt = timezone.make_aware(start_dt)
-            queryset = queryset.filter(viewed_at__gte=start_dt)
-
-    if end_date:
-        if "T" not in end_date:
-            end_date = f"{end_date}T23:59:59Z"
-        end_dt = parse_datetime(end_date)
-        if end_dt:
-            if timezone.is_naive(end_dt):
-                end_dt = timezone.make_aware(end_dt)
-            queryset = queryset.filter(viewed_at__lte=end_dt)
+        window = _sketch_window(filters=filters, start_date=start_date, end_date=end_date) if approx else None
+        if formatted_results is None and window is not None:
+            formatted_results = _top_get_ranked_approx(
+                top_type=top_type,
+                start_day=window[0],
+                end_day=window[1],
+                limit=limit,
+                after=after,
+                fingerprint=fingerprint,
+            )
 
-    if filters:
-        q_filter = DynamicFilterBuilder.build(filters)
-        queryset = queryset.filter(q_filter)
-
-    if top_type == "user":
-        results = (
-            queryset.values("viewer_user__id")
-            .annotate(
-                x=Count("blog", distinct=True),
-                y=Count("id"),
-                z=Count("viewer_country", distinct=True),
+        if formatted_results is None:
+            source = blog_view_source_get(filters=filters, start_date=start_date, end_date=end_date)
+            ranking = top_ranking_queryset(source, top_type)
+            if after:
+                ranking = ranking.filter(_rank_after(after))
+            ranking = ranking[: limit + 1]
+            sketch_window = _sketch_window(filters=filters, start_date=start_date, end_date=end_date)
+            admission = query_admit(
+                ranking, endpoint="top", fingerprint=fingerprint, can_downgrade=sketch_window is not None
             )
-            .order_by("-y")[:10]
+            if admission.downgrade and sketch_window is not None:
+                # Too expensive to aggregate exactly (see core.analytics.cost)
+                formatted_results = _top_get_ranked_approx(
+                    top_type=top_type,
+                    start_day=sketch_window[0],
+                    end_day=sketch_window[1],
+                    limit=limit,
+                    after=after,
+                    fingerprint=fingerprint,
+                )
+                formatted_results.meta["downgraded"] = True
+            else:
+                formatted_results = _ranked_page(
+                    query_run(ranking, endpoint="top"), limit=limit, fingerprint=fingerprint
+                )
+
+        if approx and not formatted_results.meta.get("approx"):
+            formatted_results.meta["approx"] = False
+        formatted_results.version = version
+        return formatted_results
+
+    # Cached until the data behind the result changes (see result_version)
+    return cache_fetch(
+        "top_ranked",
+        version=version.tag,
+        params={
+            "top_type": top_type,
+            "start_date": start_date,
+            "end_date": end_date,
+            "filters": plan.fingerprint,
+            "approx": approx,
+            "limit": limit,
+            "cursor": cursor,
+        },
+        compute=compute,
+        timeout=settings.ANALYTICS_CLOSED_PERIOD_CACHE_TIMEOUT if version.closed else settings.ANALYTICS_CACHE_TIMEOUT,
+    )
+
+
+@replica_read
+def top_iter_ranked(
+    *,
+    top_type: Literal["user", "country", "blog"],
+    start_date: str | None = None,
+    end_date: str | None = None,
+    filters: Dict[str, Any] | None = None,
+    chunk_size: int = 2000,
+) -> Iterator[Dict[str, Any]]:
+    """Stream the whole ranking of top_get_ranked, in its order, through a server-side cursor."""
+    source = blog_view_source_get(filters=filters, start_date=start_date, end_date=end_date)
+    for row in top_ranking_queryset(source, top_type).iterator(chunk_size=chunk_size):
+        yield {"x": row["x"], "y": row["y"], "z": row["z"]}
+
+
+PERFORMANCE_TRUNC = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth, "year": TruncYear}
+
+
+def _performance_buckets(
+    *,
+    source: ViewSource,
+    compare_type: Literal["day", "week", "month", "year"],
+    user_id: str | None,
+    fingerprint: str,
+) -> list[tuple[date | datetime, int, int]]:
+    """(period, blog_count, view_count) for every period with views, in period order."""
+    queryset = source.queryset
+    if user_id:
+        queryset = queryset.filter(blog__user_id=user_id)
+
+    trunc_func = PERFORMANCE_TRUNC.get(compare_type, TruncMonth)(source.time_field)
+    results = (
+        queryset.annotate(period=trunc_func)
+        .values("period")
+        .annotate(
+            blog_count=Count("blog", distinct=True),
+            view_count=source.views,
         )
+        .order_by("period")
+    )
+    query_admit(results, endpoint="performance", fingerprint=fingerprint)
+    return [
+        (result["period"], result["blog_count"], result["view_count"])
+        for result in query_run(results, endpoint="performance")
+        if result["period"] is not None
+    ]
 
-        formatted_results = []
-        for result in results:
-            if result["viewer_user__id"] is None:
-                continue
-            formatted_results.append({
-                "x": result["x"],
-                "y": result["y"],
-                "z": result["z"],
-            })
-
-    elif top_type == "country":
-        results = (
-            queryset.values("viewer_country__code")
-            .annotate(
-                x=Count("viewer_user", distinct=True),
-                y=Count("id"),
-                z=Count("blog", distinct=True),
-            )
-            .order_by("-y")[:10]
+
+def _performance_buckets_closed(
+    *,
+    compare_type: Literal["day", "week", "month", "year"],
+    user_id: str | None,
+    filters: Dict[str, Any] | None,
+    closed_end: date,
+    history: str,
+) -> list[tuple[date | datetime, int, int]]:
+    """
+    Performance buckets with closed periods read from the cache.
+
+    Each closed period is cached as its own entry under the HISTORY version, next to
+    an index of the cached periods and the day they were closed up to. Only periods
+    from that day on (the open period, plus any that closed since) are aggregated.
+    """
+    source = blog_view_source_get(filters=filters)
+    params = {"compare_type": compare_type, "user_id": user_id, "filters": filter_plan(filters).fingerprint}
+    if source.time_field != "day":
+        # The rollup went stale since the caller checked it
+        return _performance_buckets(
+            source=source,
+            compare_type=compare_type,
+            user_id=user_id,
+            fingerprint=query_fingerprint(view="performance", **params),
         )
 
-        formatted_results = []
-        for result in results:
-            if result["viewer_country__code"] is None:
-                continue
-            formatted_results.append({
-                "x": result["x"],
-                "y": result["y"],
-                "z": result["z"],
-            })
+    index_key = versioned_cache_key("performance_closed", version=history, params=params)
 
-    else:
-        results = (
-            queryset.values("blog__id", "blog__title")
-            .annotate(
-                x=Count("viewer_user", distinct=True),
-                y=Count("id"),
-                z=Count("viewer_country", distinct=True),
-            )
-            .order_by("-y")[:10]
+    def bucket_key(period: str) -> str:
+        return versioned_cache_key("performance_bucket", version=history, params={**params, "period": period})
+
+    closed: Dict[date, tuple[int, int]] = {}
+    since = None
+    index = cache_get(index_key)
+    if index is not None and date.fromisoformat(index["through"]) <= closed_end:
+        keys = {period: bucket_key(period) for period in index["periods"]}
+        entries = cache_get_many(list(keys.values()))
+        # An evicted bucket means the closed range has to be aggregated again
+        if len(entries) == len(keys):
+            closed = {date.fromisoformat(period): tuple(entries[key]) for period, key in keys.items()}
+            since = date.fromisoformat(index["through"])
+
+    if since is not None:
+        source = source._replace(queryset=source.queryset.filter(day__gte=since))
+    buckets = _performance_buckets(
+        source=source,
+        compare_type=compare_type,
+        user_id=user_id,
+        fingerprint=query_fingerprint(view="performance", since=since, **params),
+    )
+
+    newly_closed = {
+        period: (blog_count, view_count) for period, blog_count, view_count in buckets if period < closed_end
+    }
+    if since != closed_end:
+        timeout = settings.ANALYTICS_CLOSED_PERIOD_CACHE_TIMEOUT
+        cache_set_many(
+            {bucket_key(period.isoformat()): list(counts) for period, counts in newly_closed.items()},
+            timeout=timeout,
         )
+        closed.update(newly_closed)
+        index = {"through": closed_end.isoformat(), "periods": sorted(period.isoformat() for period in closed)}
+        cache_set(index_key, index, timeout=timeout)
 
-        formatted_results = []
-        for result in results:
-            formatted_results.append({
-                "x": result["blog__title"],
-                "y": result["y"],
-                "z": result["z"],
-            })
+    return [
+        *((period, blog_count, view_count) for period, (blog_count, view_count) in sorted(closed.items())),
+        *(bucket for bucket in buckets if bucket[0] >= closed_end),
+    ]
 
-    # Cache result for 5 minutes (fail silently if cache is unavailable)
-    try:
-        cache.set(cache_key, formatted_results, timeout=300)
-    except Exception:
-        pass  # Continue without caching if there's an error
 
-    return formatted_results
+# Every period from the first to the last one, each joined to its bucket (zero views
+# when it has none), labelled and with its growth over the period just before it
+PERFORMANCE_SERIES_SQL = """
+WITH buckets AS (
+    SELECT *
+    FROM unnest(%(periods)s::date[], %(blog_counts)s::bigint[], %(view_counts)s::bigint[])
+        AS bucket(period, blog_count, view_count)
+),
+spine AS (
+    SELECT generate_series(%(first)s::date, %(last)s::date, %(step)s::interval)::date AS period
+),
+series AS (
+    SELECT
+        spine.period,
+        COALESCE(buckets.blog_count, 0) AS blog_count,
+        COALESCE(buckets.view_count, 0) AS view_count,
+        LAG(COALESCE(buckets.view_count, 0)) OVER (ORDER BY spine.period) AS previous_views
+    FROM spine
+    LEFT JOIN buckets USING (period)
+)
+SELECT
+    to_char(period, %(label)s) || ' (' || blog_count || ' blogs)' AS x,
+    view_count AS y,
+    CASE
+        WHEN previous_views IS NULL THEN 0
+        WHEN previous_views = 0 THEN CASE WHEN view_count > 0 THEN 100 ELSE 0 END
+        ELSE round((view_count - previous_views) * 100.0 / previous_views, 2)
+    END::float8 AS z
+FROM series
+ORDER BY period
+"""
+
+PERFORMANCE_STEPS = {"day": "1 day", "week": "1 week", "month": "1 month", "year": "1 year"}
+PERFORMANCE_LABELS = {"day": "YYYY-MM-DD", "week": 'IYYY-"W"IW', "month": "YYYY-MM", "year": "YYYY"}
+
+
+def _performance_series(
+    *,
+    compare_type: Literal["day", "week", "month", "year"],
+    buckets: list[tuple[date | datetime, int, int]],
+    first: date | None,
+    last: date | None,
+) -> MetricList:
+    """
+    The dense series over the buckets: every period from `first` (default: the first
+    bucket's) to `last` (default: the last bucket's), with periods without views as
+    zeros, so growth is always measured against the period right before.
+    """
+    periods = [_period_date(period) for period, _, _ in buckets]
+    first = first or (periods[0] if periods else None)
+    last = last or (periods[-1] if periods else first)
+    if first is None or last is None or first > last:
+        return MetricList()
+
+    # Reads no table: run it where reads go, which keeps it off the primary when there are replicas
+    with connections[BlogView.objects.db].cursor() as cursor:
+        cursor.execute(
+            PERFORMANCE_SERIES_SQL,
+            {
+                "periods": periods,
+                "blog_counts": [blog_count for _, blog_count, _ in buckets],
+                "view_counts": [view_count for _, _, view_count in buckets],
+                "first": first,
+                "last": last,
+                "step": PERFORMANCE_STEPS[compare_type],
+                "label": PERFORMANCE_LABELS[compare_type],
+            },
+        )
+        return MetricList({"x": x, "y": y, "z": z} for x, y, z in cursor.fetchall())
 
 
+def _series_bound(value: str | None, name: str) -> date | None:
+    if not value:
+        return None
+    day = _as_day(value)
+    if day is None:
+        raise ApplicationError(f"{name} must be a date (YYYY-MM-DD)", extra={"field": name})
+    return day
+
+
+def _performance_bounds(
+    *,
+    compare_type: Literal["day", "week", "month", "year"],
+    start_date: str | None,
+    end_date: str | None,
+) -> tuple[date | None, date | None, Dict[str, str | None]]:
+    """First and last period of a bounded series, and the whole periods it covers as day bounds."""
+    start_day = _series_bound(start_date, "start_date")
+    end_day = _series_bound(end_date, "end_date")
+    if start_day and end_day and start_day > end_day:
+        raise ApplicationError("start_date must not be after end_date")
+    first = period_start(start_day, compare_type) if start_day else None
+    last = period_start(end_day, compare_type) if end_day else None
+    bounds = {
+        "start_date": first.isoformat() if first else None,
+        "end_date": period_end(last, compare_type).isoformat() if last else None,
+    }
+    return first, last, bounds
+
+
+@replica_read
 def performance_get_time_series(
     *,
     compare_type: Literal["day", "week", "month", "year"],
     user_id: str | None = None,
     filters: Dict[str, Any] | None = None,
-) -> List[Dict[str, Any]]:
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> MetricList:
     """
     Get time-series performance metrics.
 
+    The series is dense: periods without views are included with zero views, and each
+    period's growth is measured against the period right before it. Without bounds it
+    runs from the first to the last period with views; bounds are widened to whole
+    periods, and keep day-level series over long histories cheap.
+
+    Results are cached until their data changes (see result_version). When an unbounded
+    series is served from the rollup, closed periods are additionally cached per period
+    under the HISTORY version, so after new views or a refresh only the open period is
+    aggregated again.
+
     Args:
         compare_type: Time period grouping - "day", "week", "month", or "year"
         user_id: Optional user ID to filter by specific user's blogs
         filters: Optional dynamic filter dictionary
+        start_date: Optional first day (ISO date); the series starts with the period containing it
+        end_date: Optional last day (ISO date); the series ends with the period containing it
 
     Returns:
         List of dicts with keys: x (period label + blog count), y (views), z (growth %)
     """
-    from datetime import datetime
+    plan = filter_plan(filters)
+    filters = plan.tree or None
+    first, last, bounds = _performance_bounds(compare_type=compare_type, start_date=start_date, end_date=end_date)
+    version = result_version(filters=filters, **bounds)
 
-    queryset = BlogView.objects.all()
+    def compute() -> MetricList:
+        closed = None
+        if first is None and last is None:
+            closed = _closed_periods(period=compare_type, filters=filters)
+        if closed is not None:
+            buckets = _performance_buckets_closed(
+                compare_type=compare_type,
+                user_id=user_id,
+                filters=filters,
+                closed_end=closed[0],
+                history=closed[1],
+            )
+        else:
+            buckets = _performance_buckets(
+                source=blog_view_source_get(filters=filters, **bounds),
+                compare_type=compare_type,
+                user_id=user_id,
+                fingerprint=query_fingerprint(
+                    view="performance", compare_type=compare_type, user_id=user_id, filters=plan.fingerprint, **bounds
+                ),
+            )
 
-    if user_id:
-        queryset = queryset.filter(blog__user_id=user_id)
+        formatted_results = _performance_series(compare_type=compare_type, buckets=buckets, first=first, last=last)
+        formatted_results.version = version
+        return formatted_results
 
-    if filters:
-        q_filter = DynamicFilterBuilder.build(filters)
-        queryset = queryset.filter(q_filter)
+    return cache_fetch(
+        "performance",
+        version=version.tag,
+        params={"compare_type": compare_type, "user_id": user_id, "filters": plan.fingerprint, **bounds},
+        compute=compute,
+        timeout=settings.ANALYTICS_CLOSED_PERIOD_CACHE_TIMEOUT if version.closed else settings.ANALYTICS_CACHE_TIMEOUT,
+    )
 
-    trunc_map = {
-        "day": TruncDay("viewed_at"),
-        "week": TruncWeek("viewed_at"),
-        "month": TruncMonth("viewed_at"),
-        "year": TruncYear("viewed_at"),
-    }
-    trunc_func = trunc_map.get(compare_type, TruncMonth("viewed_at"))
 
-    results = (
-        queryset.annotate(period=trunc_func)
-        .values("period")
-        .annotate(
-            blog_count=Count("blog", distinct=True),
-            view_count=Count("id"),
-        )
-        .order_by("period")
-    )
+# Versions the result of a request can have while its data is unchanged, read without
+# computing the result, so that conditional requests can be answered first
 
-    formatted_results = []
-    previous_views = None
-
-    for result in results:
-        period = result["period"]
-        blog_count = result["blog_count"]
-        view_count = result["view_count"]
-
-        if period is None:
-            continue
-
-        if isinstance(period, datetime):
-            if compare_type == "day":
-                period_label = period.strftime("%Y-%m-%d")
-            elif compare_type == "week":
-                year, week, _ = period.isocalendar()
-                period_label = f"{year}-W{week:02d}"
-            elif compare_type == "month":
-                period_label = period.strftime("%Y-%m")
-            else:
-                period_label = period.strftime("%Y")
-        else:
-            period_label = str(period)
 
-        x = f"{period_label} ({blog_count} blogs)"
+@replica_read
+def blog_views_versions(
+    *, range_type: Literal["month", "week", "year"], filters: Dict[str, Any] | None = None
+) -> set[ResultVersion]:
+    """Versions of blog_views_get_grouped_metrics pages: the data version, or HISTORY for closed pages."""
+    versions = {ResultVersion(data_version(filters=filters), closed=False)}
+    closed = _closed_periods(period=range_type, filters=filters)
+    if closed is not None:
+        versions.add(ResultVersion(closed[1], closed=True))
+    return versions
 
-        if previous_views is not None and previous_views > 0:
-            growth = ((view_count - previous_views) / previous_views) * 100
-            z = round(growth, 2)
-        elif previous_views is not None and previous_views == 0:
-            z = 100.0 if view_count > 0 else 0.0
-        else:
-            z = 0.0
 
-        formatted_results.append({
-            "x": x,
-            "y": view_count,
-            "z": z,
-        })
+@replica_read
+def top_versions(
+    *,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    filters: Dict[str, Any] | None = None,
+) -> set[ResultVersion]:
+    """Version of top_get_ranked results."""
+    return {result_version(filters=filters, start_date=start_date, end_date=end_date)}
 
-        previous_views = view_count
 
-    return formatted_results
+@replica_read
+def performance_versions(
+    *,
+    compare_type: Literal["day", "week", "month", "year"],
+    filters: Dict[str, Any] | None = None,
+    start_date: str | None = None,
+    end_date: str | None = None,
+) -> set[ResultVersion]:
+    """Version of performance_get_time_series results."""
+    _, _, bounds = _performance_bounds(compare_type=compare_type, start_date=start_date, end_date=end_date)
+    return {result_version(filters=filters, **bounds)}
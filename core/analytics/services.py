@@ -0,0 +1,629 @@
+import csv
+import io
+import logging
+import uuid
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Min, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.analytics.buffer import WriteBehindBuffer
+from core.analytics.caching import data_version_bump
+from core.analytics.hll import HyperLogLog
+from core.analytics.models import (
+    Blog,
+    BlogView,
+    BlogViewDailyRollup,
+    BlogViewDailySketch,
+    Country,
+    DataVersion,
+    Leaderboard,
+    LeaderboardEntry,
+    RollupWatermark,
+)
+from core.analytics.periods import month_add
+from core.analytics.selectors import RANK_KEY_FIELDS, ROLLING_WINDOWS, ViewSource, top_ranking_queryset
+from core.api.exceptions import ApplicationError
+from core.users.models import User
+
+logger = logging.getLogger(__name__)
+
+STAGING_TABLE = "analytics_blogview_staging"
+STAGING_COLUMNS = ("batch_id", "id", "blog_id", "viewer_user_id", "viewer_country_id", "viewed_at")
+# Only the first errors are echoed back; counts always cover the whole batch
+MAX_REPORTED_ERRORS = 100
+
+# Which distinct-count sketches each sketch dimension carries
+SKETCH_FIELDS = {
+    BlogViewDailySketch.Dimension.BLOG: ("users", "countries"),
+    BlogViewDailySketch.Dimension.COUNTRY: ("blogs", "users"),
+    BlogViewDailySketch.Dimension.USER: ("blogs", "countries"),
+}
+
+
+def _day_ranges(days: Iterable[date]) -> List[Tuple[date, date]]:
+    """Collapse a set of days into inclusive (first, last) runs of consecutive days."""
+    ranges: List[Tuple[date, date]] = []
+    for day in sorted(set(days)):
+        if ranges and ranges[-1][1] + timedelta(days=1) == day:
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
+
+
+def _day_start(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _rollup_rebuild_range(*, first_day: date | None, last_day: date | None) -> int:
+    """
+    Replace rollup rows for [first_day, last_day] with a fresh aggregate of BlogView.
+
+    Passing no bounds rebuilds the whole table. The aggregate runs as a single
+    INSERT ... SELECT so no view rows are pulled into Python.
+    """
+    rollups = BlogViewDailyRollup.objects.all()
+    views = BlogView.objects.all()
+
+    if first_day is not None:
+        rollups = rollups.filter(day__gte=first_day)
+        views = views.filter(viewed_at__gte=_day_start(first_day))
+    if last_day is not None:
+        rollups = rollups.filter(day__lte=last_day)
+        views = views.filter(viewed_at__lt=_day_start(last_day + timedelta(days=1)))
+
+    rollups.delete()
+
+    aggregate = (
+        views.annotate(day=TruncDate("viewed_at"))
+        .values("day", "blog_id", "viewer_country_id", "viewer_user_id")
+        .annotate(view_count=Count("id"))
+        .order_by()
+    )
+    select_sql, params = aggregate.query.sql_with_params()
+
+    table = connection.ops.quote_name(BlogViewDailyRollup._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} "
+            "(id, created_at, updated_at, day, blog_id, viewer_country_id, viewer_user_id, view_count) "
+            "SELECT gen_random_uuid(), now(), now(), "
+            "agg.day, agg.blog_id, agg.viewer_country_id, agg.viewer_user_id, agg.view_count "
+            f"FROM ({select_sql}) AS agg",
+            params,
+        )
+        return cursor.rowcount
+
+
+def _sketch_rebuild_range(*, first_day: date | None, last_day: date | None) -> int:
+    """
+    Replace BlogViewDailySketch rows for [first_day, last_day] from the daily rollup.
+
+    Rollup rows are streamed in day order and sketches are written one day at a
+    time, so memory is bounded by a single day's distinct keys.
+    """
+    sketches = BlogViewDailySketch.objects.all()
+    rollups = BlogViewDailyRollup.objects.all()
+
+    if first_day is not None:
+        sketches = sketches.filter(day__gte=first_day)
+        rollups = rollups.filter(day__gte=first_day)
+    if last_day is not None:
+        sketches = sketches.filter(day__lte=last_day)
+        rollups = rollups.filter(day__lte=last_day)
+
+    sketches.delete()
+
+    rows = rollups.values_list("day", "blog_id", "viewer_country_id", "viewer_user_id", "view_count").order_by("day")
+
+    written = 0
+    current_day: date | None = None
+    accumulators: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+    def flush() -> int:
+        objs = [
+            BlogViewDailySketch(
+                day=current_day,
+                dimension=dimension,
+                key=key,
+                view_count=acc["view_count"],
+                **{field: acc[field].to_bytes() for field in SKETCH_FIELDS[dimension]},
+            )
+            for (dimension, key), acc in accumulators.items()
+        ]
+        BlogViewDailySketch.objects.bulk_create(objs, batch_size=1000)
+        accumulators.clear()
+        return len(objs)
+
+    for day, blog_id, country_id, user_id, view_count in rows.iterator(chunk_size=5000):
+        if day != current_day:
+            written += flush()
+            current_day = day
+
+        members = {"blogs": blog_id, "users": user_id, "countries": country_id}
+        keys = {
+            BlogViewDailySketch.Dimension.BLOG: blog_id,
+            BlogViewDailySketch.Dimension.COUNTRY: country_id,
+            BlogViewDailySketch.Dimension.USER: user_id,
+        }
+        for dimension, fields in SKETCH_FIELDS.items():
+            key = "" if keys[dimension] is None else str(keys[dimension])
+            acc = accumulators.get((dimension, key))
+            if acc is None:
+                acc = {"view_count": 0, **{field: HyperLogLog() for field in fields}}
+                accumulators[(dimension, key)] = acc
+            acc["view_count"] += view_count
+            for field in fields:
+                # Distinct counts ignore missing users and countries, as Count(distinct=True) does
+                if members[field] is not None:
+                    acc[field].add(str(members[field]))
+
+    written += flush()
+    return written
+
+
+def _leaderboard_rollups(*, first_day: date | None, last_day: date | None):
+    rollups = BlogViewDailyRollup.objects.all()
+    if first_day:
+        rollups = rollups.filter(day__gte=first_day)
+    if last_day:
+        rollups = rollups.filter(day__lte=last_day)
+    return rollups
+
+
+def _leaderboard_rebuild(*, top_type: str, window: str, first_day: date | None, last_day: date | None) -> int:
+    """Recompute one leaderboard from the daily rollup, keeping the top ANALYTICS_LEADERBOARD_DEPTH entries."""
+    rollups = _leaderboard_rollups(first_day=first_day, last_day=last_day)
+
+    depth = settings.ANALYTICS_LEADERBOARD_DEPTH
+    source = ViewSource(queryset=rollups, views=Sum("view_count"), time_field="day")
+    ranked = list(top_ranking_queryset(source, top_type)[: depth + 1])
+
+    board, _ = Leaderboard.objects.update_or_create(
+        top_type=top_type,
+        window=window,
+        defaults={
+            "first_day": first_day,
+            "last_day": last_day,
+            "size": min(len(ranked), depth),
+            "complete": len(ranked) <= depth,
+        },
+    )
+    board.entries.all().delete()
+    LeaderboardEntry.objects.bulk_create(
+        [
+            LeaderboardEntry(leaderboard=board, key=str(row["key"]), x=row["x"], y=row["y"], z=row["z"])
+            for row in ranked[:depth]
+        ],
+        batch_size=1000,
+    )
+    return board.size
+
+
+def _rollup_keys(*, first_day: date, last_day: date) -> Dict[str, set[str]]:
+    """Leaderboard keys, by top type, that have rollup rows in [first_day, last_day]."""
+    keys: Dict[str, set[str]] = {top_type: set() for top_type in RANK_KEY_FIELDS}
+    rows = (
+        BlogViewDailyRollup.objects.filter(day__range=(first_day, last_day))
+        .values_list(*RANK_KEY_FIELDS.values())
+        .distinct()
+    )
+    for row in rows:
+        for top_type, key in zip(RANK_KEY_FIELDS, row):
+            if key is not None:
+                keys[top_type].add(str(key))
+    return keys
+
+
+def _leaderboard_merge(board: Leaderboard, *, ranges: List[Tuple[date, date]], dropped: set[str]) -> int | None:
+    """
+    Fold recomputed rollup days into an existing board.
+
+    Only entities with rollup rows on those days, or with rows there before they were
+    recomputed (`dropped`), can have moved: their x, y, z are recomputed over the
+    board's window and merged with the stored entries, and only entries that changed
+    are written. Entities off a cut board kept their totals, so they still rank below
+    its last entry as long as no entry on it lost views.
+
+    Returns:
+        Number of entries written, or None when the board must be rebuilt instead (an
+        entry of a cut board lost views, so an entity off the board may now outrank it)
+    """
+    depth = settings.ANALYTICS_LEADERBOARD_DEPTH
+    rollups = _leaderboard_rollups(first_day=board.first_day, last_day=board.last_day)
+    touched = Q()
+    for first_day, last_day in ranges:
+        touched |= Q(day__range=(first_day, last_day))
+    key_field = RANK_KEY_FIELDS[board.top_type]
+    moved = Q(**{f"{key_field}__in": rollups.filter(touched).values(key_field)})
+    if dropped:
+        moved |= Q(**{f"{key_field}__in": dropped})
+    source = ViewSource(queryset=rollups.filter(moved), views=Sum("view_count"), time_field="day")
+    fresh = {str(row["key"]): row for row in top_ranking_queryset(source, board.top_type)}
+
+    entries = {entry.key: entry for entry in board.entries.all()}
+    # Entities that no longer have rows in the window
+    gone = {key for key in dropped if key not in fresh and key in entries}
+    if not board.complete and (gone or any(key in entries and row["y"] < entries[key].y for key, row in fresh.items())):
+        return None
+
+    candidates = {key: (entry.x, entry.y, entry.z) for key, entry in entries.items() if key not in gone}
+    candidates.update({key: (row["x"], row["y"], row["z"]) for key, row in fresh.items()})
+    ranked = sorted(candidates.items(), key=lambda item: (-item[1][1], item[0]))
+    kept = dict(ranked[:depth])
+
+    created, updated = [], []
+    for key, (x, y, z) in kept.items():
+        entry = entries.get(key)
+        if entry is None:
+            created.append(LeaderboardEntry(leaderboard=board, key=key, x=x, y=y, z=z))
+        elif (entry.x, entry.y, entry.z) != (x, y, z):
+            entry.x, entry.y, entry.z = x, y, z
+            updated.append(entry)
+    board.entries.exclude(key__in=kept).delete()
+    LeaderboardEntry.objects.bulk_create(created, batch_size=1000)
+    LeaderboardEntry.objects.bulk_update(updated, ["x", "y", "z", "updated_at"], batch_size=1000)
+
+    board.size = len(kept)
+    # A board that held every entity still does while it has room for the new ones
+    board.complete = board.complete and len(ranked) <= depth
+    board.save(update_fields=["size", "complete", "updated_at"])
+    return len(created) + len(updated)
+
+
+def leaderboards_refresh(
+    *,
+    ranges: List[Tuple[date, date]] | None = None,
+    dropped: Dict[str, set[str]] | None = None,
+    today: date | None = None,
+) -> int:
+    """
+    Bring the all-time, rolling and calendar-month leaderboards up to date with the rollup.
+
+    Boards are refreshed incrementally: the rollup days in `ranges` (inclusive, as
+    recomputed by rollup_refresh) are merged into boards whose window they overlap,
+    and boards their days do not overlap are left alone. `dropped` holds, by top type,
+    the keys that had rollup rows on those days before they were recomputed but have
+    none now. A board is rebuilt when it does not exist yet, when its window moved
+    (rolling boards, once a day), when the depth changed or when a merge cannot be
+    exact. None rebuilds every board, including one per month that has rollup rows.
+
+    Returns:
+        Number of leaderboard entries written
+    """
+    today = today or timezone.now().date()
+    windows: List[Tuple[str, date | None, date | None]] = [("all", None, None)]
+    windows += [(name, today - timedelta(days=days - 1), today) for name, days in ROLLING_WINDOWS.items()]
+
+    if ranges is None:
+        first_day = BlogViewDailyRollup.objects.aggregate(first=Min("day"))["first"]
+        months = []
+        month = first_day.replace(day=1) if first_day else None
+        while month and month <= today:
+            months.append(month)
+            month = month_add(month, 1)
+    else:
+        months = set()
+        for first_day, last_day in ranges:
+            month = first_day.replace(day=1)
+            while month <= last_day:
+                months.add(month)
+                month = month_add(month, 1)
+    for month in sorted(set(months)):
+        windows.append((f"{month:%Y-%m}", month, month_add(month, 1) - timedelta(days=1)))
+
+    depth = settings.ANALYTICS_LEADERBOARD_DEPTH
+    boards = {(board.top_type, board.window): board for board in Leaderboard.objects.all()}
+    written = 0
+    for top_type in Leaderboard.TopType.values:
+        for window, first_day, last_day in windows:
+            board = boards.get((top_type, window))
+            merged = None
+            if (
+                ranges is not None
+                and board is not None
+                and (board.first_day, board.last_day) == (first_day, last_day)
+                and (board.size == depth or (board.complete and board.size <= depth))
+            ):
+                overlapping = [
+                    (first, last)
+                    for first, last in ranges
+                    if (last_day is None or first <= last_day) and (first_day is None or last >= first_day)
+                ]
+                merged = (
+                    _leaderboard_merge(board, ranges=overlapping, dropped=(dropped or {}).get(top_type, set()))
+                    if overlapping
+                    else 0
+                )
+            if merged is None:
+                merged = _leaderboard_rebuild(top_type=top_type, window=window, first_day=first_day, last_day=last_day)
+            written += merged
+    return written
+
+
+@transaction.atomic
+def rollup_refresh(*, rebuild: bool = False) -> Dict[str, Any]:
+    """
+    Fold newly created BlogView rows into BlogViewDailyRollup and BlogViewDailySketch,
+    then merge the recomputed days into the leaderboards.
+
+    The watermark tracks the highest BlogView.created_at already processed. Every
+    day touched by a view created after it (late arrivals included) is recomputed
+    from raw rows, which keeps the refresh idempotent and exact. Views created in
+    the last ANALYTICS_ROLLUP_SETTLE_SECONDS are left for the next run. Rebuilds and
+    late arrivals for days before the previous watermark's day bump the HISTORY data
+    version, which drops cached results of closed periods.
+
+    Args:
+        rebuild: Discard all rollup rows and aggregate BlogView from scratch
+
+    Returns:
+        Dict with keys: watermark (new high-water mark), days (recomputed days, None on a full
+        rebuild), rows (rollup rows written), sketches (sketch rows written), leaderboard_entries
+        (entries written by leaderboards_refresh)
+    """
+    watermark, _ = RollupWatermark.objects.select_for_update().get_or_create(name=RollupWatermark.BLOGVIEW_DAILY)
+    upper = timezone.now() - timedelta(seconds=settings.ANALYTICS_ROLLUP_SETTLE_SECONDS)
+
+    if rebuild or watermark.watermark is None:
+        rows = _rollup_rebuild_range(first_day=None, last_day=None)
+        sketches = _sketch_rebuild_range(first_day=None, last_day=None)
+        days: int | None = None
+        ranges: List[Tuple[date, date]] | None = None
+        dropped: Dict[str, set[str]] | None = None
+        history_changed = True
+    else:
+        touched = (
+            BlogView.objects.filter(created_at__gt=watermark.watermark, created_at__lte=upper)
+            .annotate(day=TruncDate("viewed_at"))
+            .values_list("day", flat=True)
+            .order_by()
+            .distinct()
+        )
+        ranges = _day_ranges(touched)
+        rows = sketches = 0
+        dropped = {top_type: set() for top_type in RANK_KEY_FIELDS}
+        for first_day, last_day in ranges:
+            before = _rollup_keys(first_day=first_day, last_day=last_day)
+            rows += _rollup_rebuild_range(first_day=first_day, last_day=last_day)
+            sketches += _sketch_rebuild_range(first_day=first_day, last_day=last_day)
+            after = _rollup_keys(first_day=first_day, last_day=last_day)
+            for top_type, keys in before.items():
+                dropped[top_type] |= keys - after[top_type]
+        days = sum((last - first).days + 1 for first, last in ranges)
+        # Days before the previous watermark's day were closed and may be cached as final
+        closed_before = timezone.localtime(watermark.watermark).date()
+        history_changed = any(first_day < closed_before for first_day, _ in ranges)
+
+    entries = 0
+    if settings.ANALYTICS_LEADERBOARDS_ENABLED:
+        # Rolling windows move with the calendar, so they are rebuilt at least once a day
+        current = Leaderboard.objects.filter(window="7d", last_day=timezone.now().date()).exists()
+        if ranges is None or ranges or not current:
+            entries = leaderboards_refresh(ranges=ranges, dropped=dropped)
+
+    if history_changed:
+        data_version_bump(DataVersion.HISTORY)
+
+    watermark.watermark = upper
+    watermark.save(update_fields=["watermark", "updated_at"])
+
+    logger.info(
+        f"Rollup {RollupWatermark.BLOGVIEW_DAILY} refreshed to {upper.isoformat()}: "
+        f"days={days} rows={rows} sketches={sketches} leaderboard_entries={entries}"
+    )
+
+    return {"watermark": upper, "days": days, "rows": rows, "sketches": sketches, "leaderboard_entries": entries}
+
+
+def _uuid_or_none(value: Any) -> uuid.UUID | None:
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def _view_event_parse(event: Any) -> Dict[str, Any]:
+    """
+    Validate the shape of one raw view event.
+
+    Raises:
+        ValueError: with a client-facing message when the event is malformed
+    """
+    if not isinstance(event, dict):
+        raise ValueError("Event must be a JSON object")
+
+    blog_id = _uuid_or_none(event.get("blog"))
+    if blog_id is None:
+        raise ValueError("blog must be a UUID")
+
+    user_id = None
+    if event.get("viewer_user") is not None:
+        user_id = _uuid_or_none(event["viewer_user"])
+        if user_id is None:
+            raise ValueError("viewer_user must be a UUID")
+
+    country_code = event.get("viewer_country")
+    if country_code is not None:
+        if not isinstance(country_code, str) or len(country_code) != 2:
+            raise ValueError("viewer_country must be an ISO 3166-1 alpha-2 code")
+        country_code = country_code.upper()
+
+    viewed_at = timezone.now()
+    if event.get("viewed_at") is not None:
+        parsed = parse_datetime(event["viewed_at"]) if isinstance(event["viewed_at"], str) else None
+        if parsed is None:
+            raise ValueError("viewed_at must be an ISO 8601 datetime")
+        viewed_at = timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+    view_id = uuid.uuid4()
+    if event.get("id") is not None:
+        view_id = _uuid_or_none(event["id"])
+        if view_id is None:
+            raise ValueError("id must be a UUID")
+
+    return {
+        "id": view_id,
+        "blog_id": blog_id,
+        "viewer_user_id": user_id,
+        "viewer_country": country_code,
+        "viewed_at": viewed_at,
+    }
+
+
+def _copy_into_staging(cursor, rows: Iterable[Tuple[Any, ...]]) -> None:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        # csv writes None as an empty unquoted field, which COPY reads as NULL
+        writer.writerow(["" if value is None else value for value in row])
+    buffer.seek(0)
+
+    cursor.copy_expert(f"COPY {STAGING_TABLE} ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def blog_views_bulk_ingest(*, events: List[Any]) -> Dict[str, Any]:
+    """
+    Ingest a batch of view events with one COPY and one INSERT ... SELECT.
+
+    Blog ids, user ids and country codes are resolved with one query each. Valid
+    events are COPY'd into the unlogged staging table and merged into BlogView in
+    the same transaction. Events carrying an `id` that already exists, whatever their
+    `viewed_at`, are skipped and so are repeats of an `id` within the batch, so a
+    tracker can safely retry a batch.
+
+    Args:
+        events: Event dicts with keys blog (UUID), viewer_user (UUID, optional),
+            viewer_country (ISO code, optional), viewed_at (ISO datetime, optional)
+            and id (UUID, optional)
+
+    Returns:
+        Dict with keys: accepted, rejected, duplicates, errors (index and reason of
+        the first rejected events)
+    """
+    if len(events) > settings.ANALYTICS_BULK_MAX_EVENTS:
+        raise ApplicationError(
+            f"A batch may contain at most {settings.ANALYTICS_BULK_MAX_EVENTS} events",
+            extra={"received": len(events)},
+        )
+
+    errors: List[Dict[str, Any]] = []
+    parsed: List[Tuple[int, Dict[str, Any]]] = []
+    for index, event in enumerate(events):
+        try:
+            parsed.append((index, _view_event_parse(event)))
+        except ValueError as exc:
+            errors.append({"index": index, "error": str(exc)})
+
+    blog_ids = set(Blog.objects.filter(id__in={p["blog_id"] for _, p in parsed}).values_list("id", flat=True))
+    user_ids = set(
+        User.objects.filter(id__in={p["viewer_user_id"] for _, p in parsed if p["viewer_user_id"]}).values_list(
+            "id", flat=True
+        )
+    )
+    country_ids = dict(
+        Country.objects.filter(code__in={p["viewer_country"] for _, p in parsed if p["viewer_country"]}).values_list(
+            "code", "id"
+        )
+    )
+
+    batch_id = uuid.uuid4()
+    rows = []
+    for index, event in parsed:
+        if event["blog_id"] not in blog_ids:
+            errors.append({"index": index, "error": "Unknown blog"})
+        elif event["viewer_user_id"] and event["viewer_user_id"] not in user_ids:
+            errors.append({"index": index, "error": "Unknown viewer_user"})
+        elif event["viewer_country"] and event["viewer_country"] not in country_ids:
+            errors.append({"index": index, "error": "Unknown viewer_country"})
+        else:
+            rows.append((
+                batch_id,
+                event["id"],
+                event["blog_id"],
+                event["viewer_user_id"],
+                country_ids.get(event["viewer_country"]),
+                event["viewed_at"].isoformat(),
+            ))
+
+    inserted = 0
+    if rows:
+        table = connection.ops.quote_name(BlogView._meta.db_table)
+        with transaction.atomic(), connection.cursor() as cursor:
+            _copy_into_staging(cursor, rows)
+            cursor.execute(
+                f"INSERT INTO {table} "
+                "(id, created_at, updated_at, viewed_at, blog_id, viewer_user_id, viewer_country_id) "
+                # The primary key is (id, viewed_at), so ON CONFLICT alone would insert a retried
+                # event again whenever its viewed_at differs (e.g. defaulted to the time of receipt)
+                "SELECT DISTINCT ON (s.id) s.id, now(), now(), s.viewed_at, s.blog_id, "
+                "s.viewer_user_id, s.viewer_country_id "
+                f"FROM {STAGING_TABLE} s WHERE s.batch_id = %s "
+                f"AND NOT EXISTS (SELECT 1 FROM {table} v WHERE v.id = s.id) "
+                "ORDER BY s.id, s.viewed_at "
+                "ON CONFLICT DO NOTHING",
+                [batch_id],
+            )
+            inserted = cursor.rowcount
+            cursor.execute(f"DELETE FROM {STAGING_TABLE} WHERE batch_id = %s", [batch_id])
+
+    errors.sort(key=lambda error: error["index"])
+    logger.info(f"Bulk ingest: {inserted} inserted, {len(rows) - inserted} duplicates, {len(errors)} rejected")
+
+    return {
+        "accepted": inserted,
+        "rejected": len(errors),
+        "duplicates": len(rows) - inserted,
+        "errors": errors[:MAX_REPORTED_ERRORS],
+    }
+
+
+view_buffer = WriteBehindBuffer(
+    name="blog_views",
+    flush=lambda events: blog_views_bulk_ingest(events=events),
+    max_batch=min(settings.ANALYTICS_BUFFER_MAX_BATCH, settings.ANALYTICS_BULK_MAX_EVENTS),
+    max_age=settings.ANALYTICS_BUFFER_MAX_AGE_SECONDS,
+    capacity=settings.ANALYTICS_BUFFER_CAPACITY,
+)
+
+
+def blog_view_track(
+    *,
+    blog: uuid.UUID,
+    viewer_user: uuid.UUID | None = None,
+    viewer_country: str | None = None,
+    viewed_at: datetime | None = None,
+) -> uuid.UUID:
+    """
+    Record a single view through the write-behind buffer.
+
+    The id and timestamp are fixed here, so the view keeps the time of the hit and a
+    retried flush cannot insert it twice. Unknown blogs, users or countries are only
+    detected when the batch is flushed and are then counted as rejected.
+
+    Raises:
+        BufferFullError: when the buffer of this worker is at capacity
+
+    Returns:
+        The id assigned to the view
+    """
+    view_id = uuid.uuid4()
+    event = {
+        "id": str(view_id),
+        "blog": str(blog),
+        "viewer_user": str(viewer_user) if viewer_user else None,
+        "viewer_country": viewer_country,
+        "viewed_at": (viewed_at or timezone.now()).isoformat(),
+    }
+
+    if settings.ANALYTICS_BUFFER_ENABLED:
+        view_buffer.add(event)
+    else:
+        blog_views_bulk_ingest(events=[event])
+    return view_id
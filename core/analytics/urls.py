@@ -1,6 +1,17 @@
 from django.urls import path
 
-from core.analytics.apis import BlogViewsApi, PerformanceApi, TopApi
+from core.analytics.apis import (
+    BatchApi,
+    BlogViewBufferApi,
+    BlogViewBulkApi,
+    BlogViewTrackApi,
+    BlogViewsApi,
+    CacheStatsApi,
+    DatabasePoolApi,
+    ExportApi,
+    PerformanceApi,
+    TopApi,
+)
 
 app_name = "analytics"
 
@@ -8,4 +19,11 @@ urlpatterns = [
     path("blog-views/", BlogViewsApi.as_view(), name="blog-views"),
     path("top/", TopApi.as_view(), name="top"),
     path("performance/", PerformanceApi.as_view(), name="performance"),
+    path("batch/", BatchApi.as_view(), name="batch"),
+    path("export/", ExportApi.as_view(), name="export"),
+    path("cache/", CacheStatsApi.as_view(), name="cache-stats"),
+    path("db/", DatabasePoolApi.as_view(), name="db-stats"),
+    path("views/", BlogViewTrackApi.as_view(), name="views-track"),
+    path("views/buffer/", BlogViewBufferApi.as_view(), name="views-buffer"),
+    path("views/bulk/", BlogViewBulkApi.as_view(), name="views-bulk"),
 ]
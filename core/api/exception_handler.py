@@ -12,7 +12,9 @@ from rest_framework.response import Response
 from rest_framework.serializers import as_serializer_error
 from rest_framework.views import exception_handler
 
-from .exceptions import ApplicationError
+from core.common.db import PoolTimeoutError
+
+from .exceptions import ApplicationError, ServiceUnavailable
 
 
 def drf_exception_handler(exc, ctx):
@@ -31,6 +33,10 @@ def drf_exception_handler(exc, ctx):
     if isinstance(exc, PermissionDenied):
         exc = exceptions.PermissionDenied()
 
+    # Every database connection of the worker stayed busy: shed the request instead of queueing it
+    if isinstance(exc, PoolTimeoutError):
+        exc = ServiceUnavailable("Database is busy, try again later.", wait=1)
+
     # Handle database constraint violations
     if isinstance(exc, IntegrityError):
         error_message = str(exc)
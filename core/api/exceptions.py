@@ -3,7 +3,7 @@ import re
 
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import IntegrityError
-from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.exceptions import APIException, NotFound, ValidationError
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +31,18 @@ class InvalidStateError(ApplicationError):
     pass
 
 
+class ServiceUnavailable(APIException):
+    """503 for temporary overload; `wait` is sent as the Retry-After header."""
+
+    status_code = 503
+    default_detail = "Service temporarily unavailable, try again later."
+    default_code = "service_unavailable"
+
+    def __init__(self, detail=None, code=None, wait: int | None = None):
+        super().__init__(detail, code)
+        self.wait = wait
+
+
 def handle_api_exception(exception, operation_name="operation"):
     """
     Centralized exception handler for API operations.
@@ -0,0 +1,247 @@
+"""
+Negotiated compression of API responses.
+
+Responses of views in the `api` URL namespace are compressed with the coding the
+client accepts with the highest q-value in Accept-Encoding, ties going to the first
+of API_COMPRESSION_ENCODINGS: zstd, br (brotli) or gzip. The level comes from the
+route's profile (API_COMPRESSION_ROUTES).
+
+Bodies smaller than API_COMPRESSION_MIN_BYTES, bodies that are already encoded and
+formats that are compressed already are sent as they are. Streaming responses are
+compressed chunk by chunk, each chunk flushed so it reaches the client as soon as
+it is produced; under ASGI their async iterators stay async.
+"""
+
+import zlib
+from typing import AsyncIterator, Iterable, Iterator
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Level of each coding by profile
+PROFILES = {
+    "fast": {"zstd": 1, "br": 1, "gzip": 1},
+    "default": {"zstd": 3, "br": 4, "gzip": 6},
+    "small": {"zstd": 12, "br": 9, "gzip": 9},
+}
+
+# Content types whose bodies are compressed already
+COMPRESSED_CONTENT_TYPES = (
+    "image/",
+    "video/",
+    "audio/",
+    "font/woff",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/zstd",
+    "application/x-bzip2",
+    "application/x-xz",
+)
+
+# Under ASGI, bodies larger than this are compressed off the event loop
+OFFLOAD_BYTES = 256 * 1024
+
+
+class GzipCodec:
+    """gzip: whole bodies with `compress`, streams with an instance."""
+
+    def __init__(self, level: int):
+        # wbits=31 writes a gzip header and trailer around the deflate stream
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    @staticmethod
+    def compress(data: bytes, level: int) -> bytes:
+        return zlib.compress(data, level, wbits=31)
+
+    def compress_chunk(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliCodec:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    @staticmethod
+    def compress(data: bytes, level: int) -> bytes:
+        return brotli.compress(data, quality=level)
+
+    def compress_chunk(self, chunk: bytes) -> bytes:
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdCodec:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    @staticmethod
+    def compress(data: bytes, level: int) -> bytes:
+        return zstandard.ZstdCompressor(level=level).compress(data)
+
+    def compress_chunk(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+Codec = GzipCodec | BrotliCodec | ZstdCodec
+
+# Codings whose packages are installed
+CODECS: dict[str, type[Codec]] = {
+    "gzip": GzipCodec,
+    **({"br": BrotliCodec} if BROTLI_AVAILABLE else {}),
+    **({"zstd": ZstdCodec} if ZSTD_AVAILABLE else {}),
+}
+
+
+def negotiate_encoding(accept_encoding: str, offered: list[str]) -> str | None:
+    """
+    The offered coding the client accepts with the highest q-value, the first offered
+    on a tie, or None when it accepts none of them.
+    """
+    qualities: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for coding in offered:
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def _compress_stream(chunks: Iterable[bytes], codec: Codec) -> Iterator[bytes]:
+    for chunk in chunks:
+        compressed = codec.compress_chunk(chunk)
+        if compressed:
+            yield compressed
+    yield codec.finish()
+
+
+async def _acompress_stream(chunks: AsyncIterator[bytes], codec: Codec) -> AsyncIterator[bytes]:
+    async for chunk in chunks:
+        compressed = codec.compress_chunk(chunk)
+        if compressed:
+            yield compressed
+    yield codec.finish()
+
+
+class CompressionMiddleware:
+    """
+    Compress API responses (see the module docstring).
+
+    Place it before any middleware that reads or changes response bodies, so it sees
+    them last.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+        self.offered = [coding for coding in settings.API_COMPRESSION_ENCODINGS if coding in CODECS]
+        unknown = {coding for coding in settings.API_COMPRESSION_ENCODINGS if coding not in PROFILES["default"]} | {
+            profile for profile in settings.API_COMPRESSION_ROUTES.values() if profile not in PROFILES
+        }
+        if unknown:
+            raise ImproperlyConfigured(f"Unknown compression encodings or profiles: {', '.join(sorted(unknown))}")
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        coding = self.select(request, response)
+        if coding:
+            self.compress(response, *coding)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        coding = self.select(request, response)
+        if coding:
+            if not response.streaming and len(response.content) > OFFLOAD_BYTES:
+                await sync_to_async(self.compress, thread_sensitive=False)(response, *coding)
+            else:
+                self.compress(response, *coding)
+        return response
+
+    def select(self, request, response) -> tuple[str, int] | None:
+        """The coding and level to compress `response` with, or None to send it as it is."""
+        match = getattr(request, "resolver_match", None)
+        if not settings.API_COMPRESSION_ENABLED or match is None or "api" not in match.namespaces:
+            return None
+
+        # Whether or not this one is compressed, the representation depends on the header
+        patch_vary_headers(response, ["Accept-Encoding"])
+        if (
+            response.has_header("Content-Encoding")
+            or response.status_code in (204, 206, 304)
+            or response.get("Content-Type", "").startswith(COMPRESSED_CONTENT_TYPES)
+            or (not response.streaming and len(response.content) < settings.API_COMPRESSION_MIN_BYTES)
+        ):
+            return None
+
+        coding = negotiate_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""), self.offered)
+        if coding is None:
+            return None
+        profile = settings.API_COMPRESSION_ROUTES.get(match.url_name, "default")
+        return coding, PROFILES[profile][coding]
+
+    def compress(self, response, coding: str, level: int) -> None:
+        codec = CODECS[coding]
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = _acompress_stream(response.streaming_content, codec(level))
+            else:
+                response.streaming_content = _compress_stream(response.streaming_content, codec(level))
+            # The length is not known before the last chunk
+            response.headers.pop("Content-Length", None)
+        else:
+            compressed = codec.compress(response.content, level)
+            if len(compressed) >= len(response.content):
+                return
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # The encoded bytes differ, but the representation is the same
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = coding
@@ -0,0 +1,35 @@
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline-delimited JSON into a list.
+
+    Blank lines are skipped. A line that is not valid JSON becomes None, so the
+    caller can reject that single record instead of the whole upload.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        try:
+            lines = stream.read().decode(encoding).splitlines()
+        except UnicodeDecodeError as exc:
+            raise ParseError(f"NDJSON parse error - {exc}") from exc
+
+        records = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                records.append(None)
+        return records
@@ -1,6 +1,54 @@
 import json
+from typing import Any
 
 from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgpack
+
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+# Types orjson leaves to `default` (Decimal, lazy strings, timedelta, ...) are encoded as DRF would
+_drf_encoder = encoders.JSONEncoder()
+
+
+def encode_json(data) -> bytes:
+    """Compact UTF-8 JSON, with orjson when it is installed and the stdlib encoder otherwise."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, default=_drf_encoder.default, option=orjson.OPT_UTC_Z)
+    return json.dumps(data, cls=encoders.JSONEncoder, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def row_columns(rows: list[dict], names: list[str] | None = None) -> dict[str, list]:
+    """Rows (dicts with the same keys) as one list per key; `names` defaults to the first row's keys."""
+    if names is None:
+        names = list(rows[0]) if rows else []
+    return {name: [row[name] for row in rows] for name in names}
+
+
+def dictionary_encode(values: list) -> dict[str, list]:
+    """Distinct values in order of first appearance, and the index of each value among them."""
+    codes: dict = {}
+    indices = [codes.setdefault(value, len(codes)) for value in values]
+    return {"dictionary": list(codes), "indices": indices}
 
 
 class CustomJSONRenderer(JSONRenderer):
@@ -87,3 +135,119 @@ class CustomJSONRenderer(JSONRenderer):
             }
 
         return super().render(formatted_data, accepted_media_type, renderer_context)
+
+
+class FastJSONRenderer(CustomJSONRenderer):
+    """
+    CustomJSONRenderer for views whose result is already plain data, such as selector
+    rows passed through without an output serializer.
+
+    A successful `{"result": ..., "meta": ...}` is wrapped in the envelope without
+    copying the result and encoded in one pass (see `encode_json`). Everything else,
+    errors included, is rendered by CustomJSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        response = renderer_context.get("response", None)
+        if (
+            not isinstance(data, dict)
+            or "result" not in data
+            or "message" in data
+            or (response and response.status_code >= 400)
+            or self.get_indent(accepted_media_type or "", renderer_context)
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return self.encode(
+            {
+                "status": "success",
+                "result": data["result"],
+                "meta": {
+                    "version": "v1",
+                    **data.get("meta", {}),
+                },
+                "message": "Request processed successfully",
+            },
+            renderer_context,
+        )
+
+    def encode(self, envelope: dict, renderer_context: dict) -> bytes:
+        return encode_json(envelope)
+
+
+class ColumnarJSONRenderer(FastJSONRenderer):
+    """
+    The envelope with the result rows as one array per field, string fields
+    dictionary encoded: `{"x": {"dictionary": [...], "indices": [...]}, "y": [...]}`.
+
+    The fields are the view's `result_columns` (so an empty result still has them),
+    or the keys of the first row.
+    """
+
+    media_type = "application/vnd.ideeza.columnar+json"
+    format = "columnar"
+
+    def columns(self, rows: list[dict], renderer_context: dict) -> dict[str, list]:
+        return row_columns(rows, getattr(renderer_context.get("view"), "result_columns", None))
+
+    def encode(self, envelope: dict, renderer_context: dict) -> bytes:
+        return encode_json({**envelope, "result": self.columnar(envelope["result"], renderer_context)})
+
+    def columnar(self, rows: list[dict], renderer_context: dict) -> dict[str, Any]:
+        columns: dict[str, Any] = self.columns(rows, renderer_context)
+        for name, values in columns.items():
+            if values and isinstance(values[0], str):
+                columns[name] = dictionary_encode(values)
+        return columns
+
+
+class MessagePackRenderer(ColumnarJSONRenderer):
+    """The columnar envelope of ColumnarJSONRenderer, as MessagePack."""
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    render_style = "binary"
+
+    def encode(self, envelope: dict, renderer_context: dict) -> bytes:
+        return msgpack.packb(
+            {**envelope, "result": self.columnar(envelope["result"], renderer_context)},
+            default=_drf_encoder.default,
+        )
+
+
+class ArrowRenderer(ColumnarJSONRenderer):
+    """
+    The result rows as an Arrow IPC stream, string columns dictionary encoded. The
+    rest of the envelope is in the schema metadata: `status`, `message`, and `meta`
+    as JSON.
+    """
+
+    media_type = "application/vnd.apache.arrow.stream"
+    format = "arrow"
+    render_style = "binary"
+
+    def encode(self, envelope: dict, renderer_context: dict) -> bytes:
+        arrays = {}
+        for name, values in self.columns(envelope["result"], renderer_context).items():
+            array = pyarrow.array(values)
+            arrays[name] = array.dictionary_encode() if pyarrow.types.is_string(array.type) else array
+        table = pyarrow.table(arrays).replace_schema_metadata({
+            "status": envelope["status"],
+            "message": envelope["message"],
+            "meta": encode_json(envelope["meta"]),
+        })
+        sink = pyarrow.BufferOutputStream()
+        with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+
+# Renderers of views answering with rows, in order of preference: the formats whose
+# packages are not installed are left out
+ROW_RENDERER_CLASSES = [
+    FastJSONRenderer,
+    ColumnarJSONRenderer,
+    *([MessagePackRenderer] if MSGPACK_AVAILABLE else []),
+    *([ArrowRenderer] if ARROW_AVAILABLE else []),
+]
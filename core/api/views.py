@@ -0,0 +1,41 @@
+import inspect
+
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers are coroutines, so Django runs it on the event loop rather
+    than on the single thread it funnels sync views through under ASGI.
+
+    DRF's own request handling (parsing, content negotiation, exception handling) is
+    synchronous and CPU-bound and runs on the loop; handlers must keep blocking work
+    off it (see core.common.db.db_run). Authentication, permission and throttle classes
+    of these views must not touch the database.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            self.initial(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            # OPTIONS and 405s are answered by DRF's sync handlers
+            if inspect.isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
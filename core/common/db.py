@@ -0,0 +1,239 @@
+"""
+Database work from async code.
+
+Django's async ORM and sync_to_async(thread_sensitive=True) run all sync work of a
+worker process on one shared thread, so under ASGI concurrent requests queue up behind
+each other's queries. `db_run` uses a bounded pool of DB_POOL_SIZE threads instead,
+each with its own connection that is recycled like a request's would be. The pool is
+sized per worker from the connection budget of the deployment (see the settings).
+
+Callers wait at most DB_POOL_TIMEOUT seconds for a free thread; after that
+`PoolTimeoutError` is raised, which the API turns into a 503 rather than letting
+requests pile up. `db_iter` streams from a pool thread, which it holds until the
+iteration ends.
+"""
+
+import asyncio
+import contextlib
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncGenerator, Callable, Iterable, TypeVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+T = TypeVar("T")
+
+
+class PoolTimeoutError(Exception):
+    """No pool connection became free within DB_POOL_TIMEOUT."""
+
+
+class DatabasePool:
+    """Bounded pool of database threads of this worker process, with saturation counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._pid: int | None = None
+        # asyncio primitives belong to one event loop
+        self._slots: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self._in_use = 0
+        self._waiting = 0
+        self._peak_in_use = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # A pool inherited through fork (gunicorn preload_app) has no live threads
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    self._executor = ThreadPoolExecutor(max_workers=settings.DB_POOL_SIZE, thread_name_prefix="db")
+                    self._slots = weakref.WeakKeyDictionary()
+                    self._reset_counters()
+                    self._pid = os.getpid()
+        return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            slots = self._slots.get(loop)
+            if slots is None:
+                slots = self._slots[loop] = asyncio.Semaphore(settings.DB_POOL_SIZE)
+            return slots
+
+    async def _checkout(self, slots: asyncio.Semaphore) -> None:
+        started = time.monotonic()
+        with self._lock:
+            self._waiting += 1
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=settings.DB_POOL_TIMEOUT)
+        except TimeoutError:
+            with self._lock:
+                self._timeouts += 1
+            raise PoolTimeoutError(f"No database connection became free within {settings.DB_POOL_TIMEOUT}s") from None
+        finally:
+            with self._lock:
+                self._waiting -= 1
+        waited = time.monotonic() - started
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._peak_in_use = max(self._peak_in_use, self._in_use)
+            self._wait_seconds_total += waited
+            self._wait_seconds_max = max(self._wait_seconds_max, waited)
+
+    def _checkin(self, slots: asyncio.Semaphore) -> None:
+        with self._lock:
+            self._in_use -= 1
+        slots.release()
+
+    async def run(self, func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """See `db_run`."""
+        executor = self._get_executor()
+        slots = self._get_slots()
+        await self._checkout(slots)
+        state: dict[str, Any] = {"cancelled": False, "wrappers": []}
+
+        def call() -> T:
+            # Resolved here: connections are per thread
+            state["wrappers"] = [connections[alias] for alias in connections]
+            if state["cancelled"]:
+                raise asyncio.CancelledError
+            close_old_connections()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                state["wrappers"] = []
+                close_old_connections()
+
+        try:
+            return await sync_to_async(call, thread_sensitive=False, executor=executor)()
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            for wrapper in state["wrappers"]:
+                # The thread may be closing the connection at the same time
+                with contextlib.suppress(Exception):
+                    if wrapper.connection is not None:
+                        wrapper.connection.cancel()
+            raise
+        finally:
+            self._checkin(slots)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            size = settings.DB_POOL_SIZE
+            return {
+                "size": size,
+                "timeout_seconds": settings.DB_POOL_TIMEOUT,
+                "in_use": self._in_use,
+                "waiting": self._waiting,
+                "saturation": round(self._in_use / size, 3) if size else 0.0,
+                "peak_in_use": self._peak_in_use,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "wait_seconds_total": round(self._wait_seconds_total, 3),
+                "wait_seconds_max": round(self._wait_seconds_max, 3),
+            }
+
+
+db_pool = DatabasePool()
+
+
+async def db_run(func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """
+    Run blocking database code on the database pool and await its result.
+
+    When the awaiting task is cancelled (Django cancels the view when the client
+    disconnects), the statement running on the pool thread is cancelled as well, and
+    calls that have not started yet are skipped.
+
+    Args:
+        func: Sync callable to run
+        *args: Positional arguments for `func`
+        **kwargs: Keyword arguments for `func`
+
+    Returns:
+        What `func` returns
+
+    Raises:
+        PoolTimeoutError: No pool thread became free within DB_POOL_TIMEOUT seconds
+    """
+    return await db_pool.run(func, *args, **kwargs)
+
+
+async def db_iter(func: Callable[..., Iterable[T]], /, *args: Any, **kwargs: Any) -> AsyncGenerator[T, None]:
+    """
+    Iterate blocking database code on the database pool.
+
+    `func` is called on a pool thread and its iterable is consumed on that thread, so
+    a server-side cursor stays on its connection; the pool thread is held until the
+    iteration ends. Each item is handed over before the next one is produced. When the
+    consumer stops early (it closes the iterator or is cancelled, e.g. because the
+    client disconnected), the running statement is cancelled and the iterable is
+    closed on its thread.
+
+    Args:
+        func: Sync callable returning the iterable to consume
+        *args: Positional arguments for `func`
+        **kwargs: Keyword arguments for `func`
+
+    Yields:
+        The items of the iterable
+
+    Raises:
+        PoolTimeoutError: No pool thread became free within DB_POOL_TIMEOUT seconds
+    """
+    loop = asyncio.get_running_loop()
+    items: asyncio.Queue = asyncio.Queue(maxsize=1)
+    stopped = threading.Event()
+
+    def produce() -> None:
+        iterable = func(*args, **kwargs)
+        try:
+            for item in iterable:
+                if stopped.is_set():
+                    return
+                asyncio.run_coroutine_threadsafe(items.put(item), loop).result()
+        finally:
+            close = getattr(iterable, "close", None)
+            if close is not None:
+                close()
+
+    producer = asyncio.ensure_future(db_run(produce))
+    taken: asyncio.Future | None = None
+    try:
+        while True:
+            taken = asyncio.ensure_future(items.get())
+            await asyncio.wait({taken, producer}, return_when=asyncio.FIRST_COMPLETED)
+            if taken.done():
+                yield taken.result()
+                continue
+            taken.cancel()
+            # The last item may not have been taken yet
+            while not items.empty():
+                yield items.get_nowait()
+            # Raises what the iterable raised
+            producer.result()
+            return
+    finally:
+        if taken is not None:
+            taken.cancel()
+        if not producer.done():
+            stopped.set()
+            # Unblocks a hand-over in progress, after which the thread sees `stopped`
+            while not items.empty():
+                items.get_nowait()
+            producer.cancel()
@@ -0,0 +1,257 @@
+"""
+Read replica routing.
+
+Reads made inside `replica_reads()`, or by functions decorated with `replica_read`, go
+to one of the DB_REPLICAS. The replica is picked by smooth weighted round-robin among
+those that are reachable and within DB_REPLICA_MAX_LAG_SECONDS of the primary. When
+none qualifies, reads go to the primary, or with DB_REPLICA_LAG_POLICY = "stale" to the
+least lagging replica, flagged as stale. Everything else stays on "default", and so do
+reads inside a transaction on the primary, which must see that transaction's snapshot.
+
+Each process probes a replica's health and lag at most every DB_REPLICA_CHECK_SECONDS.
+A replica that fails a probe or drops a connection mid-query is ejected for
+DB_REPLICA_EJECT_SECONDS.
+"""
+
+import inspect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Iterator, NamedTuple, TypeVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, InterfaceError, OperationalError, connections
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Seconds the replica is behind: 0 when it has replayed everything it received (an idle
+# primary sends nothing, which must not read as growing lag), and 0 on a primary, so an
+# alias of the primary works as a replica
+LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+# SQLSTATE of cancelled statements (client disconnects, statement_timeout): never retried
+QUERY_CANCELED = "57014"
+
+
+class ReplicaChoice(NamedTuple):
+    alias: str
+    lag: float
+    stale: bool
+
+
+PRIMARY = ReplicaChoice(alias=DEFAULT_DB_ALIAS, lag=0.0, stale=False)
+
+
+class _ReplicaState:
+    def __init__(self, weight: int):
+        self.weight = weight
+        self.current = 0
+        self.lag = 0.0
+        self.healthy = True
+        self.checked_at = float("-inf")
+        self.ejected_until = 0.0
+
+
+class ReplicaPool:
+    """Health, lag and weighted round-robin state of the configured replicas in this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states: dict[str, _ReplicaState] = {}
+
+    def _sync_states(self) -> None:
+        for alias, weight in settings.DB_REPLICAS.items():
+            if alias not in self._states:
+                self._states[alias] = _ReplicaState(weight)
+        for alias in self._states.keys() - settings.DB_REPLICAS.keys():
+            del self._states[alias]
+
+    def _probe(self, alias: str) -> None:
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(LAG_SQL)
+                lag = float(cursor.fetchone()[0])
+        except Exception:
+            logger.warning(f"Replica {alias} failed its health check", exc_info=True)
+            self.eject(alias)
+            return
+        with self._lock:
+            state = self._states.get(alias)
+            if state is not None:
+                state.lag = lag
+                state.healthy = True
+
+    def eject(self, alias: str) -> None:
+        """Take a replica out of rotation for DB_REPLICA_EJECT_SECONDS."""
+        with self._lock:
+            state = self._states.get(alias)
+            if state is not None:
+                state.healthy = False
+                state.ejected_until = time.monotonic() + settings.DB_REPLICA_EJECT_SECONDS
+
+    def choose(self) -> ReplicaChoice:
+        """The replica for the next read, or PRIMARY when no replica qualifies."""
+        if not settings.DB_REPLICAS:
+            return PRIMARY
+        now = time.monotonic()
+        with self._lock:
+            self._sync_states()
+            # Claimed under the lock, so concurrent callers use the last result meanwhile
+            due = [
+                alias
+                for alias, state in self._states.items()
+                if now - state.checked_at >= settings.DB_REPLICA_CHECK_SECONDS and now >= state.ejected_until
+            ]
+            for alias in due:
+                self._states[alias].checked_at = now
+        for alias in due:
+            self._probe(alias)
+
+        with self._lock:
+            live = {alias: state for alias, state in self._states.items() if state.healthy}
+            fresh = {alias: state for alias, state in live.items() if state.lag <= settings.DB_REPLICA_MAX_LAG_SECONDS}
+            if fresh:
+                # Smooth weighted round-robin: spreads picks evenly instead of in runs
+                total = sum(state.weight for state in fresh.values())
+                for state in fresh.values():
+                    state.current += state.weight
+                alias = max(fresh, key=lambda name: fresh[name].current)
+                fresh[alias].current -= total
+                return ReplicaChoice(alias=alias, lag=fresh[alias].lag, stale=False)
+            if live and settings.DB_REPLICA_LAG_POLICY == "stale":
+                alias = min(live, key=lambda name: live[name].lag)
+                return ReplicaChoice(alias=alias, lag=live[alias].lag, stale=True)
+        return PRIMARY
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                alias: {
+                    "weight": state.weight,
+                    "healthy": state.healthy,
+                    "lag_seconds": state.lag,
+                    "ejected_for": max(0.0, state.ejected_until - now),
+                }
+                for alias, state in self._states.items()
+            }
+
+
+replica_pool = ReplicaPool()
+
+# Alias reads are routed to in the current context; None when no routing decision applies
+_route: ContextVar[str | None] = ContextVar("replica_route", default=None)
+
+
+@contextmanager
+def _routed(alias: str) -> Iterator[None]:
+    token = _route.set(alias)
+    try:
+        yield
+    finally:
+        _route.reset(token)
+
+
+def _decide() -> ReplicaChoice | None:
+    """A new routing decision, or None when an enclosing one (or a primary transaction) applies."""
+    if _route.get() is not None:
+        return None
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return PRIMARY
+    return replica_pool.choose()
+
+
+@contextmanager
+def replica_reads() -> Iterator[ReplicaChoice | None]:
+    """Route the reads made inside the block to a replica; yields the choice (None when nested)."""
+    choice = _decide()
+    if choice is None:
+        yield None
+        return
+    with _routed(choice.alias):
+        yield choice
+
+
+def replica_read(func: Callable[..., T]) -> Callable[..., T]:
+    """
+    Run a read-only function with its reads routed to a replica.
+
+    A call that fails because of the replica is retried on the primary, with the
+    replica ejected when it lost the connection. A result with a dict `meta` served
+    from a lagging replica gets `stale` and `replica_lag_seconds` in its meta.
+    Generator functions keep one replica for the whole iteration and are not retried,
+    since rows may already have been consumed.
+    """
+    if inspect.isgeneratorfunction(func):
+
+        @wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            choice = _decide()
+            iterator = func(*args, **kwargs)
+            if choice is None:
+                yield from iterator
+                return
+            # The route is set around each step: a generator can be resumed from another context
+            while True:
+                with _routed(choice.alias):
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                yield item
+
+        return generator_wrapper  # type: ignore[return-value]
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        choice = _decide()
+        if choice is None:
+            return func(*args, **kwargs)
+        try:
+            with _routed(choice.alias):
+                result = func(*args, **kwargs)
+        except (OperationalError, InterfaceError) as exc:
+            pgcode = getattr(exc.__cause__, "pgcode", None)
+            if choice.alias == DEFAULT_DB_ALIAS or pgcode == QUERY_CANCELED:
+                raise
+            # Errors without a SQLSTATE are connection failures rather than query conflicts
+            if pgcode is None:
+                replica_pool.eject(choice.alias)
+            logger.warning(f"Read on replica {choice.alias} failed, retrying on the primary", exc_info=True)
+            with _routed(DEFAULT_DB_ALIAS):
+                return func(*args, **kwargs)
+        meta = getattr(result, "meta", None)
+        if choice.stale and isinstance(meta, dict):
+            meta["stale"] = True
+            meta["replica_lag_seconds"] = round(choice.lag, 1)
+        return result
+
+    return wrapper
+
+
+class ReplicaRouter:
+    """Sends reads to the alias chosen by replica_reads/replica_read, everything else to the default."""
+
+    def db_for_read(self, model, **hints):
+        return _route.get()
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db in settings.DB_REPLICAS else None
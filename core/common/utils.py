@@ -37,7 +37,9 @@ def create_serializer_class(name, fields):
 
 
 def inline_serializer(*, fields, data=None, **kwargs):
-    serializer_class = create_serializer_class(name="inline_serializer", fields=fields)
+    # No ref_name: drf-yasg documents each one in place instead of as one shared definition
+    meta = type("Meta", (), {"ref_name": None})
+    serializer_class = create_serializer_class(name="inline_serializer", fields={**fields, "Meta": meta})
 
     if data is not None:
         return serializer_class(data=data, **kwargs)
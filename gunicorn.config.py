@@ -6,9 +6,12 @@ backlog = 1024
 
 # Worker processes
 import multiprocessing  # noqa: E402
+import os  # noqa: E402
 
-workers = (multiprocessing.cpu_count() * 2) + 1  # Recommended formula
-# For development, you can set explicitly: workers = 4
+workers = int(os.environ.get("WEB_CONCURRENCY", (multiprocessing.cpu_count() * 2) + 1))  # Recommended formula
+# For development, you can set explicitly: WEB_CONCURRENCY=4
+# Settings split DB_MAX_CONNECTIONS across the workers (see DB_POOL_SIZE)
+os.environ["GUNICORN_WORKERS"] = str(workers)
 worker_class = "uvicorn.workers.UvicornWorker"
 worker_connections = 500
 max_requests = 1000
@@ -41,6 +44,16 @@ worker_tmp_dir = "/tmp"
 max_requests = 1000
 max_requests_jitter = 100
 
+
+def worker_exit(server, worker):
+    """Drain the write-behind view buffer before the worker goes away."""
+    from django.conf import settings
+
+    from core.analytics.services import view_buffer
+
+    view_buffer.close(timeout=min(settings.ANALYTICS_BUFFER_DRAIN_SECONDS, graceful_timeout - 1))
+
+
 # Environment
 raw_env = [
     "DJANGO_SETTINGS_MODULE=config.django.base",